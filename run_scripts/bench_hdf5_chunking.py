@@ -0,0 +1,118 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2019 Blue Cheetah Analog Design Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares HDF5 read latency of simulation data saved with different chunking strategies."""
+
+from typing import Dict, Callable, List
+
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from pybag.enum import DesignOutput
+
+from bag.simulation.data import AnalysisData, SimData
+from bag.simulation.hdf5 import (
+    CHUNK_STRATEGIES, ACCESS_PATTERNS, save_sim_data_hdf5, load_sim_data_hdf5
+)
+
+
+def parse_options() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark HDF5 chunking strategies.')
+    parser.add_argument('-c', '--corners', dest='num_env', type=int, default=32,
+                        help='number of corners.')
+    parser.add_argument('-s', '--signals', dest='num_sig', type=int, default=16,
+                        help='number of signals.')
+    parser.add_argument('-t', '--time', dest='num_t', type=int, default=200000,
+                        help='number of time points.')
+    parser.add_argument('-n', '--repeat', dest='repeat', type=int, default=5,
+                        help='number of repetitions of each read.')
+    parser.add_argument('--chunk-mb', dest='chunk_size_mb', type=int, default=2,
+                        help='HDF5 chunk size, in megabytes.')
+    parser.add_argument('--no-compress', dest='compress', action='store_false', default=True,
+                        help='disable compression.')
+    return parser.parse_args()
+
+
+def make_sim_data(num_env: int, num_sig: int, num_t: int) -> SimData:
+    rng = np.random.default_rng(0)
+    data = {'time': np.linspace(0, 1e-9, num_t)}
+    for idx in range(num_sig):
+        data[f'v{idx}'] = np.cumsum(rng.standard_normal((num_env, num_t)), axis=-1)
+    ana = AnalysisData(['corner', 'time'], data, True)
+    return SimData([f'env{idx}' for idx in range(num_env)], dict(tran=ana),
+                   DesignOutput.SPECTRE)
+
+
+def get_read_patterns(num_env: int, num_t: int) -> Dict[str, Callable[[Path, int], SimData]]:
+    win = slice(num_t // 2, num_t // 2 + max(num_t // 100, 1))
+    mid = num_env // 2
+    return {
+        'one signal, one corner': lambda p, cache: load_sim_data_hdf5(
+            p, cache_size_mb=cache, signals=['v0'], corners=[f'env{mid}']),
+        'one signal, all corners, time window': lambda p, cache: load_sim_data_hdf5(
+            p, cache_size_mb=cache, signals=['v0'], slices=dict(time=win)),
+        'all signals, one corner': lambda p, cache: load_sim_data_hdf5(
+            p, cache_size_mb=cache, corners=[f'env{mid}']),
+        'everything': lambda p, cache: load_sim_data_hdf5(p, cache_size_mb=cache),
+    }
+
+
+def time_read(fun: Callable[[Path, int], SimData], path: Path, cache: int, repeat: int) -> float:
+    ans = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fun(path, cache)
+        ans = min(ans, time.perf_counter() - t0)
+    return ans
+
+
+def run_main(args: argparse.Namespace) -> None:
+    sim_data = make_sim_data(args.num_env, args.num_sig, args.num_t)
+    patterns = get_read_patterns(args.num_env, args.num_t)
+    cache_list = [('20MB', 20), ('auto', 0)]
+
+    save_list = [(strategy, '') for strategy in CHUNK_STRATEGIES]
+    save_list.extend((('auto', access) for access in ACCESS_PATTERNS if access))
+
+    rows: List[List[str]] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for strategy, access in save_list:
+            name = f'{strategy}-{access}' if access else strategy
+            path = Path(tmp_dir, f'{name}.hdf5')
+            t0 = time.perf_counter()
+            save_sim_data_hdf5(sim_data, path, compress=args.compress,
+                               chunk_size_mb=args.chunk_size_mb, chunk_strategy=strategy,
+                               access_pattern=access)
+            t_save = time.perf_counter() - t0
+            size_mb = path.stat().st_size / 1024**2
+            print(f'{name}: save {t_save:.3f} s, {size_mb:.1f} MB')
+            for cache_name, cache in cache_list:
+                for pat_name, fun in patterns.items():
+                    t_read = time_read(fun, path, cache, args.repeat)
+                    rows.append([name, cache_name, pat_name, f'{t_read * 1e3:.2f}'])
+
+    header = ['strategy', 'cache', 'read pattern', 'time (ms)']
+    widths = [max(len(r[idx]) for r in rows + [header]) for idx in range(len(header))]
+    print()
+    for row in [header] + rows:
+        print('  '.join(val.ljust(w) for val, w in zip(row, widths)))
+
+
+if __name__ == '__main__':
+    run_main(parse_options())
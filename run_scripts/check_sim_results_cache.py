@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2019 Blue Cheetah Analog Design Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Checks that cached simulation results are identical to results parsed from the export files."""
+
+from typing import Dict, Any, List
+
+import os
+import sys
+import argparse
+import tempfile
+
+import numpy as np
+
+from bag.io.sim_data import cache_fname, load_sim_results
+
+
+def parse_options() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Check the simulation results HDF5 cache.')
+    parser.add_argument('save_dir', nargs='?', default='',
+                        help='exported simulation results directory.  Defaults to a generated '
+                             'example.')
+    return parser.parse_args()
+
+
+def write_example(save_dir: str) -> None:
+    """Writes a small Ocean export with a corner sweep, a parameter sweep, and inner sweeps."""
+    corners = ['tt', 'ff', 'ss']
+    vdd_list = [0.9, 1.0]
+    freq = np.logspace(3, 6, 7)
+    time = np.linspace(0, 1e-9, 5)
+    rng = np.random.default_rng(0)
+
+    lines = ['corner vdd']
+    lines.extend((f'{env} {vdd}' for env in corners for vdd in vdd_list))
+    _write_lines(os.path.join(save_dir, 'sweep.info'), lines)
+    _write_lines(os.path.join(save_dir, 'freq.info'), [f'{v:.17g}' for v in freq])
+    _write_lines(os.path.join(save_dir, 'time.info'), [f'{v:.17g}' for v in time])
+
+    _write_lines(os.path.join(save_dir, 'gain.sweep'), ['freq'])
+    gain = rng.standard_normal(len(corners) * len(vdd_list) * len(freq))
+    gain = gain + 1j * rng.standard_normal(gain.size)
+    _write_lines(os.path.join(save_dir, 'gain.data'),
+                 [f'{v.real:.17g}{v.imag:+.17g}j' for v in gain])
+
+    _write_lines(os.path.join(save_dir, 'vout.sweep'), ['time'])
+    vout = rng.standard_normal(len(corners) * len(vdd_list) * len(time))
+    _write_lines(os.path.join(save_dir, 'vout.data'), [f'{v:.17g}' for v in vout])
+
+    _write_lines(os.path.join(save_dir, 'ibias.sweep'), [])
+    ibias = rng.standard_normal(len(corners) * len(vdd_list))
+    _write_lines(os.path.join(save_dir, 'ibias.data'), [f'{v:.17g}' for v in ibias])
+
+
+def _write_lines(fname: str, lines: List[str]) -> None:
+    with open(fname, 'w') as f:
+        f.writelines((line + '\n' for line in lines))
+
+
+def compare_results(expect: Dict[str, Any], actual: Dict[str, Any]) -> List[str]:
+    """Returns a list of differences between the given results."""
+    errors = []
+    if set(expect.keys()) != set(actual.keys()):
+        errors.append(f'keys differ: {sorted(expect.keys())} != {sorted(actual.keys())}')
+    if expect.get('sweep_params') != actual.get('sweep_params'):
+        errors.append('sweep_params differ')
+    for name, val in expect.items():
+        if name == 'sweep_params' or name not in actual:
+            continue
+        val_act = actual[name]
+        dtype, dtype_act = np.asarray(val).dtype, np.asarray(val_act).dtype
+        # string arrays may differ in maximum string length
+        if dtype != dtype_act and not (dtype.kind == 'U' and dtype_act.kind == 'U'):
+            errors.append(f'{name}: dtype {dtype} != {dtype_act}')
+        elif not np.array_equal(val, val_act):
+            errors.append(f'{name}: values differ')
+        elif getattr(val, 'sweep_params', None) != getattr(val_act, 'sweep_params', None):
+            errors.append(f'{name}: sweep parameters differ')
+    return errors
+
+
+def run_check(save_dir: str) -> List[str]:
+    cache_path = os.path.join(save_dir, cache_fname)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+
+    expect = load_sim_results(save_dir, use_cache=False)
+    errors = []
+    # the first load writes the cache, the second load reads it
+    for label in ('cache write', 'cache read'):
+        actual = load_sim_results(save_dir, use_cache=True)
+        errors.extend((f'{label}: {msg}' for msg in compare_results(expect, actual)))
+    if not os.path.isfile(cache_path):
+        errors.append('cache file was not written')
+    return errors
+
+
+def run_main(args: argparse.Namespace) -> None:
+    if args.save_dir:
+        errors = run_check(args.save_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_example(tmp_dir)
+            errors = run_check(tmp_dir)
+
+    if errors:
+        print('\n'.join(errors))
+        sys.exit(1)
+    print('cached results match exported results.')
+
+
+if __name__ == '__main__':
+    run_main(parse_options())
@@ -14,12 +14,20 @@
 # limitations under the License.
 
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Any
+
+import sys
 import argparse
 
 from bag.io import read_yaml
-from bag.core import BagProject
+from bag.daemon import run_client
 from bag.util.misc import register_pdb_hook
 
+if TYPE_CHECKING:
+    from bag.core import BagProject
+
 register_pdb_hook()
 
 
@@ -54,23 +62,34 @@ def parse_options() -> argparse.Namespace:
                         help='disable layout.')
     parser.add_argument('--no-sch', dest='gen_sch', action='store_false', default=True,
                         help='disable schematic.')
+    parser.add_argument('-D', '--daemon', dest='daemon', action='store_true', default=False,
+                        help='submit the request to a running BAG daemon.')
     args = parser.parse_args()
     return args
 
 
 def run_main(prj: BagProject, args: argparse.Namespace) -> None:
     specs = read_yaml(args.specs)
-    prj.generate_cell(specs, raw=args.raw, gen_lay=args.gen_lay, run_drc=args.run_drc,
-                      gen_sch=args.gen_sch, run_lvs=args.run_lvs, run_rcx=args.run_rcx,
-                      gen_lef=args.gen_lef, flat=args.flat, sim_netlist=args.gen_sim,
-                      gen_hier=args.gen_hier, gen_model=args.gen_mod,
-                      gen_shell=args.gen_shell, export_lay=args.export_lay,
-                      gen_netlist=args.gen_netlist)
+    prj.generate_cell(specs, **get_options(args))
+
+
+def get_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return dict(raw=args.raw, gen_lay=args.gen_lay, run_drc=args.run_drc, gen_sch=args.gen_sch,
+                run_lvs=args.run_lvs, run_rcx=args.run_rcx, gen_lef=args.gen_lef, flat=args.flat,
+                sim_netlist=args.gen_sim, gen_hier=args.gen_hier, gen_model=args.gen_mod,
+                gen_shell=args.gen_shell, export_lay=args.export_lay,
+                gen_netlist=args.gen_netlist)
 
 
 if __name__ == '__main__':
     _args = parse_options()
 
+    if _args.daemon:
+        run_client('gen_cell', _args.specs, get_options(_args))
+        sys.exit(0)
+
+    from bag.core import BagProject
+
     local_dict = locals()
     if 'bprj' not in local_dict:
         print('creating BAG project')
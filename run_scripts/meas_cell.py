@@ -13,16 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Mapping, Any
+from __future__ import annotations
 
-import argparse
+from typing import TYPE_CHECKING, Mapping, Any, Dict
 
-from pybag.enum import LogLevel
+import sys
+import argparse
 
 from bag.io import read_yaml
-from bag.core import BagProject
+from bag.daemon import run_client
 from bag.util.misc import register_pdb_hook
 
+if TYPE_CHECKING:
+    from bag.core import BagProject
+
 register_pdb_hook()
 
 
@@ -41,22 +45,37 @@ def parse_options() -> argparse.Namespace:
                         help='Force RC extraction even if layout/schematic are unchanged')
     parser.add_argument('--force_sim', action='store_true', default=False,
                         help='Force simulation even if simulation netlist is unchanged')
+    parser.add_argument('-D', '--daemon', dest='daemon', action='store_true', default=False,
+                        help='submit the request to a running BAG daemon.')
     args = parser.parse_args()
     return args
 
 
 def run_main(prj: BagProject, args: argparse.Namespace) -> None:
+    from pybag.enum import LogLevel
+
     specs: Mapping[str, Any] = read_yaml(args.specs)
 
-    log_level = LogLevel.WARN if args.quiet else LogLevel.INFO
-    prj.measure_cell(specs, extract=args.extract, force_sim=args.force_sim,
-                     force_extract=args.force_extract, gen_sch=args.gen_sch,
-                     log_level=log_level, fake=args.fake)
+    options = get_options(args)
+    options['log_level'] = LogLevel[options['log_level']]
+    prj.measure_cell(specs, **options)
+
+
+def get_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return dict(extract=args.extract, force_sim=args.force_sim, force_extract=args.force_extract,
+                gen_sch=args.gen_sch, log_level='WARN' if args.quiet else 'INFO',
+                fake=args.fake)
 
 
 if __name__ == '__main__':
     _args = parse_options()
 
+    if _args.daemon:
+        run_client('meas_cell', _args.specs, get_options(_args))
+        sys.exit(0)
+
+    from bag.core import BagProject
+
     local_dict = locals()
     if 'bprj' not in local_dict:
         print('creating BAG project')
@@ -13,12 +13,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Any
+
+import sys
 import argparse
 
 from bag.io import read_yaml
-from bag.core import BagProject
+from bag.daemon import run_client
 from bag.util.misc import register_pdb_hook
 
+if TYPE_CHECKING:
+    from bag.core import BagProject
+
 register_pdb_hook()
 
 
@@ -36,19 +44,31 @@ def parse_options() -> argparse.Namespace:
     parser.add_argument('--gen-oa', dest='raw', action='store_false',
                         default=True, help='enables oa view generation')
 
+    parser.add_argument('-D', '--daemon', dest='daemon', action='store_true', default=False,
+                        help='submit the request to a running BAG daemon.')
     args = parser.parse_args()
     return args
 
 
 def run_main(prj: BagProject, args: argparse.Namespace) -> None:
     specs = read_yaml(args.specs)
-    prj.simulate_cell(specs, extract=args.extract, gen_tb=args.gen_tb, simulate=args.simulate,
-                      mismatch=args.mismatch, raw=args.raw)
+    prj.simulate_cell(specs, **get_options(args))
+
+
+def get_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return dict(extract=args.extract, gen_tb=args.gen_tb, simulate=args.simulate,
+                mismatch=args.mismatch, raw=args.raw)
 
 
 if __name__ == '__main__':
     _args = parse_options()
 
+    if _args.daemon:
+        run_client('sim_cell', _args.specs, get_options(_args))
+        sys.exit(0)
+
+    from bag.core import BagProject
+
     local_dict = locals()
     if 'bprj' not in local_dict:
         print('creating BAG project')
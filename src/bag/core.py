@@ -72,6 +72,7 @@ from .env import (
     get_gds_layer_map, get_gds_object_map
 )
 from .util.importlib import import_class
+from .util.immutable import to_immutable
 from .simulation.data import netlist_info_from_dict
 from .simulation.hdf5 import load_sim_data_hdf5
 from .simulation.core import TestbenchManager
@@ -140,6 +141,9 @@ class BagProject:
             lef_cls = cast(Type[LEFInterface], import_class(lef_config['class']))
             self._lef = lef_cls(lef_config)
 
+        # persistent layout/schematic databases, only used when database caching is enabled
+        self._db_cache: Optional[Dict[Any, Union[TemplateDB, ModuleDB]]] = None
+
     @property
     def tech_info(self) -> TechInfo:
         """TechInfo: the TechInfo object."""
@@ -217,6 +221,32 @@ class BagProject:
         """
         return self.impl_db.get_cells_in_library(lib_name)
 
+    def set_db_cache(self, enable: bool) -> None:
+        """Enable or disable persistent layout/schematic databases.
+
+        When enabled, make_template_db() and make_module_db() return the same database for
+        the same arguments, so generated masters are reused across calls.  This is used by
+        long running processes such as the BAG daemon.
+
+        Cell names of cached masters stay reserved until the cache is cleared, so a new master
+        may get a uniquified cell name where a fresh database would have used the base name.
+
+        Parameters
+        ----------
+        enable : bool
+            True to enable database caching.
+        """
+        if enable:
+            if self._db_cache is None:
+                self._db_cache = {}
+        else:
+            self._db_cache = None
+
+    def clear_db_cache(self) -> None:
+        """Remove all persistent layout/schematic databases."""
+        if self._db_cache is not None:
+            self._db_cache.clear()
+
     def make_template_db(self, impl_lib: str, **kwargs: Any) -> TemplateDB:
         """Create and return a new TemplateDB instance.
 
@@ -227,7 +257,14 @@ class BagProject:
         **kwargs : Any
             optional TemplateDB parameters.
         """
-        return TemplateDB(self.grid, impl_lib, prj=self, **kwargs)
+        if self._db_cache is None:
+            return TemplateDB(self.grid, impl_lib, prj=self, **kwargs)
+
+        key = ('layout', impl_lib, to_immutable(kwargs))
+        ans = self._db_cache.get(key, None)
+        if ans is None:
+            ans = self._db_cache[key] = TemplateDB(self.grid, impl_lib, prj=self, **kwargs)
+        return cast(TemplateDB, ans)
 
     def make_module_db(self, impl_lib: str, **kwargs: Any) -> ModuleDB:
         """Create and return a new ModuleDB instance.
@@ -239,7 +276,14 @@ class BagProject:
         **kwargs : Any
             optional ModuleDB parameters.
         """
-        return ModuleDB(self.tech_info, impl_lib, prj=self, **kwargs)
+        if self._db_cache is None:
+            return ModuleDB(self.tech_info, impl_lib, prj=self, **kwargs)
+
+        key = ('schematic', impl_lib, to_immutable(kwargs))
+        ans = self._db_cache.get(key, None)
+        if ans is None:
+            ans = self._db_cache[key] = ModuleDB(self.tech_info, impl_lib, prj=self, **kwargs)
+        return cast(ModuleDB, ans)
 
     def make_dsn_db(self, root_dir: Path, log_file: str, impl_lib: str,
                     sch_db: Optional[ModuleDB] = None, lay_db: Optional[TemplateDB] = None,
@@ -0,0 +1,400 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2019 Blue Cheetah Analog Design Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""This module provides a long running BAG process that serves generation requests.
+
+Creating a BagProject reads the BAG configuration and technology files, builds the routing
+grid, and connects to Virtuoso.  Generator modules are then imported, and all generated masters
+are discarded when the process exits.  The BAG daemon does this work only once: it keeps a
+BagProject alive with persistent layout/schematic databases, and processes gen_cell, sim_cell,
+and meas_cell requests sent by thin clients over a local socket.
+
+Generator modules are modules whose source file is under one of the generator source roots
+(by default, BAG_WORK_DIR and the PYTHONPATH entries), excluding the BAG framework itself and
+installed packages.  If the source file of any imported generator module is modified, the daemon
+removes the generator modules from sys.modules and clears the databases before processing the
+next request, so generator changes are always picked up.
+
+Because the databases persist across requests, cell names used by masters generated in earlier
+requests stay reserved.  A new master may get a uniquified name (for example, with a numeric
+suffix) where a fresh BAG process would have used the base name.  Restart the daemon, or change
+any generator source file, to start from empty databases.
+
+Communication protocol:
+
+the client sends a request dictionary with the following entries:
+
+type : str
+    the request type.  One of 'gen_cell', 'sim_cell', 'meas_cell', 'ping', or 'exit'.
+specs : str
+    absolute path to the specification file.
+options : Dict[str, Any]
+    keyword arguments to the corresponding BagProject method.
+cwd : str
+    the working directory of the client.
+
+the daemon replies with a dictionary with entries 'type' ('done' or 'error'), 'output' (the
+captured standard output), and 'data' (the error message, if any).
+
+Clients raise an error if the daemon port is closed, for example if the daemon was killed and
+left its port file behind.  Set the environment variable BAG_DAEMON_TIMEOUT to the maximum
+number of seconds to wait for a reply; by default clients wait until the request finishes.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Any, Mapping, Optional, Set, Sequence, List
+
+import io
+import os
+import sys
+import site
+import socket
+import sysconfig
+import argparse
+import traceback
+import contextlib
+from pathlib import Path
+
+from .io.file import read_yaml, write_file, read_file
+from .interface.zmqwrapper import ZMQRouter, ZMQDealer
+
+if TYPE_CHECKING:
+    from .core import BagProject
+
+DEFAULT_PORT_FILE = 'BAG_daemon.port'
+# timeout of ping and exit requests, in seconds
+PING_TIMEOUT = 10.0
+
+
+def get_daemon_port_file(port_file: str = '') -> Path:
+    """Returns the path to the BAG daemon port file.
+
+    Parameters
+    ----------
+    port_file : str
+        the port file name.  Relative names are resolved relative to BAG_WORK_DIR.
+
+    Returns
+    -------
+    path : Path
+        the port file path.
+    """
+    if not port_file:
+        port_file = DEFAULT_PORT_FILE
+    ans = Path(port_file)
+    if ans.is_absolute():
+        return ans
+    work_dir = os.environ.get('BAG_WORK_DIR', '')
+    if not work_dir:
+        raise ValueError('Environment variable BAG_WORK_DIR not defined')
+    return Path(work_dir) / ans
+
+
+def get_default_source_roots() -> List[str]:
+    """Returns the default generator source roots, BAG_WORK_DIR and the PYTHONPATH entries."""
+    ans = []
+    work_dir = os.environ.get('BAG_WORK_DIR', '')
+    if work_dir:
+        ans.append(work_dir)
+    ans.extend((val for val in os.environ.get('PYTHONPATH', '').split(os.pathsep) if val))
+    return ans
+
+
+class BagDaemon:
+    """A server that keeps a BagProject alive and processes generation requests.
+
+    Parameters
+    ----------
+    prj : BagProject
+        the BagProject instance.
+    router : ZMQRouter
+        the router used for socket communication.
+    src_roots : Optional[Sequence[str]]
+        directories containing generator source files.  Only modules under these directories
+        are unloaded when their source changes.  Defaults to get_default_source_roots().
+    """
+
+    def __init__(self, prj: BagProject, router: ZMQRouter,
+                 src_roots: Optional[Sequence[str]] = None) -> None:
+        self._prj = prj
+        self._router = router
+        # modules loaded before any request are never reloaded
+        self._base_modules: Set[str] = set(sys.modules.keys())
+        self._mod_mtimes: Dict[str, float] = {}
+
+        if src_roots is None:
+            src_roots = get_default_source_roots()
+        self._src_roots = [Path(val).resolve() for val in src_roots]
+        # never unload the BAG framework, the standard library, or installed packages
+        excl_dirs = {Path(__file__).resolve().parent}
+        excl_dirs.update((Path(val).resolve() for val in sysconfig.get_paths().values()))
+        excl_dirs.update((Path(val).resolve() for val in site.getsitepackages()))
+        self._excl_dirs = [val for val in excl_dirs
+                           if not any(_is_under(root, val) for root in self._src_roots)]
+
+        prj.set_db_cache(True)
+
+    def run(self) -> None:
+        """Starts this server."""
+        while not self._router.is_closed():
+            if self._router.poll_for_read(1000):
+                req = self._router.recv_obj()
+                if isinstance(req, dict) and 'type' in req:
+                    req_type = req['type']
+                    if req_type == 'exit':
+                        self._router.send_obj(dict(type='done', output='', data=''))
+                        self._router.close()
+                    elif req_type == 'ping':
+                        self._router.send_obj(dict(type='done', output='', data=''))
+                    else:
+                        self._router.send_obj(self.process_request(req))
+                else:
+                    msg = f'*Error* bag daemon error: bad request:\n{req}'
+                    self._router.send_obj(dict(type='error', output='', data=msg))
+
+    def process_request(self, req: Mapping[str, Any]) -> Dict[str, Any]:
+        """Process the given generation request.
+
+        Parameters
+        ----------
+        req : Mapping[str, Any]
+            the request dictionary.
+
+        Returns
+        -------
+        reply : Dict[str, Any]
+            the reply dictionary.
+        """
+        self._refresh_modules()
+
+        buf = io.StringIO()
+        old_cwd = os.getcwd()
+        reply_type = 'done'
+        data = ''
+        try:
+            os.chdir(req.get('cwd', old_cwd))
+            with contextlib.redirect_stdout(buf):
+                self._run_command(req['type'], read_yaml(req['specs']), req.get('options', {}))
+        except Exception:
+            reply_type = 'error'
+            data = traceback.format_exc()
+        finally:
+            os.chdir(old_cwd)
+            self._record_modules()
+
+        return dict(type=reply_type, output=buf.getvalue(), data=data)
+
+    def _run_command(self, req_type: str, specs: Mapping[str, Any],
+                     options: Mapping[str, Any]) -> None:
+        prj = self._prj
+        if req_type == 'gen_cell':
+            prj.generate_cell(specs, **options)
+        elif req_type == 'sim_cell':
+            prj.simulate_cell(specs, **options)
+        elif req_type == 'meas_cell':
+            from pybag.enum import LogLevel
+
+            kwargs = dict(options)
+            log_level = kwargs.pop('log_level', None)
+            if log_level is not None:
+                kwargs['log_level'] = LogLevel[log_level]
+            prj.measure_cell(specs, **kwargs)
+        else:
+            raise ValueError(f'Unknown request type: {req_type}')
+
+    def _is_generator_file(self, fname: str) -> bool:
+        path = Path(fname).resolve()
+        return (any(_is_under(path, root) for root in self._src_roots) and
+                not any(_is_under(path, excl) for excl in self._excl_dirs))
+
+    def _record_modules(self) -> None:
+        """Record modification time of all newly imported generator modules."""
+        for name, mod in list(sys.modules.items()):
+            if name not in self._base_modules and name not in self._mod_mtimes:
+                fname = getattr(mod, '__file__', None)
+                if fname and os.path.isfile(fname) and self._is_generator_file(fname):
+                    self._mod_mtimes[name] = os.path.getmtime(fname)
+
+    def _refresh_modules(self) -> None:
+        """Unload generator modules and clear databases if any generator source changed."""
+        stale = False
+        for name, mtime in self._mod_mtimes.items():
+            mod = sys.modules.get(name, None)
+            fname = None if mod is None else getattr(mod, '__file__', None)
+            if not fname or not os.path.isfile(fname) or os.path.getmtime(fname) != mtime:
+                stale = True
+                break
+
+        if stale:
+            for name in self._mod_mtimes:
+                sys.modules.pop(name, None)
+            self._mod_mtimes.clear()
+            self._prj.clear_db_cache()
+
+
+def _is_under(path: Path, root: Path) -> bool:
+    return path == root or root in path.parents
+
+
+def run_daemon(port_file: str = '', min_port: int = 5000, max_port: int = 9999,
+               log_file: Optional[str] = None, src_roots: Optional[Sequence[str]] = None
+               ) -> None:
+    """Create a BagProject and serve requests until an exit request is received.
+
+    Parameters
+    ----------
+    port_file : str
+        the port file name.  Relative names are resolved relative to BAG_WORK_DIR.
+    min_port : int
+        the minimum socket port number.
+    max_port : int
+        the maximum socket port number.
+    log_file : Optional[str]
+        the socket log file.  None to disable logging.
+    src_roots : Optional[Sequence[str]]
+        the generator source roots.  Defaults to get_default_source_roots().
+    """
+    from .core import BagProject
+
+    port_path = get_daemon_port_file(port_file)
+    print('creating BAG project')
+    prj = BagProject()
+
+    # only listen on the loopback interface, since requests run arbitrary generator code.
+    router = ZMQRouter(min_port=min_port, max_port=max_port, log_file=log_file,
+                       host='127.0.0.1')
+    write_file(port_path, f'{router.get_port()}\n')
+    print(f'BAG daemon listening on port {router.get_port()}')
+    try:
+        BagDaemon(prj, router, src_roots=src_roots).run()
+    finally:
+        if port_path.exists():
+            port_path.unlink()
+        if not router.is_closed():
+            router.close()
+
+
+def get_request_timeout() -> Optional[float]:
+    """Returns the default request timeout, in seconds, from the BAG_DAEMON_TIMEOUT variable.
+
+    None (wait indefinitely) if the variable is not set, empty, or not positive.
+    """
+    val = os.environ.get('BAG_DAEMON_TIMEOUT', '')
+    if not val:
+        return None
+    try:
+        ans = float(val)
+    except ValueError:
+        raise ValueError(f'Invalid BAG_DAEMON_TIMEOUT value: {val}')
+    return ans if ans > 0 else None
+
+
+def submit_request(req_type: str, specs: str = '', options: Optional[Mapping[str, Any]] = None,
+                   port_file: str = '', timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send a request to the BAG daemon and wait for the result.
+
+    Parameters
+    ----------
+    req_type : str
+        the request type.
+    specs : str
+        the specification file name.
+    options : Optional[Mapping[str, Any]]
+        keyword arguments to the corresponding BagProject method.
+    port_file : str
+        the daemon port file name.  Relative names are resolved relative to BAG_WORK_DIR.
+    timeout : Optional[float]
+        maximum time to wait for the reply, in seconds.  Defaults to get_request_timeout()
+        for generation requests, and PING_TIMEOUT for ping and exit requests.
+
+    Returns
+    -------
+    reply : Dict[str, Any]
+        the reply dictionary.
+    """
+    port_path = get_daemon_port_file(port_file)
+    try:
+        port = int(read_file(port_path))
+    except (FileNotFoundError, ValueError):
+        raise ValueError(f'Cannot find BAG daemon port file {port_path}.  Is the daemon running?')
+
+    # a killed daemon leaves its port file behind, and ZMQ would wait for it forever.
+    # A busy daemon still accepts connections, so this check does not wait for other requests.
+    try:
+        socket.create_connection(('localhost', port), timeout=PING_TIMEOUT).close()
+    except OSError:
+        raise ValueError(f'BAG daemon is not running on port {port}.  '
+                         f'Remove the stale port file {port_path} and restart the daemon.')
+
+    if timeout is None:
+        timeout = PING_TIMEOUT if req_type in ('ping', 'exit') else get_request_timeout()
+
+    req = dict(type=req_type, specs=str(Path(specs).resolve()) if specs else '',
+               options={} if options is None else dict(options), cwd=os.getcwd())
+    dealer = ZMQDealer(port)
+    reply = None
+    try:
+        dealer.send_obj(req)
+        reply = dealer.recv_obj(timeout=None if timeout is None else int(timeout * 1000))
+    finally:
+        # do not wait to deliver the request if the daemon never replied
+        dealer.close(linger=None if reply is not None else 0)
+    if reply is None:
+        raise ValueError(f'BAG daemon on port {port} did not reply within {timeout:.4g} '
+                         f'seconds.  If the daemon is not running, remove {port_path}.')
+    return reply
+
+
+def run_client(req_type: str, specs: str, options: Mapping[str, Any], port_file: str = '',
+               timeout: Optional[float] = None) -> None:
+    """Submit a request to the BAG daemon, print its output, and exit on error.
+
+    See submit_request() for the meaning of timeout.
+    """
+    reply = submit_request(req_type, specs, options, port_file=port_file, timeout=timeout)
+    output = reply.get('output', '')
+    if output:
+        sys.stdout.write(output)
+    if reply['type'] == 'error':
+        sys.stderr.write(reply.get('data', ''))
+        sys.exit(1)
+
+
+def parse_command_line_arguments() -> None:
+    desc = 'Start or stop the BAG daemon.'
+    parser = argparse.ArgumentParser(description=desc)
+    parser.add_argument('cmd', choices=['start', 'stop', 'ping'], help='the daemon command.')
+    parser.add_argument('-p', '--port-file', dest='port_file', default='',
+                        help='the port file name.')
+    parser.add_argument('--min-port', dest='min_port', type=int, default=5000,
+                        help='minimum socket port number.')
+    parser.add_argument('--max-port', dest='max_port', type=int, default=9999,
+                        help='maximum socket port number.')
+    parser.add_argument('-l', '--log', dest='log_file', default=None,
+                        help='socket log file name.')
+    parser.add_argument('-s', '--src-root', dest='src_roots', action='append', default=None,
+                        help='generator source root directory.  May be given multiple times.')
+    args = parser.parse_args()
+
+    if args.cmd == 'start':
+        run_daemon(port_file=args.port_file, min_port=args.min_port, max_port=args.max_port,
+                   log_file=args.log_file, src_roots=args.src_roots)
+    else:
+        run_client(args.cmd if args.cmd == 'ping' else 'exit', '', {}, port_file=args.port_file)
+
+
+if __name__ == '__main__':
+    parse_command_line_arguments()
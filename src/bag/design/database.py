@@ -45,7 +45,7 @@
 """
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, TypeVar, Mapping, Optional, Any, Sequence, Type, Tuple
+from typing import TYPE_CHECKING, TypeVar, Mapping, Optional, Any, Sequence, Type, Tuple, Dict
 
 import importlib
 from pathlib import Path
@@ -53,6 +53,7 @@ from pathlib import Path
 from jinja2 import Template
 
 from pybag.enum import DesignOutput
+from pybag.core import PySchCellView
 
 from ..util.cache import MasterDB, Param
 from ..io.template import new_template_env_fs
@@ -92,6 +93,8 @@ class ModuleDB(MasterDB):
 
         self._tech_info = tech_info
         self._temp_env = new_template_env_fs()
+        # parsed schematic templates, keyed on netlist file path, with file modification time
+        self._cv_cache: Dict[Path, Tuple[int, PySchCellView]] = {}
 
     @classmethod
     def get_schematic_class(cls, lib_name: str, cell_name: str) -> Type[Module]:
@@ -126,6 +129,27 @@ class ModuleDB(MasterDB):
         """the :class:`~bag.layout.core.TechInfo` instance."""
         return self._tech_info
 
+    def get_sch_cellview(self, yaml_path: Path) -> PySchCellView:
+        """Returns a copy of the schematic template in the given netlist file.
+
+        Each netlist file is parsed only once; later calls return copies of the parsed template.
+
+        Parameters
+        ----------
+        yaml_path : Path
+            the resolved netlist file path.
+
+        Returns
+        -------
+        cv : PySchCellView
+            a new copy of the schematic template.
+        """
+        mtime = yaml_path.stat().st_mtime_ns
+        entry = self._cv_cache.get(yaml_path, None)
+        if entry is None or entry[0] != mtime:
+            entry = self._cv_cache[yaml_path] = (mtime, PySchCellView(str(yaml_path), 'symbol'))
+        return entry[1].get_copy()
+
     def get_model_netlist_template(self, fpath: Path) -> Template:
         return self._temp_env.get_template(str(fpath))
 
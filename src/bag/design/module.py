@@ -102,7 +102,7 @@ class Module(DesignMaster):
                 # normal schematic
                 yaml_path = Path(yaml_fname).resolve()
                 self._netlist_dir: Optional[Path] = yaml_path.parent
-                self._cv = PySchCellView(str(yaml_path), 'symbol')
+                self._cv = database.get_sch_cellview(yaml_path)
                 self._orig_lib_name = self._cv.lib_name
                 self._orig_cell_name = self._cv.cell_name
                 self.instances: Dict[str, SchInstance] = {name: SchInstance(database, ref)
@@ -952,7 +952,8 @@ class Module(DesignMaster):
         Returns
         -------
         hier : Dict[str, Any]
-            the instance hierarchy dictionary.
+            the instance hierarchy dictionary.  Instances of the same master share the same
+            sub-hierarchy dictionary.
         """
         is_leaf_table = {}
         if leaf_cells:
@@ -960,17 +961,51 @@ class Module(DesignMaster):
                 for cell in cell_list:
                     is_leaf_table[(lib_name, cell)] = True
 
-        return self._get_hierarchy_helper(output_type, is_leaf_table, default_view_name)
+        # each master is processed only once; results (or errors) are memoized by master key.
+        memo: Dict[Any, Tuple[bool, Any]] = {}
+        file_table: Dict[Path, bool] = {}
+        return self._get_hierarchy_helper(output_type, is_leaf_table, default_view_name,
+                                          memo, file_table)
 
     def _get_hierarchy_helper(self, output_type: DesignOutput,
                               is_leaf_table: Dict[Tuple[str, str], bool],
                               default_view_name: str,
+                              memo: Dict[Any, Tuple[bool, Any]],
+                              file_table: Dict[Path, bool],
                               ) -> Optional[Dict[str, Any]]:
+        master_key = self.key
+        if master_key is None:
+            master_key = id(self)
+        result = memo.get(master_key, None)
+        if result is None:
+            try:
+                result = (True, self._compute_hierarchy(output_type, is_leaf_table,
+                                                        default_view_name, memo, file_table))
+            except ValueError as ex:
+                result = (False, ex)
+            memo[master_key] = result
+
+        if result[0]:
+            return result[1]
+        raise result[1]
+
+    def _compute_hierarchy(self, output_type: DesignOutput,
+                           is_leaf_table: Dict[Tuple[str, str], bool],
+                           default_view_name: str,
+                           memo: Dict[Any, Tuple[bool, Any]],
+                           file_table: Dict[Path, bool],
+                           ) -> Optional[Dict[str, Any]]:
         model_path = self.get_model_path(output_type, default_view_name)
 
+        def has_model() -> bool:
+            ans_ = file_table.get(model_path, None)
+            if ans_ is None:
+                ans_ = file_table[model_path] = model_path.is_file()
+            return ans_
+
         key = (self._orig_lib_name, self._orig_cell_name)
         if self.is_leaf_model() or is_leaf_table.get(key, False):
-            if not model_path.is_file():
+            if not has_model():
                 raise ValueError(f'Cannot find model file for {key}')
             return dict(view_name=default_view_name)
 
@@ -982,7 +1017,7 @@ class Module(DesignMaster):
             if sch_inst.is_primitive:
                 # primitive/static instance has no model file.
                 # so we must use model file for this cell
-                if not model_path.is_file():
+                if not has_model():
                     raise ValueError(f'Cannot find model file for {key}')
                 ans.clear()
                 ans['view_name'] = default_view_name
@@ -991,10 +1026,11 @@ class Module(DesignMaster):
                 try:
                     ans[inst_name] = sch_inst.master._get_hierarchy_helper(output_type,
                                                                            is_leaf_table,
-                                                                           default_view_name)
+                                                                           default_view_name,
+                                                                           memo, file_table)
                 except ValueError as ex:
                     # cannot generate model for this instance
-                    if not model_path.is_file():
+                    if not has_model():
                         # Cannot model this schematic too, re-raise error from instance
                         raise ex
                     # otherwise, this is a leaf model cell
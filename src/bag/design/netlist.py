@@ -27,7 +27,7 @@ from pybag.enum import DesignOutput
 from ..env import get_bag_device_map
 from ..util.search import get_new_name
 from ..io.file import open_file
-from ..io.string import wrap_string
+from ..io.string import write_wrapped
 
 
 def guess_netlist_type(netlist_in: Union[Path, str]) -> DesignOutput:
@@ -169,13 +169,13 @@ class Instance(NetlistNode):
                 tmp_list.extend(self._ports)
                 tmp_list.extend(self._params)
 
-            stream.write(wrap_string(tmp_list))
+            write_wrapped(stream, tmp_list)
         elif netlist_type is DesignOutput.SPECTRE:
             tmp_list = [self._inst_name]
             tmp_list.extend(self._ports)
             tmp_list.append(self._cell_name)
             tmp_list.extend(self._params)
-            stream.write(wrap_string(tmp_list))
+            write_wrapped(stream, tmp_list)
         else:
             raise ValueError(f'unsupported netlist type: {netlist_type}')
 
@@ -205,7 +205,7 @@ class Instance(NetlistNode):
 
         tmp_list.append(self._cell_name)
         tmp_list.extend(self._params)
-        stream.write(wrap_string(tmp_list))
+        write_wrapped(stream, tmp_list)
 
         # 2. add voltage source
         base_name, sep, index = self._inst_name.partition('@')
@@ -226,7 +226,7 @@ class Instance(NetlistNode):
                 else:
                     tmp_list = [vdc_name, new_mapping[port], old_mapping[port], offset_v_port]
 
-            stream.write(wrap_string(tmp_list))
+            write_wrapped(stream, tmp_list)
 
 
 class Subcircuit(NetlistNode):
@@ -261,7 +261,7 @@ class Subcircuit(NetlistNode):
         else:
             tmp_list = ['.SUBCKT', self._name]
         tmp_list.extend(self._ports)
-        stream.write(wrap_string(tmp_list))
+        write_wrapped(stream, tmp_list)
         for item in self._items:
             if isinstance(item, str):
                 stream.write(item)
@@ -271,7 +271,7 @@ class Subcircuit(NetlistNode):
 
         # 3. end
         if netlist_type is DesignOutput.SPECTRE:
-            stream.write(wrap_string(['ends', self._name]))
+            write_wrapped(stream, ['ends', self._name])
         else:
             stream.write('.ENDS\n')
 
@@ -108,9 +108,15 @@ class ZMQDealer(object):
             obj_str = pprint.pformat(obj)
             write_file(self._log_file, '%s\n%s\n' % (msg, obj_str), append=True)
 
-    def close(self):
-        """Close the underlying socket."""
-        self.socket.close()
+    def close(self, linger=None):
+        """Close the underlying socket.
+
+        Parameters
+        ----------
+        linger : int or None
+            time to wait for unsent messages in miliseconds.  If None, use the socket default.
+        """
+        self.socket.close(linger=linger)
 
     def send_obj(self, obj):
         """Sends a python object using pickle serialization and zlib compression.
@@ -198,9 +204,12 @@ class ZMQRouter(object):
         transfer performance.
     log_file : str or None
         the log file.  None to disable logging.
+    host : str
+        the interface to bind to.  Defaults to all interfaces.
     """
 
-    def __init__(self, port=None, min_port=5000, max_port=9999, pipeline=100, log_file=None):
+    def __init__(self, port=None, min_port=5000, max_port=9999, pipeline=100, log_file=None,
+                 host='*'):
         """Create a new ZMQDealer object.
         """
         context = zmq.Context.instance()
@@ -208,10 +217,11 @@ class ZMQRouter(object):
         self.socket = context.socket(zmq.ROUTER)
         self.socket.hwm = pipeline
         if port is not None:
-            self.socket.bind('tcp://*:%d' % port)
+            self.socket.bind('tcp://%s:%d' % (host, port))
             self.port = port
         else:
-            self.port = self.socket.bind_to_random_port('tcp://*', min_port=min_port, max_port=max_port)
+            self.port = self.socket.bind_to_random_port('tcp://%s' % host, min_port=min_port,
+                                                        max_port=max_port)
         self.addr = None
         self._log_file = log_file
 
@@ -51,7 +51,7 @@ from .common import fix_string, to_bytes, set_encoding, get_encoding, \
     set_error_policy, get_error_policy
 from .sim_data import load_sim_results, save_sim_results, load_sim_file
 from .file import read_file, read_resource, read_yaml, readlines_iter, \
-    write_file, make_temp_dir, open_temp, open_file
+    write_file, make_temp_dir, open_temp, open_file, set_yaml_cache
 
 from . import process
 
@@ -59,5 +59,5 @@ __all__ = ['fix_string', 'to_bytes', 'set_encoding', 'get_encoding',
            'set_error_policy', 'get_error_policy',
            'load_sim_results', 'save_sim_results', 'load_sim_file',
            'read_file', 'read_resource', 'read_yaml', 'readlines_iter',
-           'write_file', 'make_temp_dir', 'open_temp', 'open_file',
+           'write_file', 'make_temp_dir', 'open_temp', 'open_file', 'set_yaml_cache',
            ]
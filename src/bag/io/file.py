@@ -44,12 +44,14 @@
 """This module handles file related IO.
 """
 
-from typing import TextIO, Any, Iterable, Union, Dict
+from typing import TextIO, Any, Iterable, Union, Dict, Optional, Sequence, Tuple
 
 import os
 import time
+import pickle
 import string
 import codecs
+import hashlib
 import tempfile
 import pkg_resources
 from pathlib import Path
@@ -60,6 +62,84 @@ from ruamel.yaml import YAML
 from .common import bag_encoding, bag_codec_error
 
 yaml = YAML(typ='unsafe')
+# safe loader; uses the C parser/constructor of ruamel.yaml.clib when it is installed.
+yaml_fast = YAML(typ='safe')
+
+# directory of pickled YAML parse results.  Empty string to disable.
+_yaml_cache_dir = os.environ.get('BAG_YAML_CACHE_DIR', '')
+
+
+def set_yaml_cache(cache_dir: Optional[Union[str, Path]]) -> None:
+    """Set the directory used to cache parsed YAML files.
+
+    Parsed content is pickled into this directory, keyed on the file content, the loader, and the
+    values of all environment variables substituted into the file, so stale entries are never
+    used.  The default is given by the environment variable BAG_YAML_CACHE_DIR.
+
+    Parameters
+    ----------
+    cache_dir : Optional[Union[str, Path]]
+        the cache directory.  None or empty string to disable caching.
+    """
+    global _yaml_cache_dir
+    _yaml_cache_dir = '' if cache_dir is None else str(cache_dir)
+
+
+def _get_env_vars(content: str) -> Sequence[Tuple[str, Optional[str]]]:
+    """Returns the values of all environment variables referenced by the given template."""
+    names = set()
+    for match in string.Template.pattern.finditer(content):
+        name = match.group('named') or match.group('braced')
+        if name is not None:
+            names.add(name)
+    return [(name, os.environ.get(name, None)) for name in sorted(names)]
+
+
+def _load_yaml_str(content: str, fast: bool, env_sub: bool) -> Any:
+    """Parse the given YAML string, using the parse result cache if enabled.
+
+    If env_sub is True, environment variables are substituted into content before parsing.
+    """
+    loader = yaml_fast if fast else yaml
+    if not _yaml_cache_dir:
+        if env_sub:
+            content = string.Template(content).substitute(os.environ)
+        return loader.load(content)
+
+    # key on the raw content, so cache hits skip environment variable substitution
+    env_info = _get_env_vars(content) if env_sub else None
+    hasher = hashlib.blake2b(content.encode('utf-8'), digest_size=20)
+    hasher.update(repr((fast, env_info)).encode('utf-8'))
+    fpath = Path(_yaml_cache_dir, hasher.hexdigest() + '.pkl')
+    try:
+        with open(fpath, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        # missing, unreadable or corrupted cache entry, parse again
+        pass
+
+    if env_sub:
+        content = string.Template(content).substitute(os.environ)
+    ans = loader.load(content)
+    try:
+        data = pickle.dumps(ans, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        # content contains objects that cannot be pickled
+        return ans
+
+    # write to a temporary file first, so concurrent readers never see partial files.
+    # The cache is best-effort, so an unwritable cache directory is not an error.
+    tmp_name = ''
+    try:
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(suffix='.tmp', dir=str(fpath.parent))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, str(fpath))
+    except OSError:
+        if tmp_name and os.path.exists(tmp_name):
+            os.remove(tmp_name)
+    return ans
 
 
 def render_yaml(fname: Union[str, Path], params: Dict[str, Any]) -> Dict[str, Any]:
@@ -140,42 +220,40 @@ def readlines_iter(fname: Union[str, Path]) -> Iterable[str]:
             yield line
 
 
-def read_yaml(fname: Union[str, Path]) -> Any:
+def read_yaml(fname: Union[str, Path], fast: bool = False) -> Any:
     """Read the given file using YAML.
 
     Parameters
     ----------
     fname : str
         the file name.
+    fast : bool
+        True to use the safe C-accelerated loader.  Only use this for plain data files.
 
     Returns
     -------
     content : Any
         the object returned by YAML.
     """
-    with open_file(fname, 'r') as f:
-        content = yaml.load(f)
-
-    return content
+    return _load_yaml_str(read_file(fname), fast, False)
 
 
-def read_yaml_env(fname: str) -> Any:
+def read_yaml_env(fname: str, fast: bool = False) -> Any:
     """Parse YAML file with environment variable substitution.
 
     Parameters
     ----------
     fname : str
         yaml file name.
+    fast : bool
+        True to use the safe C-accelerated loader.  Only use this for plain data files.
 
     Returns
     -------
     table : Any
         the object returned by YAML.
     """
-    content = read_file(fname)
-    # substitute environment variables
-    content = string.Template(content).substitute(os.environ)
-    return yaml.load(content)
+    return _load_yaml_str(read_file(fname), fast, True)
 
 
 def read_resource(package: str, fname: str) -> str:
@@ -49,13 +49,19 @@ so BAG encoding settings will not apply.
 
 import os
 import glob
+import hashlib
+import warnings
 
 import numpy as np
 import h5py
+from numpy.lib import NumpyVersion
 
 from .common import bag_encoding, bag_codec_error
 
 illegal_var_name = ['sweep_params']
+cache_fname = '.sim_results_cache.hdf5'
+# np.loadtxt() is implemented in C since numpy 1.23
+_c_loadtxt = NumpyVersion(np.__version__) >= '1.23.0'
 
 
 class SweepArray(np.ndarray):
@@ -108,7 +114,9 @@ def _get_sweep_params(fname):
     values_list : list[list[float or str]]
         list of values list for each sweep parameter.
     """
-    mat = np.genfromtxt(fname, dtype=np.unicode_)
+    with open(fname, 'r', encoding='utf-8') as f:
+        rows = [line.split('#', 1)[0].split() for line in f]
+    mat = np.array([row for row in rows if row], dtype=np.str_)
     header = mat[0, :]
     data = mat[1:, :]
 
@@ -134,7 +142,7 @@ def _get_sweep_params(fname):
         end_idx = last_first_idx[idx] + 1
         values = data[0:end_idx:skip_len, idx]
         if header[idx] != 'corner':
-            values = values.astype(np.float)
+            values = values.astype(float)
         skip_len *= len(values)
         values_list.append(values)
 
@@ -143,13 +151,141 @@ def _get_sweep_params(fname):
     return swp_list, values_list
 
 
-def load_sim_results(save_dir):
+def _load_data_file(fname, size=-1):
+    """Load a data file exported by Ocean.
+
+    The data type is detected from the first value, so each file is parsed only once.  Newer
+    numpy versions parse the file with the C implementation of np.loadtxt().  Older versions
+    parse all whitespace separated values in a single pass instead of using the pure Python
+    np.loadtxt().  If the file cannot be parsed this way, or the number of values does not
+    match the given size, this method falls back to trying np.loadtxt() with each data type.
+
+    Parameters
+    ----------
+    fname : str
+        the data file name.
+    size : int
+        the expected number of values.  Negative to skip this check.
+
+    Returns
+    -------
+    data : np.ndarray
+        the data array.
+    """
+    with open(fname, 'r', encoding='utf-8') as f:
+        first_line = []
+        for line in f:
+            first_line = line.split()
+            if first_line:
+                break
+        if first_line:
+            dtype = complex if 'j' in first_line[0] or '(' in first_line[0] else float
+            if _c_loadtxt:
+                try:
+                    return np.loadtxt(fname, dtype=dtype)
+                except ValueError:
+                    pass
+            else:
+                f.seek(0)
+                text = f.read()
+                num_cols = len(first_line)
+                if size < 0:
+                    # match the shape np.loadtxt() returns
+                    size = len(text.split())
+                    shape = tuple(n for n in (size // num_cols, num_cols) if n != 1)
+                else:
+                    shape = (size,)
+                try:
+                    if dtype is complex:
+                        data_arr = np.fromiter(map(complex, text.split()), dtype=complex)
+                    else:
+                        with warnings.catch_warnings():
+                            # partial reads are detected by the size check below
+                            warnings.simplefilter('ignore', DeprecationWarning)
+                            data_arr = np.fromstring(text, dtype=float, sep=' ')
+                except ValueError:
+                    data_arr = None
+                if data_arr is not None and data_arr.size == size and size % num_cols == 0:
+                    return data_arr.reshape(shape)
+
+    try:
+        return np.loadtxt(fname)
+    except ValueError:
+        # try loading complex
+        return np.loadtxt(fname, dtype=complex)
+
+
+def _get_source_stamp(save_dir):
+    """Returns a hash string identifying the current contents of the given export directory.
+
+    A fixed size hash is used, since the full file listing of large exports can exceed the
+    HDF5 attribute size limit.
+    """
+    hobj = hashlib.blake2b(digest_size=20)
+    for name in sorted(os.listdir(save_dir)):
+        if not name.startswith(cache_fname):
+            stat = os.stat(os.path.join(save_dir, name))
+            info = '%s:%d:%d\n' % (name, stat.st_size, stat.st_mtime_ns)
+            hobj.update(info.encode(encoding=bag_encoding, errors=bag_codec_error))
+    return hobj.hexdigest()
+
+
+def _load_results_cache(fname, stamp):
+    """Returns the cached simulation results, or None if the cache is missing, stale, or bad."""
+    if not os.path.isfile(fname):
+        return None
+    try:
+        with h5py.File(fname, 'r') as f:
+            if _decode_str(f.attrs.get('source_stamp', '')) != stamp:
+                return None
+        return load_sim_file(fname)
+    except Exception:
+        # the cache is only an optimization, fall back to parsing the exported files
+        return None
+
+
+def _save_results_cache(results, fname, stamp):
+    """Saves the given simulation results to the cache file.  Errors are ignored."""
+    sweep_info = results['sweep_params']
+    tmp_fname = '%s.%d.tmp' % (fname, os.getpid())
+    try:
+        with h5py.File(tmp_fname, 'w') as f:
+            for name, data in results.items():
+                if name == 'sweep_params':
+                    continue
+                data = np.asarray(data)
+                if np.issubdtype(data.dtype, np.str_):
+                    # we need to explicitly encode unicode strings to bytes
+                    data = np.array([v.encode(encoding=bag_encoding, errors=bag_codec_error)
+                                     for v in data])
+                dset = f.create_dataset(name, data=data)
+                if name in sweep_info:
+                    dset.attrs['sweep_params'] = [
+                        swp.encode(encoding=bag_encoding, errors=bag_codec_error)
+                        for swp in sweep_info[name]]
+            f.attrs['source_stamp'] = stamp
+        os.replace(tmp_fname, fname)
+    except Exception:
+        # the cache is only an optimization, never fail the load because of it
+        pass
+    finally:
+        if os.path.exists(tmp_fname):
+            os.remove(tmp_fname)
+
+
+def load_sim_results(save_dir, use_cache=True):
     """Load exported simulation results from the given directory.
 
+    The first time an export directory is loaded, the results are converted to a HDF5 file
+    saved in that directory.  Later loads read that file instead, as long as the exported
+    files have not changed.
+
     Parameters
     ----------
     save_dir : str
         the save directory path.
+    use_cache : bool
+        True to read and write the HDF5 results cache.
 
     Returns
     -------
@@ -165,6 +301,13 @@ def load_sim_results(save_dir):
     if not save_dir:
         return None
 
+    cache_path = os.path.join(save_dir, cache_fname)
+    stamp = _get_source_stamp(save_dir) if use_cache else ''
+    if use_cache:
+        results = _load_results_cache(cache_path, stamp)
+        if results is not None:
+            return results
+
     results = {}
     sweep_params = {}
 
@@ -178,11 +321,6 @@ def load_sim_results(save_dir):
     for swp_name in glob.glob(os.path.join(save_dir, '*.sweep')):
         base_name = os.path.basename(swp_name).split('.')[0]
         data_name = os.path.join(save_dir, '%s.data' % base_name)
-        try:
-            data_arr = np.loadtxt(data_name)
-        except ValueError:
-            # try loading complex
-            data_arr = np.loadtxt(data_name, dtype=complex)
 
         # get sweep parameter names
         with open(swp_name, 'r', encoding='utf-8') as f:
@@ -195,7 +333,7 @@ def load_sim_results(save_dir):
         for swp in swp_list:
             if swp not in results:
                 fname = os.path.join(save_dir, '%s.info' % swp)
-                results[swp] = np.loadtxt(fname)
+                results[swp] = _load_data_file(fname)
 
             # if sweep has more than one element.
             if results[swp].shape:
@@ -207,6 +345,7 @@ def load_sim_results(save_dir):
             raise Exception('Error: output named %s already in results' % base_name)
 
         # reshape data array
+        data_arr = _load_data_file(data_name, size=int(np.prod(cur_shape)))
         data_arr = data_arr.reshape(cur_shape)
         results[base_name] = SweepArray(data_arr, cur_swp_list)
         # record sweep parameters for this data
@@ -217,6 +356,8 @@ def load_sim_results(save_dir):
 
     results['sweep_params'] = sweep_params
 
+    if use_cache:
+        _save_results_cache(results, cache_path, stamp)
     return results
 
 
@@ -262,6 +403,13 @@ def save_sim_results(results, fname, compression='gzip'):
                     f.create_dataset(var, data=swp_data, compression=compression)
 
 
+def _decode_str(val):
+    """Decodes the given HDF5 string value.  h5py 3 returns str instead of bytes in many cases."""
+    if isinstance(val, bytes):
+        return val.decode(encoding=bag_encoding, errors=bag_codec_error)
+    return str(val)
+
+
 def load_sim_file(fname):
     """Read simulation results from HDF5 file.
 
@@ -286,11 +434,10 @@ def load_sim_file(fname):
             dset_data = dset[()]
             if np.issubdtype(dset.dtype, np.bytes_):
                 # decode byte values to unicode arrays
-                dset_data = np.array([v.decode(encoding=bag_encoding, errors=bag_codec_error) for v in dset_data])
+                dset_data = np.array([_decode_str(v) for v in dset_data])
 
             if 'sweep_params' in dset.attrs:
-                cur_swp = [swp.decode(encoding=bag_encoding, errors=bag_codec_error)
-                           for swp in dset.attrs['sweep_params']]
+                cur_swp = [_decode_str(swp) for swp in dset.attrs['sweep_params']]
                 results[name] = SweepArray(dset_data, cur_swp)
                 sweep_params[name] = cur_swp
             else:
@@ -43,8 +43,9 @@
 
 """This module handles string related IO.
 """
-from typing import Iterable
+from typing import Iterable, List, Optional, TextIO
 
+import re
 from io import StringIO
 from textwrap import fill
 
@@ -65,7 +66,70 @@ def to_yaml_str(obj: object) -> str:
     return stream.getvalue()
 
 
+# tokens textwrap may split or merge.  Lines containing these use textwrap directly.
+_wrap_special_re = re.compile(r'[\s-]')
+
+
+def _wrap_tokens(tokens: List[str], wrap_length: int, indent_char: str) -> Optional[List[str]]:
+    """Greedily wrap the given tokens into lines, matching textwrap.fill() output.
+
+    Returns None if any token needs special handling by textwrap (empty tokens, tokens with
+    whitespace or hyphens, or tokens too long to fit on a line).
+    """
+    if not tokens:
+        return None
+    max_len = wrap_length - len(indent_char)
+    for tok in tokens:
+        if not tok or len(tok) > max_len or _wrap_special_re.search(tok) is not None:
+            return None
+
+    pieces = [tokens[0]]
+    cur_len = len(tokens[0])
+    width = wrap_length
+    for tok in tokens[1:]:
+        tok_len = len(tok)
+        if cur_len + 1 + tok_len <= width:
+            pieces.append(' ')
+            cur_len += 1 + tok_len
+        else:
+            pieces.append('\n')
+            pieces.append(indent_char)
+            width = max_len
+            cur_len = tok_len
+        pieces.append(tok)
+    pieces.append('\n')
+    return pieces
+
+
 def wrap_string(str_list: Iterable[str], wrap_length: int = 80, indent_char: str = '+') -> str:
-    ans = fill(' '.join(str_list), width=wrap_length, subsequent_indent=indent_char)
-    ans += '\n'
-    return ans
+    tokens = list(str_list)
+    pieces = _wrap_tokens(tokens, wrap_length, indent_char)
+    if pieces is None:
+        return fill(' '.join(tokens), width=wrap_length, subsequent_indent=indent_char) + '\n'
+    return ''.join(pieces)
+
+
+def write_wrapped(stream: TextIO, str_list: Iterable[str], wrap_length: int = 80,
+                  indent_char: str = '+') -> None:
+    """Write the given tokens to stream as a line, wrapped with continuation characters.
+
+    The output is identical to writing wrap_string(str_list, wrap_length, indent_char).
+
+    Parameters
+    ----------
+    stream : TextIO
+        the output stream.
+    str_list : Iterable[str]
+        the tokens to write.
+    wrap_length : int
+        the maximum line length.
+    indent_char : str
+        the line continuation prefix.
+    """
+    tokens = list(str_list)
+    pieces = _wrap_tokens(tokens, wrap_length, indent_char)
+    if pieces is None:
+        stream.write(fill(' '.join(tokens), width=wrap_length, subsequent_indent=indent_char))
+        stream.write('\n')
+    else:
+        stream.writelines(pieces)
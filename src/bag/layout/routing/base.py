@@ -46,6 +46,7 @@
 
 from __future__ import annotations
 
+from itertools import accumulate
 from typing import (
     TYPE_CHECKING, Tuple, Union, Iterable, Iterator, Dict, List, Sequence, Any, Optional, Mapping,
     cast, Callable
@@ -55,7 +56,7 @@ from pybag.enum import RoundMode
 from pybag.core import BBox, Transform, PyTrackID, TrackColoring, get_wire_iterator
 
 from ...typing import TrackType
-from ...util.math import HalfInt
+from ...util.math import HalfInt, HalfIntArray
 from ...util.immutable import ImmutableSortedDict, combine_hash
 from ...util.search import BinaryIterator
 
@@ -511,6 +512,10 @@ class TrackManager:
         seed = combine_hash(seed, hash(self._half_space))
         self._hash = seed
 
+        # memoized track separations, keyed on (layer, type pair, same_color, half_space)
+        self._sep_table: Dict[Tuple[int, Union[str, int], Union[str, int], bool, bool],
+                              HalfInt] = {}
+
     def __hash__(self) -> int:
         return self._hash
 
@@ -534,6 +539,17 @@ class TrackManager:
                 return test.get(layer_id, None)
         return None
 
+    @classmethod
+    def _sep_uses_space(cls, type_tuple: Tuple[Union[str, int], Union[str, int]],
+                        sp_type: Tuple[str, str]) -> bool:
+        """Returns True if the separation between the given wire types may look up sp_type."""
+        names = [wtype for wtype in type_tuple if not isinstance(wtype, int)]
+        ntup_list = [(name, '') for name in names]
+        if len(names) == 2:
+            ntup_list.append(type_tuple)
+        sp_rev = (sp_type[1], sp_type[0])
+        return any((ntup == sp_type or ntup == sp_rev for ntup in ntup_list))
+
     @property
     def grid(self) -> RoutingGrid:
         return self._grid
@@ -589,8 +605,18 @@ class TrackManager:
         same_color = kwargs.get('same_color', False)
         half_space = kwargs.get('half_space', self._half_space)
         sp_override = kwargs.get('sp_override', None)
-        sp_dict = self._tr_spaces if sp_override is None else sp_override
-
+        if sp_override is not None:
+            return self._compute_sep(layer_id, type_tuple, same_color, half_space, sp_override)
+
+        key = (layer_id, type_tuple[0], type_tuple[1], same_color, half_space)
+        ans = self._sep_table.get(key, None)
+        if ans is None:
+            ans = self._sep_table[key] = self._compute_sep(layer_id, type_tuple, same_color,
+                                                           half_space, self._tr_spaces)
+        return ans
+
+    def _compute_sep(self, layer_id: int, type_tuple: Tuple[Union[str, int], Union[str, int]],
+                     same_color: bool, half_space: bool, sp_dict: SpDictType) -> HalfInt:
         if isinstance(type_tuple[0], int):
             w1 = type_tuple[0]
             if isinstance(type_tuple[1], int):
@@ -704,24 +730,39 @@ class TrackManager:
         if not type_list:
             return HalfInt(0), []
 
+        # get separation between adjacent wires, computing each unique pair only once.
+        sep_list = []
+        pair_seps: Dict[Tuple[Union[str, int], Union[str, int]], int] = {}
+        for idx in range(1, len(type_list)):
+            pair = (type_list[idx - 1], type_list[idx])
+            sep_dbl = pair_seps.get(pair, None)
+            if sep_dbl is None:
+                sep_dbl = pair_seps[pair] = self.get_sep(layer_id, pair, **kwargs).dbl_value
+            sep_list.append(sep_dbl)
+
+        return self._place_wires_by_sep(layer_id, type_list, sep_list, align_track, align_idx,
+                                        center_coord)
+
+    def _place_wires_by_sep(self, layer_id: int, type_list: Sequence[Union[str, int]],
+                            sep_list: Sequence[int], align_track: Optional[HalfInt],
+                            align_idx: int, center_coord: Optional[int]
+                            ) -> Tuple[HalfInt, List[HalfInt]]:
+        """Place wires given the separation between adjacent wires in half-track units."""
         grid = self.grid
 
         w0 = self.get_width(layer_id, type_list[0])
         mid_idx = grid.find_next_track(layer_id, 0, tr_width=w0, half_track=True,
                                        mode=RoundMode.GREATER_EQ)
 
-        ans = [mid_idx]
         num_wires = len(type_list)
         idx_half = num_wires // 2
-        for idx in range(1, num_wires):
-            cur_idx = self.get_next_track(layer_id, ans[-1], type_list[idx - 1],
-                                          type_list[idx], up=True, **kwargs)
-            ans.append(cur_idx)
+        dbl_list = [mid_idx.dbl_value]
+        dbl_list.extend(sep_list)
 
+        # compute and shift all track indices at once
+        ans = HalfIntArray(list(accumulate(dbl_list)))
         if align_track is not None:
-            delta = align_track - ans[align_idx]
-            for idx in range(num_wires):
-                ans[idx] += delta
+            ans += align_track - ans[align_idx]
         elif center_coord is not None:
             if num_wires & 1:
                 mid_coord = grid.track_to_coord(layer_id, ans[idx_half])
@@ -733,8 +774,7 @@ class TrackManager:
             coord_delta = center_coord - mid_coord
             delta = grid.coord_to_track(layer_id, coord_delta, mode=RoundMode.NEAREST)
             delta -= grid.coord_to_track(layer_id, 0)
-            for idx in range(num_wires):
-                ans[idx] += delta
+            ans += delta
 
         w1 = self.get_width(layer_id, type_list[-1])
         upper = grid.get_wire_bounds(layer_id, ans[-1], width=w1)[1]
@@ -744,7 +784,7 @@ class TrackManager:
         bot_idx = grid.coord_to_track(layer_id, lower, mode=RoundMode.LESS_EQ)
         ntr = top_idx - bot_idx
 
-        return ntr, ans
+        return ntr, ans.to_list()
 
     @classmethod
     def _get_align_delta(cls, tot_ntr: TrackType, num_used: TrackType, alignment: int) -> HalfInt:
@@ -915,6 +955,18 @@ class TrackManager:
         sp_override = self._tr_spaces.to_dict()
         sp_override[sp_type] = cur_dict = {layer_id: cur_sp}
 
+        # only separations that look up sp_type change during the search; compute the others
+        # once, and the rest once per unique wire pair per search step.
+        pair_list = [(type_list[idx - 1], type_list[idx]) for idx in range(1, len(type_list))]
+        fixed_seps: Dict[Tuple[Union[str, int], Union[str, int]], int] = {}
+        var_pairs: List[Tuple[Union[str, int], Union[str, int]]] = []
+        for pair in pair_list:
+            if pair not in fixed_seps and pair not in var_pairs:
+                if self._sep_uses_space(pair, sp_type):
+                    var_pairs.append(pair)
+                else:
+                    fixed_seps[pair] = self.get_sep(layer_id, pair).dbl_value
+
         if alignment < 0:
             align_track = lower
             align_idx = 0
@@ -937,9 +989,13 @@ class TrackManager:
                 break
             new_sp_dbl = bin_iter.get_next()
             cur_dict[layer_id] = HalfInt(new_sp_dbl)
-            result = self.place_wires(layer_id, type_list, align_track=align_track,
-                                      align_idx=align_idx, center_coord=center_coord,
-                                      sp_override=sp_override)[1]
+            pair_seps = dict(fixed_seps)
+            for pair in var_pairs:
+                pair_seps[pair] = self._compute_sep(layer_id, pair, False, self._half_space,
+                                                    sp_override).dbl_value
+            sep_list = [pair_seps[pair] for pair in pair_list]
+            result = self._place_wires_by_sep(layer_id, type_list, sep_list, align_track,
+                                              align_idx, center_coord)[1]
             if result[0] < lower or result[-1] > upper:
                 bin_iter.down()
             else:
@@ -44,12 +44,20 @@
 """This module defines classes that provides automatic fill utility on a grid.
 """
 
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Sequence, Callable, Any, Dict
 
+import functools
 import dataclasses
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 from bag.util.search import BinaryIterator, minimize_cost_golden
 
+# bounded LRU cache of fill solutions, keyed on the full argument tuple of each solver.
+_fill_cache: OrderedDict = OrderedDict()
+_fill_cache_size = 4096
+
 
 @dataclasses.dataclass(eq=True)
 class FillInfo:
@@ -119,6 +127,159 @@ class FillInfo:
         return fom
 
 
+@dataclasses.dataclass(frozen=True)
+class FillSpec:
+    """The arguments of a single 1-D symmetric fill problem.
+
+    See fill_symmetric_max_density_info() for a description of each field.
+    """
+    area: int
+    n_min: int
+    n_max: int
+    sp_min: int
+    area_specs: Tuple[Tuple[int, int, int], ...]
+    sp_max: Optional[int] = None
+    fill_on_edge: bool = True
+    cyclic: bool = False
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, 'area_specs', _to_key(self.area_specs))
+
+
+def set_fill_cache_size(max_size: int) -> None:
+    """Set the maximum number of fill solutions kept in the cache.
+
+    Parameters
+    ----------
+    max_size : int
+        maximum number of cached solutions.  0 to disable caching.
+    """
+    global _fill_cache_size
+    _fill_cache_size = max(max_size, 0)
+    while len(_fill_cache) > _fill_cache_size:
+        _fill_cache.popitem(last=False)
+
+
+def clear_fill_cache() -> None:
+    """Remove all cached fill solutions."""
+    _fill_cache.clear()
+
+
+def _to_key(obj: Any) -> Any:
+    if isinstance(obj, (list, tuple)):
+        return tuple((_to_key(v) for v in obj))
+    return obj
+
+
+def _get_fill_key(fun_name: str, args: Sequence[Any], kwargs: Dict[str, Any]) -> Tuple[Any, ...]:
+    return fun_name, _to_key(args), tuple(sorted(kwargs.items()))
+
+
+def _fill_cache_get(key: Tuple[Any, ...]) -> Optional[FillInfo]:
+    info = _fill_cache.get(key, None)
+    if info is None:
+        return None
+    _fill_cache.move_to_end(key)
+    # return a copy, as callers are allowed to modify the returned object
+    return dataclasses.replace(info)
+
+
+def _fill_cache_put(key: Tuple[Any, ...], info: FillInfo) -> None:
+    if _fill_cache_size > 0:
+        _fill_cache[key] = dataclasses.replace(info)
+        _fill_cache.move_to_end(key)
+        if len(_fill_cache) > _fill_cache_size:
+            _fill_cache.popitem(last=False)
+
+
+def _cache_fill_info(fun: Callable[..., FillInfo]) -> Callable[..., FillInfo]:
+    """Decorator that memoizes a fill solver in the fill solution cache.
+
+    Exceptions are not cached.
+    """
+    fun_name = fun.__name__
+
+    @functools.wraps(fun)
+    def wrapper(*args: Any, **kwargs: Any) -> FillInfo:
+        key = _get_fill_key(fun_name, args, kwargs)
+        info = _fill_cache_get(key)
+        if info is None:
+            info = fun(*args, **kwargs)
+            _fill_cache_put(key, info)
+        return info
+
+    return wrapper
+
+
+def _get_spec_call(spec: FillSpec, min_density: bool
+                   ) -> Tuple[Callable[..., FillInfo], Tuple[Any, ...], Dict[str, Any]]:
+    fun = fill_symmetric_min_density_info if min_density else fill_symmetric_max_density_info
+    args = (spec.area, spec.n_min, spec.n_max, spec.sp_min, spec.area_specs)
+    kwargs = dict(sp_max=spec.sp_max, fill_on_edge=spec.fill_on_edge, cyclic=spec.cyclic)
+    return fun, args, kwargs
+
+
+def _solve_fill_spec(spec: FillSpec, min_density: bool) -> FillInfo:
+    fun, args, kwargs = _get_spec_call(spec, min_density)
+    return fun(*args, **kwargs)
+
+
+def fill_symmetric_info_batch(specs: Sequence[FillSpec], min_density: bool = False,
+                              max_workers: int = 0) -> List[FillInfo]:
+    """Solve many 1-D symmetric fill problems at once.
+
+    Identical problems are solved only once, and problems already in the fill solution cache
+    are not solved again.  The remaining problems are distributed to a pool of worker
+    processes, and their solutions are added to the cache.
+
+    Parameters
+    ----------
+    specs : Sequence[FillSpec]
+        the fill problems.
+    min_density : bool
+        If True, solve with fill_symmetric_min_density_info().  Otherwise, solve with
+        fill_symmetric_max_density_info().
+    max_workers : int
+        maximum number of worker processes.  If 0, defaults to system CPU count.  If 1,
+        all problems are solved in the current process.
+
+    Returns
+    -------
+    info_list : List[FillInfo]
+        the fill information objects, in the same order as specs.
+    """
+    results: Dict[FillSpec, FillInfo] = {}
+    todo: Dict[FillSpec, Tuple[Any, ...]] = {}
+    for spec in specs:
+        if spec not in results and spec not in todo:
+            fun, args, kwargs = _get_spec_call(spec, min_density)
+            key = _get_fill_key(fun.__name__, args, kwargs)
+            info = _fill_cache_get(key)
+            if info is None:
+                todo[spec] = key
+            else:
+                results[spec] = info
+
+    if todo:
+        if max_workers == 0:
+            max_workers = multiprocessing.cpu_count()
+        max_workers = min(max_workers, len(todo))
+        todo_list = list(todo.keys())
+        if max_workers <= 1:
+            info_list = [_solve_fill_spec(spec, min_density) for spec in todo_list]
+        else:
+            chunksize = max(1, len(todo_list) // (4 * max_workers))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                info_list = list(executor.map(_solve_fill_spec, todo_list,
+                                              [min_density] * len(todo_list),
+                                              chunksize=chunksize))
+        for spec, info in zip(todo_list, info_list):
+            _fill_cache_put(todo[spec], info)
+            results[spec] = info
+
+    return [dataclasses.replace(results[spec]) for spec in specs]
+
+
 def fill_symmetric_max_density(area: int, n_min: int, n_max: int, sp_min: int,
                                area_specs: List[Tuple[int, int, int]],
                                sp_max: Optional[int] = None, fill_on_edge: bool = True,
@@ -173,6 +334,7 @@ def fill_symmetric_min_density(area: int, n_min: int, n_max: int, sp_min: int,
     return fill_symmetric_interval(info)
 
 
+@_cache_fill_info
 def fill_symmetric_min_density_info(area: int, n_min: int, n_max: int, sp_min: int,
                                     area_specs: List[Tuple[int, int, int]],
                                     sp_max: Optional[int] = None, fill_on_edge: bool = True,
@@ -274,6 +436,7 @@ def fill_symmetric_min_density_info(area: int, n_min: int, n_max: int, sp_min: i
     return last_save
 
 
+@_cache_fill_info
 def fill_symmetric_max_density_info(area: int, n_min: int, n_max: int, sp_min: int,
                                     area_specs: List[Tuple[int, int, int]],
                                     sp_max: Optional[int] = None, fill_on_edge: bool = True,
@@ -401,6 +564,7 @@ class EmptyRegionError(ValueError):
     pass
 
 
+@_cache_fill_info
 def fill_symmetric_max_num_info(tot_area: int, nfill: int, n_min: int, n_max: int, sp_min: int,
                                 fill_on_edge: bool = True, cyclic: bool = False) -> FillInfo:
     """Fill the given 1-D area as much as possible with given number of fill blocks.
@@ -624,6 +788,7 @@ def fill_symmetric_helper(tot_area: int, num_blk_tot: int, sp: int,
     return fill_symmetric_interval(fill_info)
 
 
+@_cache_fill_info
 def _fill_symmetric_info(tot_area: int, num_blk_tot: int, sp: int, inc_sp: bool = True,
                          fill_on_edge: bool = True, cyclic: bool = False) -> FillInfo:
     """Calculate symmetric fill information.
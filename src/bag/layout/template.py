@@ -68,7 +68,7 @@ from pybag.core import (
 from ..util.immutable import ImmutableSortedDict, Param
 from ..util.cache import DesignMaster, MasterDB, format_cell_name
 from ..util.interval import IntervalSet
-from ..util.math import HalfInt
+from ..util.math import HalfInt, HalfIntArray
 from ..design.module import Module
 
 from .core import PyLayInstance
@@ -1858,18 +1858,29 @@ class TemplateBase(DesignMaster):
         if include_last:
             htr1 += 1
         htr_sep = HalfInt.convert(sep).dbl_value
+
+        # Scan with a galloping window: a single intersection query on the bounding box of
+        # a range of tracks proves that all of them are free.  The window doubles after every
+        # free range, and shrinks down to single tracks near existing geometries, so sparse
+        # regions take a logarithmic number of queries.
         ans = []
         cur_htr = htr0
+        span = 1
         while cur_htr < htr1:
-            mid = grid.htr_to_coord(layer_id, cur_htr)
-            box = BBox(orient, lower, upper, mid - tr_w2, mid + tr_w2)
+            last_htr = min(cur_htr + span, htr1) - 1
+            box = BBox(orient, lower, upper, grid.htr_to_coord(layer_id, cur_htr) - tr_w2,
+                       grid.htr_to_coord(layer_id, last_htr) + tr_w2)
             if not self._layout.get_intersect(layer_id, box, spx, spy, False):
-                ans.append(HalfInt(cur_htr))
-                cur_htr += htr_sep
-            else:
+                num = (last_htr - cur_htr) // htr_sep + 1
+                ans.append(HalfIntArray.arange(HalfInt(cur_htr), num, HalfInt(htr_sep)))
+                cur_htr += num * htr_sep
+                span *= 2
+            elif last_htr == cur_htr:
                 cur_htr += 1
+            else:
+                span = (last_htr - cur_htr + 1) // 2
 
-        return ans
+        return [tidx for arr in ans for tidx in arr.to_list()]
 
     def connect_wires(self, wire_arr_list: Union[WireArray, List[WireArray]], *,
                       lower: Optional[int] = None,
@@ -2617,15 +2628,31 @@ class TemplateBase(DesignMaster):
                         box_edges = cast(Optional[TemplateEdgeInfo], lookup.pop(item_id))
                         _update_device_fill_area(lookup, ed, inst_box, inst_edges, box, box_edges)
 
+        # group fill regions by (width, height, edges), so each group shares one master
+        fill_groups: Dict[Tuple[int, int, Any], Tuple[Optional[TemplateEdgeInfo],
+                                                      List[Tuple[int, int]]]] = {}
+        for box, obj_id in lookup:
+            edges = cast(Optional[TemplateEdgeInfo], lookup[obj_id])
+            w = box.w
+            h = box.h
+            key = (w, h, None if edges is None else edges.to_tuple())
+            group = fill_groups.get(key, None)
+            if group is None:
+                fill_groups[key] = (edges, [(box.xl, box.yl)])
+            else:
+                group[1].append((box.xl, box.yl))
+
         # draw fill
         cnt = 0
-        for box, obj_id in lookup:
-            kwargs['width'] = box.w
-            kwargs['height'] = box.h
-            kwargs['edges'] = lookup[obj_id]
+        for (w, h, _), (edges, loc_list) in fill_groups.items():
+            kwargs['width'] = w
+            kwargs['height'] = h
+            kwargs['edges'] = edges
             master = self.new_template(fill_cls, params=kwargs)
-            self.add_instance(master, inst_name=f'XFILL{cnt}', xform=Transform(box.xl, box.yl))
-            cnt += 1
+            for xl, yl, nx, ny in _get_fill_arrays(loc_list, w, h):
+                self.add_instance(master, inst_name=f'XFILL{cnt}', xform=Transform(xl, yl),
+                                  nx=nx, ny=ny, spx=w, spy=h)
+                cnt += 1
 
     def get_lef_options(self, options: Dict[str, Any], config: Mapping[str, Any]) -> None:
         """Populate the LEF options dictionary.
@@ -2657,6 +2684,46 @@ class TemplateBase(DesignMaster):
         options['cell_type'] = config.get('cell_type', 'block')
 
 
+def _get_fill_arrays(loc_list: List[Tuple[int, int]], w: int, h: int
+                     ) -> List[Tuple[int, int, int, int]]:
+    """Merge abutting fill regions of the same size into instance arrays.
+
+    Parameters
+    ----------
+    loc_list : List[Tuple[int, int]]
+        list of lower-left corners of the fill regions.
+    w : int
+        the fill region width.
+    h : int
+        the fill region height.
+
+    Returns
+    -------
+    ans : List[Tuple[int, int, int, int]]
+        list of (xl, yl, nx, ny) arrays covering all fill regions.
+    """
+    # merge regions in the same row into runs
+    runs: List[Tuple[int, int, int]] = []
+    for xl, yl in sorted(loc_list, key=lambda v: (v[1], v[0])):
+        if runs:
+            rx, ry, rn = runs[-1]
+            if ry == yl and rx + rn * w == xl:
+                runs[-1] = (rx, ry, rn + 1)
+                continue
+        runs.append((xl, yl, 1))
+
+    # stack runs with the same horizontal extent into arrays
+    ans: List[Tuple[int, int, int, int]] = []
+    for xl, yl, nx in sorted(runs):
+        if ans:
+            ax, ay, anx, any_ = ans[-1]
+            if ax == xl and anx == nx and ay + any_ * h == yl:
+                ans[-1] = (ax, ay, anx, any_ + 1)
+                continue
+        ans.append((xl, yl, nx, 1))
+    return ans
+
+
 def _update_device_fill_area(lookup: RTree, ed: Param, inst_box: BBox, inst_edges: TemplateEdgeInfo,
                              sp_box: BBox, sp_edges: Optional[TemplateEdgeInfo]) -> None:
     # find instance edge with no constraints
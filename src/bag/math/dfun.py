@@ -240,6 +240,17 @@ class DiffFunction(abc.ABC):
         """
         return InLinTransformFunction(self, amat, bmat)
 
+    def fuse(self):
+        # type: () -> FusedDiffFunction
+        """Returns an equivalent function that evaluates this expression as a flattened graph.
+
+        Returns
+        -------
+        dfun : FusedDiffFunction
+            the fused differential function.
+        """
+        return FusedDiffFunction(self)
+
     def __add__(self, other):
         # type: (Union[DiffFunction, float, int, np.multiarray.ndarray]) -> DiffFunction
         if isinstance(other, DiffFunction):
@@ -675,3 +686,325 @@ class VectorDiffFunction(object):
             The derivatives at the given coordinates.
         """
         return self._fun_list[i].deriv(xi, j)
+
+
+# opcodes of DiffFunctionGraph
+_OP_LEAF = 0
+_OP_SCALE_ADD = 1
+_OP_SUM = 2
+_OP_PROD = 3
+_OP_DIV = 4
+_OP_PWR = 5
+
+_AffineFrame = Tuple[Optional[np.ndarray], Optional[np.ndarray]]
+
+
+class DiffFunctionGraph(object):
+    """A flattened evaluation graph of one or more composed DiffFunctions.
+
+    Arithmetic on DiffFunctions produces a tree of function objects, where each node
+    evaluates its children recursively.  This class flattens the trees into a list of
+    operations in topological order.  Identical sub-expressions are evaluated only once,
+    and all input linear transformations are folded into a single affine map per leaf
+    function.  Values and Jacobians of all outputs are computed for a whole batch of
+    points in one pass.
+
+    Parameters
+    ----------
+    fun_list : List[DiffFunction]
+        list of output functions.  All functions must have the same input dimension.
+    """
+
+    def __init__(self, fun_list):
+        # type: (List[DiffFunction]) -> None
+        if not fun_list:
+            raise ValueError('No functions are given.')
+
+        self._ndim = fun_list[0].ndim
+        for fun in fun_list:
+            if fun.ndim != self._ndim:
+                raise ValueError('functions dimension mismatch.')
+
+        # each frame is an affine map (M, c) from graph input to leaf function input.
+        # frame 0 is the identity map.
+        self._frames = [(None, None)]  # type: List[_AffineFrame]
+        self._ops = []  # type: List[tuple]
+
+        frame_table = {}  # type: dict
+        node_table = {}  # type: dict
+        visited = {}  # type: dict
+        self._out_list = [self._add_function(fun, frame_table, node_table, visited)
+                          for fun in fun_list]
+
+        # compute when each intermediate result can be released
+        last_use = {}  # type: dict
+        for idx, op in enumerate(self._ops):
+            for arg in _get_op_args(op):
+                last_use[arg] = idx
+        out_set = set(self._out_list)
+        self._release = [[] for _ in range(len(self._ops))]  # type: List[List[int]]
+        for arg, idx in last_use.items():
+            if arg not in out_set:
+                self._release[idx].append(arg)
+
+    @property
+    def ndim(self):
+        # type: () -> int
+        """Number of input dimensions."""
+        return self._ndim
+
+    @property
+    def out_dim(self):
+        # type: () -> int
+        """Number of outputs."""
+        return len(self._out_list)
+
+    @property
+    def num_ops(self):
+        # type: () -> int
+        """Number of operations after common sub-expression elimination."""
+        return len(self._ops)
+
+    def _get_frame(self, frame, amat, bmat, frame_table):
+        # type: (int, np.ndarray, np.ndarray, dict) -> int
+        mmat, cvec = self._frames[frame]
+        bvec = bmat.reshape(-1)
+        if mmat is None:
+            new_m = np.array(amat, dtype=float)
+            new_c = np.array(bvec, dtype=float)
+        else:
+            new_m = amat.dot(mmat)
+            new_c = amat.dot(cvec) + bvec
+
+        key = (new_m.shape, new_m.tobytes(), new_c.tobytes())
+        idx = frame_table.get(key, None)
+        if idx is None:
+            idx = frame_table[key] = len(self._frames)
+            self._frames.append((new_m, new_c))
+        return idx
+
+    def _add_function(self, root, frame_table, node_table, visited):
+        # type: (DiffFunction, dict, dict, dict) -> int
+        # iterative post-order traversal, so deep expressions do not hit the recursion limit
+        stack = [(root, 0)]
+        while stack:
+            fun, frame = stack[-1]
+            vkey = (id(fun), frame)
+            if vkey in visited:
+                stack.pop()
+                continue
+
+            if isinstance(fun, InLinTransformFunction):
+                children = [(fun._f1, self._get_frame(frame, fun._amat, fun._bmat,
+                                                      frame_table))]
+            elif isinstance(fun, (SumDiffFunction, ProdFunction, DivFunction)):
+                children = [(fun._f1, frame), (fun._f2, frame)]
+            elif isinstance(fun, ScaleAddFunction):
+                children = [(fun._f1, frame)]
+            elif isinstance(fun, PwrFunction):
+                children = [(fun._f, frame)]
+            elif isinstance(fun, FusedDiffFunction) and fun.graph.out_dim == 1:
+                children = [(fun.base_function, frame)]
+            else:
+                children = []
+
+            pending = [item for item in children if (id(item[0]), item[1]) not in visited]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            args = tuple((visited[(id(child), cframe)] for child, cframe in children))
+            if isinstance(fun, (InLinTransformFunction, FusedDiffFunction)) and args:
+                # these nodes only change the input frame
+                visited[vkey] = args[0]
+                continue
+
+            if isinstance(fun, SumDiffFunction):
+                op = (_OP_SUM, args[0], args[1], fun._f2_sgn)
+            elif isinstance(fun, ProdFunction):
+                op = (_OP_PROD, args[0], args[1])
+            elif isinstance(fun, DivFunction):
+                op = (_OP_DIV, args[0], args[1])
+            elif isinstance(fun, ScaleAddFunction):
+                op = (_OP_SCALE_ADD, args[0], fun._adder, fun._scaler)
+            elif isinstance(fun, PwrFunction):
+                op = (_OP_PWR, args[0], fun._pwr, fun._scale)
+            else:
+                op = (_OP_LEAF, fun, frame)
+
+            # leaf functions are compared by identity, other nodes structurally
+            key = (_OP_LEAF, id(fun), frame) if op[0] == _OP_LEAF else op
+            idx = node_table.get(key, None)
+            if idx is None:
+                idx = node_table[key] = len(self._ops)
+                self._ops.append(op)
+            visited[vkey] = idx
+
+        return visited[(id(root), 0)]
+
+    def evaluate(self, xi, jacobian=True):
+        # type: (Union[np.ndarray, list], bool) -> Tuple[np.ndarray, Optional[np.ndarray]]
+        """Evaluate all outputs, and optionally their Jacobians, at the given coordinates.
+
+        Parameters
+        ----------
+        xi : array_like
+            The coordinates to evaluate, with shape (..., ndim)
+        jacobian : bool
+            True to also compute the Jacobian matrices.
+
+        Returns
+        -------
+        val : np.ndarray
+            The output values, with shape (..., out_dim).
+        jmat : Optional[np.ndarray]
+            The Jacobian matrices, with shape (..., out_dim, ndim).  None if jacobian is False.
+        """
+        xi = np.asarray(xi, dtype=float)
+        ndim = self._ndim
+        if xi.shape[-1] != ndim:
+            raise ValueError("The requested sample points xi have dimension %d, "
+                             "but this function has dimension %d" % (xi.shape[-1], ndim))
+
+        shape_trunc = xi.shape[:-1]  # type: Tuple[int, ...]
+        xmat = xi.reshape(-1, ndim)
+        num = xmat.shape[0]
+
+        frame_vals = [xmat]
+        for mmat, cvec in self._frames[1:]:
+            frame_vals.append(xmat.dot(mmat.T) + cvec)
+
+        vals = [None] * len(self._ops)  # type: List[Optional[np.ndarray]]
+        jacs = [None] * len(self._ops)  # type: List[Optional[np.ndarray]]
+        for idx, op in enumerate(self._ops):
+            code = op[0]
+            jac = None
+            if code == _OP_LEAF:
+                fun, frame = op[1], op[2]
+                farg = frame_vals[frame]
+                val = np.broadcast_to(np.asarray(fun(farg), dtype=float), (num,))
+                if jacobian:
+                    jac = np.asarray(fun.jacobian(farg), dtype=float)
+                    jac = jac.reshape(num, farg.shape[1])
+                    mmat = self._frames[frame][0]
+                    if mmat is not None:
+                        jac = jac.dot(mmat)
+            elif code == _OP_SCALE_ADD:
+                va = vals[op[1]]
+                val = va * op[3] + op[2]
+                if jacobian:
+                    jac = jacs[op[1]] * op[3]
+            elif code == _OP_SUM:
+                va, vb, sgn = vals[op[1]], vals[op[2]], op[3]
+                val = va + sgn * vb
+                if jacobian:
+                    jac = jacs[op[1]] + sgn * jacs[op[2]]
+            elif code == _OP_PROD:
+                va, vb = vals[op[1]], vals[op[2]]
+                val = va * vb
+                if jacobian:
+                    jac = jacs[op[1]] * vb[:, np.newaxis] + va[:, np.newaxis] * jacs[op[2]]
+            elif code == _OP_DIV:
+                vb = vals[op[2]]
+                val = vals[op[1]] / vb
+                if jacobian:
+                    jac = (jacs[op[1]] - val[:, np.newaxis] * jacs[op[2]]) / vb[:, np.newaxis]
+            else:
+                va, pwr, scale = vals[op[1]], op[2], op[3]
+                val = (va ** pwr) * scale
+                if jacobian:
+                    jac = jacs[op[1]] * ((va ** (pwr - 1)) * (pwr * scale))[:, np.newaxis]
+
+            vals[idx] = val
+            jacs[idx] = jac
+            for rel_idx in self._release[idx]:
+                vals[rel_idx] = jacs[rel_idx] = None
+
+        out_dim = len(self._out_list)
+        ans = np.empty((num, out_dim))
+        for oidx, nidx in enumerate(self._out_list):
+            ans[:, oidx] = vals[nidx]
+        ans = ans.reshape(shape_trunc + (out_dim,))
+        if not jacobian:
+            return ans, None
+
+        jmat = np.empty((num, out_dim, ndim))
+        for oidx, nidx in enumerate(self._out_list):
+            jmat[:, oidx, :] = jacs[nidx]
+        return ans, jmat.reshape(shape_trunc + (out_dim, ndim))
+
+
+def _get_op_args(op):
+    # type: (tuple) -> Tuple[int, ...]
+    code = op[0]
+    if code == _OP_LEAF:
+        return ()
+    if code == _OP_SUM or code == _OP_PROD or code == _OP_DIV:
+        return op[1], op[2]
+    return op[1],
+
+
+class FusedDiffFunction(DiffFunction):
+    """A DiffFunction that evaluates a composed DiffFunction using a DiffFunctionGraph.
+
+    Parameters
+    ----------
+    fun : DiffFunction
+        the composed function.
+    """
+
+    def __init__(self, fun):
+        # type: (DiffFunction) -> None
+        DiffFunction.__init__(self, fun.input_ranges, delta_list=None)
+        self._fun = fun
+        self._graph = DiffFunctionGraph([fun])
+
+        # InLinTransformFunction returns Jacobians with shape (..., 1, ndim); keep that shape so
+        # the fused function stays a drop-in replacement.
+        base = fun
+        while isinstance(base, FusedDiffFunction):
+            base = base.base_function
+        self._jac_keep_out_dim = isinstance(base, InLinTransformFunction)
+
+    @property
+    def base_function(self):
+        # type: () -> DiffFunction
+        """The original composed function."""
+        return self._fun
+
+    @property
+    def graph(self):
+        # type: () -> DiffFunctionGraph
+        return self._graph
+
+    def __call__(self, xi):
+        return self._graph.evaluate(xi, jacobian=False)[0][..., 0]
+
+    def deriv(self, xi, j):
+        return self._graph.evaluate(xi, jacobian=True)[1][..., 0, j]
+
+    def jacobian(self, xi):
+        return self._get_jacobian(self._graph.evaluate(xi, jacobian=True)[1])
+
+    def _get_jacobian(self, jmat):
+        # type: (np.ndarray) -> np.ndarray
+        return jmat if self._jac_keep_out_dim else jmat[..., 0, :]
+
+    def evaluate(self, xi):
+        """Calculate both the values and the Jacobians at the given coordinates.
+
+        Parameters
+        ----------
+        xi : array_like
+            The coordinates to evaluate, with shape (..., ndim)
+
+        Returns
+        -------
+        val : np.ndarray
+            The values at the given coordinates.
+        jmat : np.ndarray
+            The Jacobian matrices at the given coordinates.
+        """
+        val, jmat = self._graph.evaluate(xi, jacobian=True)
+        return val[..., 0], self._get_jacobian(jmat)
@@ -46,6 +46,12 @@
 
 from typing import List, Tuple, Union, Sequence
 
+import os
+import hashlib
+import itertools
+from pathlib import Path
+from collections import OrderedDict
+
 import numpy as np
 import scipy.interpolate as interp
 import scipy.ndimage.interpolation as imag_interp
@@ -53,7 +59,108 @@ import scipy.ndimage.interpolation as imag_interp
 from ..math.dfun import DiffFunction
 
 __author__ = 'erichang'
-__all__ = ['interpolate_grid', 'LinearInterpolator']
+__all__ = ['interpolate_grid', 'LinearInterpolator', 'set_interp_cache', 'clear_interp_cache']
+
+# directory of the on-disk coefficient cache.  Empty string to disable.
+_cache_dir = os.environ.get('BAG_INTERP_CACHE_DIR', '')  # type: str
+# in-process LRU cache of fitted splines/prefiltered coefficients.
+_mem_cache = OrderedDict()  # type: OrderedDict[str, object]
+_mem_cache_size = 128  # type: int
+
+
+def set_interp_cache(cache_dir=None, max_size=None):
+    # type: (Union[str, Path, None], Union[int, None]) -> None
+    """Configure the interpolator coefficient caches.
+
+    Fitting splines on large N-dimensional grids is expensive, so fitted splines and
+    prefiltered coefficients are cached in memory, keyed on a digest of the data.
+    The prefiltered coefficients of MapCoordinateSpline are also saved as .npy files in
+    the cache directory, and are memory-mapped when loaded.  The cache directory defaults
+    to the environment variable BAG_INTERP_CACHE_DIR.
+
+    Parameters
+    ----------
+    cache_dir : Optional[Union[str, Path]]
+        the on-disk cache directory.  Empty string to disable on-disk caching.
+        None to keep the current setting.
+    max_size : Optional[int]
+        maximum number of entries in the in-process cache.  None to keep the current setting.
+    """
+    global _cache_dir, _mem_cache_size
+    if cache_dir is not None:
+        _cache_dir = str(cache_dir)
+    if max_size is not None:
+        _mem_cache_size = max_size
+        while len(_mem_cache) > _mem_cache_size:
+            _mem_cache.popitem(last=False)
+
+
+def clear_interp_cache():
+    # type: () -> None
+    """Clear the in-process interpolator cache."""
+    _mem_cache.clear()
+
+
+def _get_cache_key(values, scale_list, method, *args):
+    # type: (np.ndarray, Sequence[Tuple[float, float]], str, object) -> str
+    """Returns the content digest of the given interpolation data."""
+    values = np.ascontiguousarray(values)
+    scales = [(float(offset), float(scale)) for offset, scale in scale_list]
+    hobj = hashlib.blake2b(digest_size=20)
+    hobj.update(repr((values.dtype.str, values.shape, scales, method, args)).encode('utf-8'))
+    hobj.update(memoryview(values).cast('B'))
+    return hobj.hexdigest()
+
+
+def _cache_get(key):
+    # type: (str) -> object
+    ans = _mem_cache.get(key, None)
+    if ans is not None:
+        _mem_cache.move_to_end(key)
+    return ans
+
+
+def _cache_put(key, val):
+    # type: (str, object) -> None
+    if _mem_cache_size > 0:
+        _mem_cache[key] = val
+        _mem_cache.move_to_end(key)
+        while len(_mem_cache) > _mem_cache_size:
+            _mem_cache.popitem(last=False)
+
+
+def _get_cached_array(key, compute_fn):
+    # type: (str, object) -> np.ndarray
+    """Returns the cached array with the given key, computing and caching it if necessary."""
+    ans = _cache_get(key)
+    if ans is not None:
+        return ans
+
+    fpath = Path(_cache_dir, key + '.npy') if _cache_dir else None
+    if fpath is not None and fpath.is_file():
+        try:
+            ans = np.load(str(fpath), mmap_mode='r')
+        except (OSError, ValueError):
+            # corrupted cache file, just recompute
+            ans = None
+
+    if ans is None:
+        ans = compute_fn()
+        if fpath is not None:
+            # write to temporary file first, so concurrent readers never see partial files.
+            tmp_path = fpath.with_name('{}.{}.tmp'.format(fpath.name, os.getpid()))
+            try:
+                fpath.parent.mkdir(parents=True, exist_ok=True)
+                with open(str(tmp_path), 'wb') as f:
+                    np.save(f, ans)
+                os.replace(str(tmp_path), str(fpath))
+            except OSError:
+                # on-disk caching is best-effort only
+                if tmp_path.exists():
+                    tmp_path.unlink()
+
+    _cache_put(key, ans)
+    return ans
 
 
 def _scales_to_points(scale_list,  # type: List[Tuple[float, float]]
@@ -141,7 +248,7 @@ class LinearInterpolator(DiffFunction):
     """A linear interpolator on a regular grid for arbitrary dimensions.
 
     This class is backed by scipy.interpolate.RegularGridInterpolator.
-    Derivatives are calculated using finite difference.
+    Derivatives are calculated exactly from the grid cell and interpolation weights.
 
     Parameters
     ----------
@@ -160,6 +267,7 @@ class LinearInterpolator(DiffFunction):
         input_range = [(pvec[0], pvec[-1]) for pvec in points]
         DiffFunction.__init__(self, input_range, delta_list=delta_list)
         self._points = points
+        self._values = values
         self._extrapolate = extrapolate
         self.fun = interp.RegularGridInterpolator(points, values, method='linear',
                                                   bounds_error=not extrapolate,
@@ -188,6 +296,88 @@ class LinearInterpolator(DiffFunction):
             return ans[0]
         return ans
 
+    def deriv(self, xi, j):
+        """Calculate the derivative at the given coordinates with respect to input j.
+
+        Parameters
+        ----------
+        xi : array_like
+            The coordinates to evaluate, with shape (..., ndim)
+        j : int
+            input index.
+
+        Returns
+        -------
+        val : np.multiarray.ndarray
+            The derivatives at the given coordinates.
+        """
+        if j < 0 or j >= self.ndim:
+            raise ValueError('Invalid derivative index: %d' % j)
+        ans = self.jacobian(xi)[..., j]
+        if ans.size == 1 and not np.isscalar(ans):
+            return ans.item()
+        return ans
+
+    def jacobian(self, xi):
+        """Calculate the Jacobian at the given coordinates.
+
+        The gradient of the piecewise multilinear interpolant is computed exactly from the
+        grid cell indices and interpolation weights.  On grid lines, the derivative of the
+        cell on the lower side is returned.
+
+        Parameters
+        ----------
+        xi : array_like
+            The coordinates to evaluate, with shape (..., ndim)
+
+        Returns
+        -------
+        val : np.multiarray.ndarray
+            The Jacobian matrices at the given coordinates.
+        """
+        xi = np.asarray(xi, dtype=float)
+        ndim = self.ndim
+        if xi.shape[-1] != ndim:
+            raise ValueError("The requested sample points xi have dimension %d, "
+                             "but this interpolator has dimension %d" % (xi.shape[-1], ndim))
+
+        xmat = xi.reshape(-1, ndim)
+        idx_list = []
+        wgt_list = []
+        inv_h_list = []
+        for j, pvec in enumerate(self._points):
+            xvec = xmat[:, j]
+            if not self._extrapolate and (np.any(xvec < pvec[0]) or np.any(xvec > pvec[-1])):
+                raise ValueError('One of the requested xi is out of bounds in dimension %d' % j)
+
+            # same cell search as RegularGridInterpolator
+            idx = np.searchsorted(pvec, xvec) - 1
+            np.clip(idx, 0, pvec.size - 2, out=idx)
+            inv_h = 1.0 / (pvec[idx + 1] - pvec[idx])
+            idx_list.append(idx)
+            wgt_list.append((xvec - pvec[idx]) * inv_h)
+            inv_h_list.append(inv_h)
+
+        ans = np.zeros(xmat.shape)
+        for corner in itertools.product((0, 1), repeat=ndim):
+            cval = self._values[tuple((idx + c for idx, c in zip(idx_list, corner)))]
+            # weight of this corner along each dimension, and its derivative
+            fac_list = [wgt if c else 1 - wgt for wgt, c in zip(wgt_list, corner)]
+            # prefix and suffix products, so each partial derivative takes O(1) operations
+            prefix = [cval]
+            for fac in fac_list[:-1]:
+                prefix.append(prefix[-1] * fac)
+            suffix = None
+            for j in range(ndim - 1, -1, -1):
+                term = prefix[j] if suffix is None else prefix[j] * suffix
+                if corner[j]:
+                    ans[:, j] += term * inv_h_list[j]
+                else:
+                    ans[:, j] -= term * inv_h_list[j]
+                suffix = fac_list[j] if suffix is None else suffix * fac_list[j]
+
+        return ans.reshape(xi.shape)
+
     def integrate(self, xstart, xstop, axis=-1, logx=False, logy=False, raw=False):
         # type: (float, float, int, bool, bool, bool) -> Union[LinearInterpolator, np.ndarray]
         """Integrate away the given axis.
@@ -356,7 +546,12 @@ class Interpolator1D(DiffFunction):
         DiffFunction.__init__(self, [(points[0], points[-1])], delta_list=None)
 
         ext = 0 if extrapolate else 2
-        self.fun = interp.InterpolatedUnivariateSpline(points, values, k=k, ext=ext)
+        key = _get_cache_key(values, scale_list, 'univariate_spline', k, ext)
+        fun = _cache_get(key)
+        if fun is None:
+            fun = interp.InterpolatedUnivariateSpline(points, values, k=k, ext=ext)
+            _cache_put(key, fun)
+        self.fun = fun
 
     def __call__(self, xi):
         """Interpolate at the given coordinate.
@@ -433,7 +628,12 @@ class Spline2D(DiffFunction):
 
         DiffFunction.__init__(self, [(x[0], x[-1]), (y[0], y[-1])], delta_list=None)
 
-        self.fun = interp.RectBivariateSpline(x, y, values)
+        key = _get_cache_key(values, scale_list, 'rect_bivariate_spline')
+        fun = _cache_get(key)
+        if fun is None:
+            fun = interp.RectBivariateSpline(x, y, values)
+            _cache_put(key, fun)
+        self.fun = fun
         self._extrapolate = extrapolate
 
     def _get_xy(self, xi):
@@ -497,8 +697,8 @@ class MapCoordinateSpline(DiffFunction):
     """A spline interpolator on a regular grid for multidimensional data.
 
     The spline interpolation is done using map_coordinate method in the
-    scipy.ndimage.interpolation package.  The derivative is done using
-    finite difference.
+    scipy.ndimage.interpolation package.  The derivative is computed analytically
+    from the B-spline coefficients.
 
     if extrapolate is True, we use linear interpolation for values outside of
     bounds.
@@ -544,11 +744,16 @@ class MapCoordinateSpline(DiffFunction):
         input_ranges = [(pvec[0], pvec[-1]) for pvec in points]
         self._extfun = LinearInterpolator(ext_points, values, [delta] * ndim, extrapolate=True)
 
-        xi_ext = np.stack(np.meshgrid(*(np.arange(0, n + 2 * num_extrapolate) for n in shape),
-                                      indexing='ij', copy=False), axis=-1)
+        def compute_filt_values():
+            xi_ext = np.stack(np.meshgrid(*(np.arange(0, n + 2 * num_extrapolate) for n in shape),
+                                          indexing='ij', copy=False), axis=-1)
+
+            values_ext = self._extfun(xi_ext)
+            return imag_interp.spline_filter(values_ext)
 
-        values_ext = self._extfun(xi_ext)
-        self._filt_values = imag_interp.spline_filter(values_ext)
+        # the prefiltered coefficients are expensive to compute, so cache them.
+        key = _get_cache_key(values, scale_list, 'map_coordinates', num_extrapolate)
+        self._filt_values = _get_cached_array(key, compute_filt_values)
 
         DiffFunction.__init__(self, input_ranges, delta_list=delta_list)
 
@@ -606,3 +811,115 @@ class MapCoordinateSpline(DiffFunction):
         if ans.size == 1:
             return ans[0]
         return ans.reshape(ans_shape)
+
+    def deriv(self, xi, j):
+        """Calculate the derivative at the given coordinates with respect to input j.
+
+        Parameters
+        ----------
+        xi : array_like
+            The coordinates to evaluate, with shape (..., ndim)
+        j : int
+            input index.
+
+        Returns
+        -------
+        val : np.multiarray.ndarray
+            The derivatives at the given coordinates.
+        """
+        if j < 0 or j >= self.ndim:
+            raise ValueError('Invalid derivative index: %d' % j)
+        ans = self.jacobian(xi)[..., j]
+        if ans.size == 1 and not np.isscalar(ans):
+            return ans.item()
+        return ans
+
+    def jacobian(self, xi):
+        """Calculate the Jacobian at the given coordinates.
+
+        The derivatives of the cubic B-spline basis functions are evaluated analytically
+        on the prefiltered coefficients.  Points outside of bounds use the gradient of the
+        linear extrapolation.
+
+        Parameters
+        ----------
+        xi : array_like
+            The coordinates to evaluate, with shape (..., ndim)
+
+        Returns
+        -------
+        val : np.multiarray.ndarray
+            The Jacobian matrices at the given coordinates.
+        """
+        ext = self._ext
+        ndim = self.ndim
+        xi_shape = np.shape(xi)
+        xi = self._normalize_inputs(xi).reshape(-1, ndim)
+
+        ext_idx_vec = False
+        for idx in range(ndim):
+            ext_idx_vec = ext_idx_vec | (xi[:, idx] < ext) | (xi[:, idx] > self._max[idx])
+
+        int_idx_vec = ~ext_idx_vec
+        xi_ext = xi[ext_idx_vec, :]
+        ans = np.empty(xi.shape)
+        ans[int_idx_vec, :] = self._spline_jacobian(xi[int_idx_vec, :])
+        if xi_ext.size > 0:
+            if not self._extrapolate:
+                raise ValueError('some inputs are out of bounds.')
+            ans[ext_idx_vec, :] = self._extfun.jacobian(xi_ext)
+
+        # convert derivatives from normalized coordinates
+        for idx, (_, scale) in enumerate(self._scale_list):
+            ans[:, idx] /= scale
+
+        return ans.reshape(xi_shape)
+
+    def _spline_jacobian(self, xi):
+        # type: (np.ndarray) -> np.ndarray
+        """Compute the spline Jacobian in normalized coordinates.
+
+        xi must be a 2D array of points in the interpolation region.
+        """
+        ndim = self.ndim
+        coeffs = self._filt_values
+        tap_vec = np.arange(-1, 3)
+        # subscripts for contracting a (num, 4, ..., 4) block with one weight vector per axis
+        letters = 'abcdefghijklmnopqrstuvwxy'[:ndim]
+        subscripts = 'z{},{}->z'.format(letters, ','.join(('z' + c for c in letters)))
+
+        ans = np.empty(xi.shape)
+        # process points in chunks to bound the size of the coefficient blocks
+        chunk = max(1, (1 << 20) // (4 ** ndim))
+        for start in range(0, xi.shape[0], chunk):
+            xcur = xi[start:start + chunk, :]
+            num = xcur.shape[0]
+            index_list = []
+            wgt_list = []
+            dwgt_list = []
+            for idx in range(ndim):
+                xvec = xcur[:, idx]
+                fvec = np.floor(xvec)
+                tvec = (xvec - fvec)[:, np.newaxis]
+                tsq = tvec * tvec
+                tcube = tsq * tvec
+                omt = 1 - tvec
+                wgt_list.append(np.hstack((omt * omt * omt, 3 * tcube - 6 * tsq + 4,
+                                           -3 * tcube + 3 * tsq + 3 * tvec + 1, tcube)) / 6)
+                dwgt_list.append(np.hstack((-omt * omt, 3 * tsq - 4 * tvec,
+                                            -3 * tsq + 2 * tvec + 1, tsq)) / 2)
+
+                cur_idx = fvec.astype(int)[:, np.newaxis] + tap_vec
+                np.clip(cur_idx, 0, coeffs.shape[idx] - 1, out=cur_idx)
+                new_shape = [num] + [1] * ndim
+                new_shape[idx + 1] = 4
+                index_list.append(cur_idx.reshape(new_shape))
+
+            block = coeffs[tuple(index_list)]
+            for idx in range(ndim):
+                wlist = list(wgt_list)
+                wlist[idx] = dwgt_list[idx]
+                ans[start:start + num, idx] = np.einsum(subscripts, block, *wlist,
+                                                        optimize=True)
+
+        return ans
@@ -45,6 +45,7 @@
 """
 
 import numpy as np
+import scipy.sparse as sparse
 import openmdao.api as omdao
 
 
@@ -56,6 +57,11 @@ class VecFunComponent(omdao.Component):
     a vector with the same size as the output.  If a vector input is given,
     each function will use a different element of the vector.
 
+    Output elements that use the same function object are evaluated together
+    in a single vectorized call.  Since each output element only depends on the
+    corresponding element of a vector parameter, the Jacobian with respect to a
+    vector parameter is returned as a sparse diagonal matrix.
+
     Parameters
     ----------
     output_name : str
@@ -69,10 +75,13 @@ class VecFunComponent(omdao.Component):
         set of parameters that are vector instead of scalar.  If a parameter
         is a vector, it will be the same size as the output, and each function
         only takes in the corresponding element of the parameter.
+    sparse_jacobian : bool
+        True to return Jacobians of vector parameters as sparse diagonal matrices.
+        Otherwise, dense matrices are returned.
     """
 
     def __init__(self, output_name, fun_list, params,
-                 vector_params=None):
+                 vector_params=None, sparse_jacobian=True):
         omdao.Component.__init__(self)
 
         vector_params = vector_params or set()
@@ -83,6 +92,7 @@ class VecFunComponent(omdao.Component):
         self._params = params
         self._unique_params = {}
         self._fun_list = fun_list
+        self._sparse = sparse_jacobian
 
         for par in params:
             adj = par in vector_params
@@ -93,6 +103,16 @@ class VecFunComponent(omdao.Component):
                 self.add_param(par, val=np.zeros(shape))
                 self._unique_params[par] = len(self._unique_params), adj
 
+        # group output indices by function object, so each function is called once.
+        fun_groups = {}
+        for idx, fun in enumerate(fun_list):
+            key = id(fun)
+            if key in fun_groups:
+                fun_groups[key][1].append(idx)
+            else:
+                fun_groups[key] = (fun, [idx])
+        self._fun_groups = [(fun, np.array(idx_list)) for fun, idx_list in fun_groups.values()]
+
         # construct chain rule jacobian matrix
         self._chain_jacobian = np.zeros((self._in_dim, len(self._unique_params)))
         for idx, par in enumerate(params):
@@ -152,8 +172,8 @@ class VecFunComponent(omdao.Component):
         xi_mat = self._get_inputs(params)
 
         tmp = np.empty(self._out_dim)
-        for idx in range(self._out_dim):
-            tmp[idx] = self._fun_list[idx](xi_mat[idx, :])
+        for fun, idx_vec in self._fun_groups:
+            tmp[idx_vec] = np.reshape(fun(xi_mat[idx_vec, :]), -1)
 
         unknowns[self._output] = tmp
 
@@ -176,15 +196,15 @@ class VecFunComponent(omdao.Component):
         xi_mat = self._get_inputs(params)
 
         jf = np.empty((self._out_dim, self._in_dim))
-        for k, fun in enumerate(self._fun_list):
-            jf[k, :] = fun.jacobian(xi_mat[k, :])
+        for fun, idx_vec in self._fun_groups:
+            jf[idx_vec, :] = np.reshape(fun.jacobian(xi_mat[idx_vec, :]), (-1, self._in_dim))
 
         jmat = np.dot(jf, self._chain_jacobian)
         jdict = {}
         for par, (pidx, adj) in self._unique_params.items():
             tmp = jmat[:, pidx]
             if adj:
-                tmp = np.diag(tmp)
+                tmp = sparse.diags(tmp, format='csr') if self._sparse else np.diag(tmp)
             jdict[self._output, par] = tmp
 
         return jdict
@@ -111,7 +111,7 @@ class SimAccess(abc.ABC):
         pass
 
     @abc.abstractmethod
-    def load_sim_data(self, dir_path: Path, sim_tag: str) -> SimData:
+    def load_sim_data(self, dir_path: Path, sim_tag: str, **kwargs: Any) -> SimData:
         """Load simulation results.
 
         Parameters
@@ -120,6 +120,9 @@ class SimAccess(abc.ABC):
             the working directory path.
         sim_tag : str
             optional simulation name.  Empty for default.
+        **kwargs : Any
+            optional data selection arguments, such as groups, signals, corners, and slices.
+            See load_sim_data_hdf5() for details.
 
         Returns
         -------
@@ -21,18 +21,22 @@ from typing import (
     TYPE_CHECKING, Optional, Type, Dict, List, Mapping, Any, Union, Tuple, Sequence, cast
 )
 
+import math
 import shutil
 import filecmp
 from pathlib import Path
 from dataclasses import dataclass
 
+import numpy as np
+
 from pybag.enum import DesignOutput, LogLevel
 from pybag.core import FileLogger, gds_equal
 
 from ..env import get_gds_layer_map, get_gds_object_map
+from ..math import float_to_si_string
 from ..io.file import read_yaml, write_yaml
 from ..util.logging import LoggingBase
-from ..util.immutable import combine_hash
+from ..util.immutable import get_digest
 from ..util.importlib import import_class
 from ..concurrent.util import GatherHelper
 from ..concurrent.core import batch_async_task
@@ -40,8 +44,10 @@ from ..interface.database import DbAccess
 from ..design.database import ModuleDB
 from ..design.module import Module, PySchCellView
 from ..layout.template import TemplateDB, TemplateBase
-from .data import SimData
-from .hdf5 import load_sim_data_hdf5
+from .data import (
+    SimData, AnalysisData, MDSweepInfo, SweepSpec, SweepList, SweepLinear, swp_info_from_struct
+)
+from .hdf5 import load_sim_data_hdf5, save_sim_data_hdf5
 from .core import TestbenchManager
 from .measure import MeasurementManager
 
@@ -109,7 +115,7 @@ class DesignDB(LoggingBase):
             )
             write_yaml(self._info_file, self._info_specs)
 
-        self._cache: Dict[int, List[str]] = self._info_specs['cache']
+        self._cache: Dict[str, List[str]] = self._info_specs['cache']
         self._cnt: Dict[str, int] = self._info_specs['cnt']
 
     @property
@@ -185,7 +191,7 @@ class DesignDB(LoggingBase):
             lay_master = self._lay_db.new_template(obj_cls, params=dut_params)
             sch_params = lay_master.sch_params
             sch_cls = lay_master.get_schematic_class_inst()
-            layout_hash = hash(lay_master.key)
+            layout_key = lay_master.key
             gds_file = str(self._root_dir / 'tmp.gds')
             if export_lay:
                 self._lay_db.batch_layout([(lay_master, impl_cell)], output=DesignOutput.LAYOUT,
@@ -204,7 +210,7 @@ class DesignDB(LoggingBase):
             lay_master = None
             sch_params = dut_params
             sch_cls = obj_cls
-            layout_hash = 0
+            layout_key = None
             gds_file = ''
 
         if extract and lay_master is None:
@@ -227,7 +233,8 @@ class DesignDB(LoggingBase):
                                          exact_cell_names=exact_cell_names)
 
         self.log('Check for existing netlist')
-        hash_id = combine_hash(layout_hash, hash(sch_master.key))
+        # NOTE: use structural digest instead of hash(), which is randomized per process.
+        hash_id = get_digest((layout_key, sch_master.key)).hex()
         dir_list = self._cache.get(hash_id, None)
         if dir_list is None:
             dir_list = []
@@ -315,16 +322,34 @@ class DesignDB(LoggingBase):
 
 class SimulationDB(LoggingBase):
     """A classes that caches netlists, layouts, and simulation results.
+
+    Parameters
+    ----------
+    log_file : str
+        the log file name.
+    dsn_db : DesignDB
+        the design database.
+    force_sim : bool
+        True to always re-run simulations.
+    precision : int
+        numeric precision in simulation netlist generation.
+    log_level : LogLevel
+        the logging level.
+    incremental : bool
+        True to run testbench simulations incrementally by default.  See
+        async_simulate_tbm_obj().
     """
 
     def __init__(self, log_file: str, dsn_db: DesignDB, force_sim: bool = False,
-                 precision: int = 6, log_level: LogLevel = LogLevel.DEBUG) -> None:
+                 precision: int = 6, log_level: LogLevel = LogLevel.DEBUG,
+                 incremental: bool = False) -> None:
         LoggingBase.__init__(self, 'sim_db', log_file, log_level=log_level)
 
         self._dsn_db = dsn_db
         self._sim = self._dsn_db.sch_db.prj.sim_access
         self._force_sim = force_sim
         self._precision = precision
+        self._incremental = incremental
 
     @property
     def prj(self) -> BagProject:
@@ -364,14 +389,18 @@ class SimulationDB(LoggingBase):
     def simulate_tbm(self, sim_id: str, sim_dir: Path, dut: DesignInstance,
                      tbm_cls: Union[Type[TestbenchManager], str],
                      tb_params: Optional[Mapping[str, Any]], tbm_specs: Mapping[str, Any],
-                     tb_name: str = '') -> SimResults:
+                     tb_name: str = '', incremental: Optional[bool] = None,
+                     load_kwargs: Optional[Mapping[str, Any]] = None) -> SimResults:
         tbm = self.make_tbm(tbm_cls, tbm_specs)
-        return self.simulate_tbm_obj(sim_id, sim_dir, dut, tbm, tb_params, tb_name=tb_name)
+        return self.simulate_tbm_obj(sim_id, sim_dir, dut, tbm, tb_params, tb_name=tb_name,
+                                     incremental=incremental, load_kwargs=load_kwargs)
 
     def simulate_tbm_obj(self, sim_id: str, sim_dir: Path, dut: DesignInstance,
                          tbm: TestbenchManager, tb_params: Optional[Mapping[str, Any]],
-                         tb_name: str = '') -> SimResults:
-        coro = self.async_simulate_tbm_obj(sim_id, sim_dir, dut, tbm, tb_params, tb_name=tb_name)
+                         tb_name: str = '', incremental: Optional[bool] = None,
+                         load_kwargs: Optional[Mapping[str, Any]] = None) -> SimResults:
+        coro = self.async_simulate_tbm_obj(sim_id, sim_dir, dut, tbm, tb_params, tb_name=tb_name,
+                                           incremental=incremental, load_kwargs=load_kwargs)
         results = batch_async_task([coro])
         if results is None:
             self.error('Simulation cancelled')
@@ -409,9 +438,49 @@ class SimulationDB(LoggingBase):
     async def async_simulate_tbm_obj(self, sim_id: str, sim_dir: Path,
                                      dut: Optional[DesignInstance], tbm: TestbenchManager,
                                      tb_params: Optional[Mapping[str, Any]],
-                                     tb_name: str = '') -> SimResults:
+                                     tb_name: str = '', incremental: Optional[bool] = None,
+                                     load_kwargs: Optional[Mapping[str, Any]] = None
+                                     ) -> SimResults:
+        """Simulate the given testbench, reusing previous simulation results if possible.
+
+        In incremental mode, the simulation is split into one sub-simulation per corner and per
+        value of the outermost sweep parameter (if the sweep is multi-dimensional).  Each
+        sub-simulation is cached individually, only the sub-simulations whose netlists changed
+        are run (in parallel), and the results are assembled into a single SimData with the
+        full shape.  Adding corners or sweep values then only simulates the new points.
+        Monte Carlo simulations are never split.
+
+        Parameters
+        ----------
+        sim_id : str
+            the simulation ID.
+        sim_dir : Path
+            the simulation directory.
+        dut : Optional[DesignInstance]
+            the DUT, or None if the testbench has no DUT.
+        tbm : TestbenchManager
+            the testbench manager.
+        tb_params : Optional[Mapping[str, Any]]
+            the testbench schematic parameters.
+        tb_name : str
+            the testbench name.  Defaults to sim_id.
+        incremental : Optional[bool]
+            True to simulate incrementally.  Defaults to the value given to the constructor.
+        load_kwargs : Optional[Mapping[str, Any]]
+            selection arguments (groups, signals, corners, slices) used to read the simulation
+            data.  See load_sim_data_hdf5() for details.
+
+        Returns
+        -------
+        results : SimResults
+            the simulation results.
+        """
         if not tb_name:
             tb_name = sim_id
+        if incremental is None:
+            incremental = self._incremental
+        if load_kwargs is None:
+            load_kwargs = {}
 
         sch_db = self._dsn_db.sch_db
         impl_lib = sch_db.lib_name
@@ -430,6 +499,33 @@ class SimulationDB(LoggingBase):
         sim_netlist = tbm.sim_netlist_path
         sim_data_path = self._sim.get_sim_file(sim_dir, sim_id)
 
+        # save previous simulation netlist, if exists
+        prev_netlist = _backup_netlist(sim_netlist)
+
+        self.log(f'Configuring testbench manager {tbm.__class__.__name__}')
+        tbm.setup(sch_db, tb_params, cv_info_list, dut_netlist, gen_sch=self._dsn_db.gen_sch)
+        if not sim_netlist.is_file():
+            self.error(f'Cannot find simulation netlist: {sim_netlist}')
+
+        if incremental and not tbm.specs.get('monte_carlo_params', None):
+            data = await self._async_simulate_incremental(sim_id, tbm, dut_mtime)
+            save_sim_data_hdf5(data, sim_data_path)
+            if load_kwargs:
+                data = load_sim_data_hdf5(sim_data_path, **load_kwargs)
+            return SimResults(dut, tbm, data)
+
+        if self._need_simulation(sim_netlist, prev_netlist, sim_data_path, dut_mtime):
+            self.log(f'Simulating netlist: {sim_netlist}')
+            await self._sim.async_run_simulation(sim_netlist, sim_id)
+            self.log(f'Finished simulating {sim_netlist}')
+        else:
+            self.log('Returning previous simulation data')
+
+        return SimResults(dut, tbm, load_sim_data_hdf5(sim_data_path, **load_kwargs))
+
+    def _need_simulation(self, sim_netlist: Path, prev_netlist: Path, sim_data_path: Path,
+                         dut_mtime: Optional[float]) -> bool:
+        """Returns True if the given simulation netlist has to be simulated."""
         # check if DUT netlist is updated
         if sim_data_path.exists():
             force_sim = self._force_sim
@@ -438,19 +534,6 @@ class SimulationDB(LoggingBase):
             force_sim = True
             data_mtime = -1
 
-        # save previous simulation netlist, if exists
-        prev_netlist = sim_netlist.with_name(sim_netlist.name + '.bak')
-        if sim_netlist.exists():
-            shutil.move(str(sim_netlist), str(prev_netlist))
-        elif prev_netlist.exists():
-            prev_netlist.unlink()
-
-        self.log(f'Configuring testbench manager {tbm.__class__.__name__}')
-        tbm.setup(sch_db, tb_params, cv_info_list, dut_netlist, gen_sch=self._dsn_db.gen_sch)
-        if not sim_netlist.is_file():
-            self.error(f'Cannot find simulation netlist: {sim_netlist}')
-
-        # determine whether to run simulation
         if (not force_sim and prev_netlist.exists() and
                 filecmp.cmp(sim_netlist, prev_netlist, shallow=False)):
             # simulation netlist is not modified
@@ -458,20 +541,87 @@ class SimulationDB(LoggingBase):
                 # DUT netlist is modified, re-run simulation
                 self.log(f'DUT netlist mtime = {dut_mtime} >= sim data mtime = {data_mtime}, '
                          'Re-running simulation.')
-                run_sim = True
-            else:
-                run_sim = False
-        else:
-            run_sim = True
-
-        if run_sim:
-            self.log(f'Simulating netlist: {sim_netlist}')
-            await self._sim.async_run_simulation(sim_netlist, sim_id)
-            self.log(f'Finished simulating {sim_netlist}')
+                return True
+            return False
+        return True
+
+    async def _async_simulate_incremental(self, sim_id: str, tbm: TestbenchManager,
+                                          dut_mtime: Optional[float]) -> SimData:
+        specs = tbm.specs
+        env_list: List[str] = list(specs['sim_envs'])
+        swp_orig = tbm.swp_info
+        swp_obj = swp_info_from_struct(swp_orig)
+        if isinstance(swp_obj, MDSweepInfo) and swp_obj.ndim > 0:
+            swp_par, swp_spec = swp_obj.params[0]
+            swp_vals = _get_sweep_values(swp_spec)
+            swp_rest = list(swp_orig)[1:]
         else:
-            self.log('Returning previous simulation data')
-
-        return SimResults(dut, tbm, load_sim_data_hdf5(sim_data_path))
+            swp_par = ''
+            swp_vals = np.zeros(1)
+            swp_rest = swp_orig
+
+        sim_params = tbm.sim_params
+        par_orig = sim_params.get(swp_par, None)
+        tb_netlist = tbm.tb_netlist_path
+        netlist_name = tbm.sim_netlist_path.name
+        root_dir = tbm.work_dir / f'{sim_id}_points'
+
+        # write the netlist of every sub-simulation
+        path_table: Dict[str, List[Path]] = {}
+        gatherer = GatherHelper()
+        num_run = num_tot = 0
+        try:
+            tbm.set_swp_info(swp_rest)
+            for env in env_list:
+                tbm.set_sim_envs([env])
+                env_dir = root_dir / env
+                path_list = path_table[env] = []
+                for val in swp_vals:
+                    if swp_par:
+                        sim_params[swp_par] = val.item()
+                        val_str = float_to_si_string(val.item(), self._precision)
+                        cur_dir = env_dir / f'{swp_par}_{val_str}'
+                    else:
+                        cur_dir = env_dir
+                    tbm.commit()
+
+                    cur_dir.mkdir(parents=True, exist_ok=True)
+                    cur_netlist = cur_dir / netlist_name
+                    prev_netlist = _backup_netlist(cur_netlist)
+                    self._sim.create_netlist(cur_netlist, tb_netlist, tbm.get_netlist_info(),
+                                             self._precision)
+                    cur_data_path = self._sim.get_sim_file(cur_dir, sim_id)
+                    if self._need_simulation(cur_netlist, prev_netlist, cur_data_path,
+                                             dut_mtime):
+                        gatherer.append(self._sim.async_run_simulation(cur_netlist, sim_id))
+                        num_run += 1
+                    path_list.append(cur_data_path)
+                    num_tot += 1
+        finally:
+            tbm.set_sim_envs(env_list)
+            tbm.set_swp_info(swp_orig)
+            if swp_par:
+                if par_orig is None:
+                    sim_params.pop(swp_par, None)
+                else:
+                    sim_params[swp_par] = par_orig
+            tbm.commit()
+
+        self.log(f'Incremental simulation: running {num_run} of {num_tot} sub-simulations in '
+                 f'{root_dir}')
+        if gatherer:
+            await gatherer.gather_err()
+        self.log(f'Finished incremental simulation in {root_dir}')
+
+        # assemble results
+        env_data_list = []
+        for env in env_list:
+            data_list = [load_sim_data_hdf5(path) for path in path_table[env]]
+            if swp_par:
+                env_data_list.append(_combine_sweep_points(data_list, swp_par, swp_vals))
+            else:
+                env_data_list.append(data_list[0])
+        return _combine_corners(env_data_list)
 
     async def async_simulate_mm_obj(self, sim_id: str, sim_dir: Path, dut: Optional[DesignInstance],
                                     mm: MeasurementManager) -> MeasureResult:
@@ -497,3 +647,116 @@ def _set_dut(tb_params: Optional[Mapping[str, Any]], dut_lib: str, dut_cell: str
     else:
         ans['dut_params'] = _set_dut(dut_params, dut_lib, dut_cell)
     return ans
+
+
+def _backup_netlist(sim_netlist: Path) -> Path:
+    """Move the given simulation netlist to its backup file, and return the backup file path."""
+    prev_netlist = sim_netlist.with_name(sim_netlist.name + '.bak')
+    if sim_netlist.exists():
+        shutil.move(str(sim_netlist), str(prev_netlist))
+    elif prev_netlist.exists():
+        prev_netlist.unlink()
+    return prev_netlist
+
+
+def _get_sweep_values(spec: SweepSpec) -> np.ndarray:
+    if isinstance(spec, SweepList):
+        return np.array(spec.values, dtype=float)
+    if isinstance(spec, SweepLinear):
+        return np.linspace(spec.start, spec.stop_inc, spec.num)
+    return np.logspace(spec.start_log, math.log10(spec.stop_inc), spec.num)
+
+
+def _combine_sweep_points(data_list: Sequence[SimData], swp_name: str, swp_vals: np.ndarray
+                          ) -> SimData:
+    """Combine single corner simulation data of each sweep value into one SimData.
+
+    The new sweep parameter becomes the outermost sweep, right after the corner axis.  Non-MD
+    analyses store sweep points along axis 1 of each signal.  If signals have a third axis,
+    the last sweep parameter is the inner x vector (e.g. frequency or time) of each sweep point.
+    It is kept as is if all sweep points share it, and stored with one row per sweep point
+    otherwise.  Shorter x vectors are padded with NaN.
+    """
+    data0 = data_list[0]
+    new_data = {}
+    for grp in data0.group_list:
+        ana_list = [data.get_analysis(grp) for data in data_list]
+        ana0 = ana_list[0]
+        swp_pars = list(ana0.sweep_params)
+        if not ana0.is_md:
+            # each sweep point is a column; concatenate columns and repeat new sweep values
+            has_x = len(ana0.data_shape) > 2
+            table = {sig: _concat_padded([ana[sig] for ana in ana_list], axis=1)
+                     for sig in ana0.signals}
+            for par in (swp_pars[1:-1] if has_x else swp_pars[1:]):
+                table[par] = np.concatenate([np.ravel(ana[par]) for ana in ana_list])
+            if has_x:
+                x_par = swp_pars[-1]
+                x_list = [ana[x_par] for ana in ana_list]
+                if all((x.ndim == 1 and np.array_equal(x_list[0], x) for x in x_list)):
+                    table[x_par] = x_list[0]
+                else:
+                    table[x_par] = _concat_padded(
+                        [np.broadcast_to(np.reshape(x, (-1, x.shape[-1])), ana.data_shape[1:])
+                         for x, ana in zip(x_list, ana_list)])
+            table[swp_name] = np.concatenate([np.full(ana.data_shape[1], val)
+                                              for ana, val in zip(ana_list, swp_vals)])
+            swp_pars.insert(1, swp_name)
+            new_data[grp] = AnalysisData(swp_pars, table, False)
+        elif len(swp_pars) > 1:
+            new_data[grp] = AnalysisData.combine(ana_list, swp_name, swp_vals=swp_vals, axis=1)
+        else:
+            # only swept over corners
+            table = {sig: np.stack([ana[sig] for ana in ana_list], axis=1)
+                     for sig in ana0.signals}
+            table[swp_name] = swp_vals
+            new_data[grp] = AnalysisData(swp_pars + [swp_name], table, True)
+
+    return SimData(data0.sim_envs, new_data, data0.netlist_type)
+
+
+def _combine_corners(data_list: Sequence[SimData]) -> SimData:
+    """Combine simulation data of different corners into one SimData."""
+    data0 = data_list[0]
+    sim_envs = [env for data in data_list for env in data.sim_envs]
+    new_data = {}
+    for grp in data0.group_list:
+        ana_list = [data.get_analysis(grp) for data in data_list]
+        ana0 = ana_list[0]
+        swp_pars = ana0.sweep_params
+        table = {sig: _concat_padded([ana[sig] for ana in ana_list]) for sig in ana0.signals}
+        for idx in range(1, len(swp_pars)):
+            par = swp_pars[idx]
+            arr_list = [ana[par] for ana in ana_list]
+            if all((np.array_equal(arr_list[0], arr) for arr in arr_list)):
+                table[par] = arr_list[0]
+            elif idx == len(swp_pars) - 1 and (ana0.is_md or len(ana0.data_shape) > 2):
+                # last sweep parameter values differ between corners
+                table[par] = _concat_padded([np.broadcast_to(arr, ana.data_shape)
+                                             for arr, ana in zip(arr_list, ana_list)])
+            else:
+                raise ValueError(f'Cannot combine corners: sweep parameter {par} of '
+                                 f'analysis {grp} differs between corners.')
+        new_data[grp] = AnalysisData(swp_pars, table, ana0.is_md)
+
+    return SimData(sim_envs, new_data, data0.netlist_type)
+
+
+def _concat_padded(arr_list: Sequence[np.ndarray], axis: int = 0) -> np.ndarray:
+    """Concatenate arrays along the given axis, padding other axes with NaN if needed."""
+    shape_list = [arr.shape[:axis] + arr.shape[axis + 1:] for arr in arr_list]
+    max_shape = tuple(max(dims) for dims in zip(*shape_list))
+    if all((shape == max_shape for shape in shape_list)):
+        return np.concatenate(arr_list, axis=axis)
+
+    num_tot = sum((arr.shape[axis] for arr in arr_list))
+    ans = np.full(max_shape[:axis] + (num_tot,) + max_shape[axis:], np.nan,
+                  dtype=np.result_type(np.float64, *arr_list))
+    start = 0
+    for arr in arr_list:
+        stop = start + arr.shape[axis]
+        select = [slice(0, n) for n in arr.shape]
+        select[axis] = slice(start, stop)
+        ans[tuple(select)] = arr
+        start = stop
+    return ans
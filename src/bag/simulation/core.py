@@ -60,7 +60,7 @@ from pybag.core import FileLogger
 from ..math import float_to_si_string
 from ..io.file import read_yaml, write_yaml
 from ..util.immutable import ImmutableList
-from ..util.math import Calculator
+from ..util.math import Calculator, CompiledExpression, resolve_expressions
 from ..layout.template import TemplateDB, TemplateBase
 from ..design.database import ModuleDB, ModuleType
 from ..design.module import Module
@@ -135,6 +135,7 @@ class TestbenchManager(abc.ABC):
                                        if k is not 'sim_params' and k is not 'env_params'}
         self._specs['sim_params'] = {k: v for k, v in specs['sim_params'].items()}
         self._specs['env_params'] = {k: v.copy() for k, v in specs.get('env_params', {}).items()}
+        self._expr_cache: Dict[str, CompiledExpression] = {}
         self.commit()
 
     @property
@@ -284,19 +285,41 @@ class TestbenchManager(abc.ABC):
                 val = self.sim_params[name]
                 if isinstance(val, str):
                     # this parameter is an expression
-                    return self.get_calculator(data).eval(val)
+                    return self.get_param_namespace(data)[name]
                 return np.full(data_shape, val)
             else:
                 # this param is not constant
                 return _get_env_param_value(data.sim_envs, data_shape, val_table)
 
     def get_calculator(self, data: SimData) -> Calculator:
-        # TODO: to avoid potential re-creation of get_calculator() over and over again,
-        # TODO: consider just storing these data in SimData on creation.
+        return Calculator(self.get_param_namespace(data))
+
+    def get_compiled_expression(self, expr: str) -> CompiledExpression:
+        """Returns the compiled form of the given sim_params expression.
+
+        Compiled expressions are cached, so each expression string is only parsed once.
+        """
+        ans = self._expr_cache.get(expr, None)
+        if ans is None:
+            ans = self._expr_cache[expr] = CompiledExpression(expr)
+        return ans
+
+    def get_param_namespace(self, data: SimData) -> Mapping[str, np.ndarray]:
+        """Returns values of all sweep, env, and sim parameters for the current data group.
+
+        The resolved namespace is stored on the SimData object, so it is only computed once
+        for the same data and parameter values.
+        """
         env_params: Mapping[str, Mapping[str, float]] = self._specs.get('env_params', {})
+        sim_params = self.sim_params
+        swp = swp_info_from_struct(self.swp_info)
+        key = (data.group, self.num_sim_envs, swp, tuple(sim_params.items()),
+               tuple((name, tuple(val_table.items())) for name, val_table in env_params.items()))
+        namespace = data.get_param_namespace(key)
+        if namespace is not None:
+            return namespace
 
         # get sweep param values
-        swp = swp_info_from_struct(self.swp_info)
         namespace = {name: data.get_param_value(name) for name in swp}
 
         # get env param values
@@ -307,29 +330,17 @@ class TestbenchManager(abc.ABC):
                 namespace[name] = _get_env_param_value(sim_envs, data_shape, val_table)
 
         # get sim param values
-        expr_map = {}
-        for name, val in self.sim_params.items():
+        expr_table = {}
+        for name, val in sim_params.items():
             if name not in namespace:
                 if isinstance(val, str):
-                    expr_map[name] = val
+                    expr_table[name] = self.get_compiled_expression(val)
                 else:
                     namespace[name] = np.full(data_shape, val)
 
-        while expr_map:
-            success_once = False
-            new_expr_map = {}
-            for name, expr in expr_map.items():
-                try:
-                    val = Calculator(namespace).eval(expr)
-                    namespace[name] = val
-                    success_once = True
-                except KeyError:
-                    new_expr_map[name] = expr
-            if not success_once:
-                raise ValueError('sim_params circular dependency found.')
-            expr_map = new_expr_map
-
-        return Calculator(namespace)
+        resolve_expressions(namespace, expr_table)
+        data.set_param_namespace(key, namespace)
+        return namespace
 
     def get_sim_param_string(self, val: Union[float, str]) -> str:
         if isinstance(val, str):
@@ -387,8 +398,8 @@ class TestbenchManager(abc.ABC):
         coro = self.async_simulate()
         batch_async_task([coro])
 
-    def load_sim_data(self) -> SimData:
-        return self._sim.load_sim_data(self._work_dir, 'sim')
+    def load_sim_data(self, **kwargs: Any) -> SimData:
+        return self._sim.load_sim_data(self._work_dir, 'sim', **kwargs)
 
     def log(self, msg: str, level: LogLevel = LogLevel.INFO) -> None:
         if self._logger is None:
@@ -522,6 +533,24 @@ class MeasurementManager(abc.ABC):
         """
         return False, '', {}
 
+    # noinspection PyMethodMayBeStatic, PyUnusedLocal
+    def get_sim_data_selection(self, state: str) -> Dict[str, Any]:
+        """Returns the parts of the simulation data process_output() needs in the given state.
+
+        Override to only read the given groups, signals, corners, or sweep slices from file.
+
+        Parameters
+        ----------
+        state : str
+            the current FSM state.
+
+        Returns
+        -------
+        selection : Dict[str, Any]
+            the selection keyword arguments of load_sim_data_hdf5().  Empty to read all data.
+        """
+        return {}
+
     @property
     def specs(self) -> Dict[str, Any]:
         return self._specs
@@ -586,6 +615,7 @@ class MeasurementManager(abc.ABC):
             tb_module = importlib.import_module(tb_package)
             tb_cls = getattr(tb_module, tb_cls_name)
             work_dir = self._dir_path / cur_state
+            sel_kwargs = self.get_sim_data_selection(cur_state)
             tb_manager: TestbenchManager = tb_cls(self._sim, work_dir, tb_name, self._impl_lib,
                                                   tb_specs, self._sim_view_list, self._env_list,
                                                   precision=self._precision)
@@ -594,7 +624,7 @@ class MeasurementManager(abc.ABC):
                 print(f'Measurement {self._meas_name} in state {cur_state}, '
                       'load sim data from file.')
                 try:
-                    cur_results = tb_manager.load_sim_data()
+                    cur_results = tb_manager.load_sim_data(**sel_kwargs)
                 except FileNotFoundError:
                     print('Cannot find data file, simulating...')
                     if sch_db is None or not dut_cvi_list or dut_netlist is None:
@@ -603,12 +633,12 @@ class MeasurementManager(abc.ABC):
                     tb_manager.setup(sch_db, tb_sch_params, dut_cv_info_list=dut_cvi_list,
                                      dut_netlist=dut_netlist, gen_sch=gen_sch)
                     await tb_manager.async_simulate()
-                    cur_results = tb_manager.load_sim_data()
+                    cur_results = tb_manager.load_sim_data(**sel_kwargs)
             else:
                 tb_manager.setup(sch_db, tb_sch_params, dut_cv_info_list=dut_cvi_list,
                                  dut_netlist=dut_netlist, gen_sch=gen_sch)
                 await tb_manager.async_simulate()
-                cur_results = tb_manager.load_sim_data()
+                cur_results = tb_manager.load_sim_data(**sel_kwargs)
 
             # process and save simulation data
             print(f'Measurement {self._meas_name} in state {cur_state}, '
@@ -492,6 +492,8 @@ class AnalysisData:
         self._is_md = is_md
         swp_set = set(sweep_params)
         self._signals = [key for key in data.keys() if key not in swp_set]
+        # over-allocated buffers backing appended data, and the views of them stored in _data
+        self._append_buf: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
 
     def __getitem__(self, item: str) -> np.ndarray:
         return self._data[item]
@@ -536,7 +538,8 @@ class AnalysisData:
             arr_list = [arr[sig] for arr in data_list]
             sizes = [x.shape for x in arr_list]
             max_size = np.max(list(zip(*sizes)), -1)
-            cur_ans = np.full((len(arr_list),) + tuple(max_size), np.nan)
+            cur_ans = np.full((len(arr_list),) + tuple(max_size), np.nan,
+                              dtype=np.result_type(np.float64, *arr_list))
             for idx, arr in enumerate(arr_list):
                 # noinspection PyTypeChecker
                 select = (idx,) + tuple(slice(0, s) for s in sizes[idx])
@@ -593,9 +596,14 @@ class AnalysisData:
             _data[k] = self._data[k].copy()
         return AnalysisData(self._swp_pars, _data, self._is_md)
 
-    """Adds combination to simulation results"""
+    def check_add_data(self, new_data: Mapping[str, np.ndarray]) -> None:
+        """Check that the given sweep points can be added to this analysis.
 
-    def add(self, new_data: Dict[str, np.ndarray]):
+        Parameters
+        ----------
+        new_data : Mapping[str, np.ndarray]
+            the new sweep points.  Must have the same entries as this analysis.
+        """
         if self.is_md:
             raise AttributeError('Currently only supported in is_md = False mode')
 
@@ -608,7 +616,6 @@ class AnalysisData:
                 raise ValueError('Param %s not provided in data' % param)
 
         ref_length = len(list(new_data.values())[0])
-        # add data points
         for name, arr in new_data.items():
             # check that all new data arrays are the correct length
             if name in self.sweep_params or name == 'hash':
@@ -616,12 +623,54 @@ class AnalysisData:
             else:
                 assert len(arr[0]) == ref_length
 
+    """Adds combination to simulation results"""
+
+    def add(self, new_data: Dict[str, np.ndarray]):
+        self.check_add_data(new_data)
+
+        # add data points
+        for name, arr in new_data.items():
             # new sweep point
             if name in self.sweep_params:
-                self._data[name] = np.append(self._data[name], arr)
+                self._data[name] = self._append_values(name, np.ravel(self._data[name]),
+                                                       np.ravel(arr), 0)
             # sweep data
             else:
-                self._data[name] = np.hstack((self._data[name], arr))
+                cur = np.atleast_1d(self._data[name])
+                self._data[name] = self._append_values(name, cur, np.atleast_1d(arr),
+                                                       0 if cur.ndim == 1 else 1)
+
+    def _append_values(self, name: str, cur: np.ndarray, arr: np.ndarray, axis: int
+                       ) -> np.ndarray:
+        """Append arr to cur along the given axis, and return the result.
+
+        The result is a view of an over-allocated buffer whose capacity doubles when full, so
+        appending one sweep point at a time takes amortized constant time per point.
+        """
+        if arr.ndim != cur.ndim or (arr.shape[:axis] + arr.shape[axis + 1:] !=
+                                    cur.shape[:axis] + cur.shape[axis + 1:]):
+            # let numpy report the dimension mismatch
+            return np.concatenate((cur, arr), axis=axis)
+
+        n_cur = cur.shape[axis]
+        n_tot = n_cur + arr.shape[axis]
+        dtype = np.result_type(cur, arr)
+        head = (slice(None),) * axis
+        buf_info = self._append_buf.get(name, None)
+        if (buf_info is None or buf_info[1] is not self._data[name] or
+                buf_info[0].dtype != dtype or buf_info[0].shape[axis] < n_tot):
+            # allocate a new buffer, and copy over existing data
+            new_shape = list(cur.shape)
+            new_shape[axis] = max(n_tot, 2 * n_cur)
+            buf = np.empty(new_shape, dtype=dtype)
+            buf[head + (slice(0, n_cur),)] = cur
+        else:
+            buf = buf_info[0]
+
+        buf[head + (slice(n_cur, n_tot),)] = arr
+        view = buf[head + (slice(0, n_tot),)]
+        self._append_buf[name] = (buf, view)
+        return view
 
     def remove_sweep(self, name: str, rtol: float = 1e-8, atol: float = 1e-20) -> bool:
         new_swp_vars = list(self._swp_pars)
@@ -699,6 +748,7 @@ class SimData:
         self._cur_name = next(iter(self._table.keys()))
         self._cur_ana: AnalysisData = self._table[self._cur_name]
         self._netlist_type = sim_netlist_type
+        self._par_ns_table: Dict[Any, Mapping[str, np.ndarray]] = {}
 
     @property
     def group(self) -> str:
@@ -754,11 +804,18 @@ class SimData:
     def open_analysis(self, atype: AnalysisType) -> None:
         self.open_group(atype.name.lower())
 
+    def get_analysis(self, val: str) -> AnalysisData:
+        tmp = self._table.get(val, None)
+        if tmp is None:
+            raise ValueError(f'Group {val} not found.')
+        return tmp
+
     def insert(self, name: str, data: np.ndarray) -> None:
         self._cur_ana.insert(name, data)
 
     def add(self, new_data: Dict[str, np.ndarray]):
         self._cur_ana.add(new_data)
+        self._par_ns_table.clear()
 
     def copy(self, rename: Optional[Dict[str, str]] = None) -> SimData:
         if rename is None:
@@ -779,11 +836,20 @@ class SimData:
         return SimData(self._sim_envs, _table, self.netlist_type)
 
     def remove_sweep(self, name: str, rtol: float = 1e-8, atol: float = 1e-20) -> bool:
+        self._par_ns_table.clear()
         return self._cur_ana.remove_sweep(name, rtol=rtol, atol=atol)
 
     def get_param_value(self, name: str) -> np.ndarray:
         return self._cur_ana.get_param_value(name)
 
+    def get_param_namespace(self, key: Any) -> Optional[Mapping[str, np.ndarray]]:
+        """Returns the resolved parameter namespace stored with the given key, or None."""
+        return self._par_ns_table.get(key, None)
+
+    def set_param_namespace(self, key: Any, namespace: Mapping[str, np.ndarray]) -> None:
+        """Stores a resolved parameter namespace, so it does not have to be recomputed."""
+        self._par_ns_table[key] = namespace
+
     @classmethod
     def combine(cls, data_list: List[SimData], swp_name: str,
                 swp_vals: Optional[np.ndarray] = None) -> SimData:
@@ -810,22 +876,23 @@ def _check_is_md(num_env: int, swp_vals: List[np.ndarray], rtol: float, atol: fl
     for idx in range(num - 1, -1, -1):
         cur_vals = swp_vals[idx]
         if prev_size > 1:
+            # every block of prev_size values must be constant
             rep_prev = cur_vals.size // prev_size
-            for start_idx in range(0, rep_prev * prev_size, prev_size):
-                if not np.allclose(cur_vals[start_idx:start_idx + prev_size], cur_vals[start_idx],
-                                   rtol=rtol, atol=atol):
-                    # is not MD
-                    return None, []
+            blocks = cur_vals[:rep_prev * prev_size].reshape(rep_prev, prev_size)
+            if not np.allclose(blocks, blocks[:, :1], rtol=rtol, atol=atol):
+                # is not MD
+                return None, []
             cur_vals = cur_vals[0::prev_size]
 
-        occ_vec = np.nonzero(np.isclose(cur_vals, cur_vals[0], rtol=rtol, atol=atol))[0]
+        occ_vec = np.flatnonzero(np.isclose(cur_vals, cur_vals[0], rtol=rtol, atol=atol))
         if occ_vec.size < 2:
             unique_size = cur_vals.size
         else:
             unique_size = occ_vec[1]
             rep, remain = divmod(cur_vals.size, unique_size)
-            if remain != 0 or not np.allclose(cur_vals, np.tile(cur_vals[:unique_size], rep),
-                                              rtol=rtol, atol=atol):
+            # values must be the first unique_size values repeated
+            if remain != 0 or not np.allclose(cur_vals.reshape(rep, unique_size),
+                                              cur_vals[:unique_size], rtol=rtol, atol=atol):
                 # is not MD
                 return None, []
 
@@ -13,9 +13,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Dict, Any, Tuple
+from __future__ import annotations
 
+from typing import (
+    List, Dict, Any, Tuple, Optional, Mapping, Sequence, Union, Iterable, Iterator, Callable
+)
+
+import os
+import zlib
 from pathlib import Path
+from itertools import product
+from concurrent.futures import ThreadPoolExecutor
 
 import h5py
 import numpy as np
@@ -35,15 +43,116 @@ except ImportError:
     blosc_filter_pybind11 = None
     BLOSC_FILTER = None
 
+try:
+    # used to pre-compress chunks for direct chunk writes
+    import blosc
+except ImportError:
+    blosc = None
+
 MB_SIZE = 1024**2
+BLOSC_COMPRESSORS = ('blosclz', 'lz4', 'lz4hc', 'snappy', 'zlib', 'zstd')
+MAX_AUTO_CACHE_MB = 256
+CHUNK_STRATEGIES = ('inner', 'time', 'corner', 'auto')
+ACCESS_PATTERNS = ('', 'per_corner', 'cross_corner')
+
+
+def _get_auto_chunk_strategy(shape: Tuple[int, ...], access_pattern: str = '') -> str:
+    """Returns the chunk strategy best suited to the given access pattern.
+
+    If the access pattern is unknown, assume the typical measurement access pattern: one signal
+    is read over all time (the last axis) for one corner at a time, so data with multiple
+    corners are chunked time-major.
+    """
+    if access_pattern == 'cross_corner':
+        return 'corner'
+    if access_pattern == 'per_corner':
+        return 'time'
+    if access_pattern:
+        raise ValueError(f'Unknown access pattern {access_pattern}, '
+                         f'must be one of {ACCESS_PATTERNS}')
+    if len(shape) >= 2 and shape[0] > 1:
+        return 'time'
+    return 'inner'
 
 
 def _set_chunk_args(kwargs: Dict[str, Any], chunk_size_mb: int, shape: Tuple[int, ...],
-                    unit_size: int) -> None:
+                    unit_size: int, strategy: str = 'inner', access_pattern: str = '') -> None:
+    """Sets the chunk shape of a dataset.
+
+    Parameters
+    ----------
+    kwargs : Dict[str, Any]
+        the dataset keyword arguments.
+    chunk_size_mb : int
+        maximum chunk size, in megabytes.  0 to disable chunking.
+    shape : Tuple[int, ...]
+        the dataset shape.
+    unit_size : int
+        size of each element, in bytes.
+    strategy : str
+        the chunking strategy.  The first axis of the dataset is the corner axis, and the last
+        axis is the time/frequency axis.
+
+        inner
+            take all values of dimensions from the innermost outward.
+        time
+            time-major.  Each chunk contains as many values along the last axis for a single
+            corner as possible, so reading one signal of one corner touches the fewest chunks.
+        corner
+            corner-major.  Each chunk contains all corners of a block of the inner axes, so
+            reading one point across all corners touches the fewest chunks.
+        auto
+            pick a strategy from the access pattern, or from the dataset shape if the access
+            pattern is unknown.
+    access_pattern : str
+        the expected read access pattern, used by the 'auto' strategy.
+
+        per_corner
+            signals are read one corner at a time.
+        cross_corner
+            signals are read one point at a time across all corners.
+        empty string
+            unknown.
+    """
     if chunk_size_mb == 0:
         return
+    if strategy == 'auto':
+        strategy = _get_auto_chunk_strategy(shape, access_pattern)
+
+    if strategy == 'inner':
+        _set_chunk_args_inner(kwargs, chunk_size_mb, shape, unit_size)
+        return
+    if strategy != 'time' and strategy != 'corner':
+        raise ValueError(f'Unknown chunk strategy {strategy}, must be one of {CHUNK_STRATEGIES}')
 
     ndim = len(shape)
+    num_max = max(1, chunk_size_mb * MB_SIZE // unit_size)
+    chunk_shape = [1] * ndim
+    if ndim > 1:
+        if strategy == 'corner':
+            chunk_shape[0] = max(1, min(shape[0], num_max))
+            num_max //= chunk_shape[0]
+        axis_list = range(ndim - 1, 0, -1)
+    else:
+        axis_list = range(ndim)
+
+    for cur_idx in axis_list:
+        size_cur = max(shape[cur_idx], 1)
+        if size_cur <= num_max:
+            chunk_shape[cur_idx] = size_cur
+            num_max //= size_cur
+        else:
+            # split this dimension into equal chunks no larger than num_max
+            num_div = -(-size_cur // num_max)
+            chunk_shape[cur_idx] = -(-size_cur // num_div)
+            break
+
+    kwargs['chunks'] = tuple(chunk_shape)
+
+
+def _set_chunk_args_inner(kwargs: Dict[str, Any], chunk_size_mb: int, shape: Tuple[int, ...],
+                          unit_size: int) -> None:
+    ndim = len(shape)
     num_max = chunk_size_mb * MB_SIZE // unit_size
     chunk_shape = [1] * ndim
     num_cum = 1
@@ -71,6 +180,7 @@ def _set_chunk_args(kwargs: Dict[str, Any], chunk_size_mb: int, shape: Tuple[int
         else:
             # we can take all values from this dimension
             chunk_shape[cur_idx] = size_cur
+            num_cum = num_cur
             if num_cur == num_max:
                 # we're done
                 break
@@ -78,9 +188,150 @@ def _set_chunk_args(kwargs: Dict[str, Any], chunk_size_mb: int, shape: Tuple[int
     kwargs['chunks'] = tuple(chunk_shape)
 
 
+def _next_prime(n: int) -> int:
+    """Returns the smallest prime number greater than or equal to n."""
+    n = max(n, 2)
+    while True:
+        if all(n % k for k in range(2, int(n**0.5) + 1)):
+            return n
+        n += 1
+
+
+def _get_auto_cache_args(dset_info: Iterable[Tuple[Tuple[int, ...], Optional[Tuple[int, ...]],
+                                                  int]],
+                         access_pattern: str = '') -> Tuple[int, int]:
+    """Computes HDF5 chunk cache parameters from dataset shapes.
+
+    The cache is sized so that all chunks touched by one read of any dataset fit in the cache,
+    and the number of hash slots is a prime about 100 times the number of chunks in the cache,
+    as recommended by the HDF5 documentation.  A read is one row along the first (corner) axis
+    for the 'cross_corner' access pattern, and one row along the last axis otherwise.
+
+    Parameters
+    ----------
+    dset_info : Iterable[Tuple[Tuple[int, ...], Optional[Tuple[int, ...]], int]]
+        the (shape, chunk shape, element size) of each dataset.  The chunk shape is None for
+        contiguous datasets.
+    access_pattern : str
+        the expected read access pattern.  See _set_chunk_args().
+
+    Returns
+    -------
+    cache_nbytes : int
+        the chunk cache size, in bytes.
+    cache_nslots : int
+        the number of chunk cache hash slots.
+    """
+    cache_nbytes = MB_SIZE
+    chunk_nbytes_min = 0
+    axis = 0 if access_pattern == 'cross_corner' else -1
+    for shape, chunks, unit_size in dset_info:
+        if chunks is None or not shape:
+            continue
+        chunk_nbytes = int(np.prod(chunks)) * unit_size
+        num_chunks = -(-max(shape[axis], 1) // chunks[axis])
+        cache_nbytes = max(cache_nbytes, num_chunks * chunk_nbytes)
+        if chunk_nbytes_min == 0 or chunk_nbytes < chunk_nbytes_min:
+            chunk_nbytes_min = chunk_nbytes
+
+    cache_nbytes = min(cache_nbytes, MAX_AUTO_CACHE_MB * MB_SIZE)
+    num_cached = cache_nbytes // chunk_nbytes_min if chunk_nbytes_min else 1
+    return cache_nbytes, _next_prime(100 * min(num_cached, 1000))
+
+
+def _get_read_cache_args(cache_size_mb: int, cache_modulus: int) -> Dict[str, Any]:
+    """Returns the chunk cache keyword arguments of h5py.File() for reading a file.
+
+    If cache_size_mb is not positive, the file uses the default HDF5 cache, and
+    _open_dataset() gives each dataset its own automatically sized cache instead.
+    """
+    if cache_size_mb > 0:
+        return dict(rdcc_nbytes=cache_size_mb * MB_SIZE, rdcc_nslots=cache_modulus, rdcc_w0=1.0)
+    return {}
+
+
+def _open_dataset(grp: h5py.Group, name: str, access_pattern: Optional[str]) -> h5py.Dataset:
+    """Opens the given dataset.
+
+    If access_pattern is not None, the dataset is opened with its own chunk cache, sized by
+    _get_auto_cache_args() from this dataset alone.
+    """
+    dset = grp[name]
+    if access_pattern is None or dset.chunks is None:
+        return dset
+    cache_nbytes, cache_nslots = _get_auto_cache_args(
+        [(dset.shape, dset.chunks, dset.dtype.itemsize)], access_pattern)
+    dapl = h5py.h5p.create(h5py.h5p.DATASET_ACCESS)
+    dapl.set_chunk_cache(cache_nslots, cache_nbytes, 1.0)
+    return h5py.Dataset(h5py.h5d.open(grp.id, name.encode(), dapl=dapl))
+
+
+def _get_access_pattern(f: h5py.File) -> str:
+    """Returns the access pattern recorded in the given HDF5 file."""
+    ans = f.attrs.get('access_pattern', '')
+    return ans.decode() if isinstance(ans, bytes) else str(ans)
+
+
+def _get_cache_args(cache_size_mb: int, cache_modulus: int,
+                    dset_info: Callable[[], Iterable[Tuple[Tuple[int, ...],
+                                                           Optional[Tuple[int, ...]], int]]],
+                    access_pattern: str) -> Dict[str, Any]:
+    """Returns the chunk cache keyword arguments of h5py.File().
+
+    dset_info is only called if the cache is sized automatically.
+    """
+    if cache_size_mb > 0:
+        return _get_read_cache_args(cache_size_mb, cache_modulus)
+    cache_nbytes, cache_nslots = _get_auto_cache_args(dset_info(), access_pattern)
+    return dict(rdcc_nbytes=cache_nbytes, rdcc_nslots=cache_nslots, rdcc_w0=1.0)
+
+
+def _get_append_shapes(ana: AnalysisData, name: str, arr: np.ndarray
+                       ) -> Tuple[np.ndarray, Tuple[int, ...], Tuple[Optional[int], ...]]:
+    """Returns the data, the shape used for chunking, and the maximum shape of a resizable dataset.
+
+    Resizable datasets are chunked as if the append axis is long.
+    """
+    axis = _get_append_axis(ana, name)
+    if name in ana.sweep_params:
+        arr = np.ravel(arr)
+    maxshape: List[Optional[int]] = list(arr.shape)
+    maxshape[axis] = None
+    chunk_shape = list(arr.shape)
+    chunk_shape[axis] = MB_SIZE
+    return arr, tuple(chunk_shape), tuple(maxshape)
+
+
+def _get_sim_data_dset_info(data: SimData, chunk_size_mb: int, append_group: str,
+                            chunk_strategy: str, access_pattern: str
+                            ) -> List[Tuple[Tuple[int, ...], Optional[Tuple[int, ...]], int]]:
+    """Returns the (shape, chunk shape, element size) of all datasets _write_sim_data() creates."""
+    ans = []
+    cur_group = data.group
+    for group in data.group_list:
+        data.open_group(group)
+        ana = data.get_analysis(group)
+        for name, arr in data.items():
+            arr = np.asarray(arr)
+            kwargs: Dict[str, Any] = {}
+            if group == append_group:
+                arr, chunk_shape, _ = _get_append_shapes(ana, name, arr)
+                _set_chunk_args(kwargs, max(chunk_size_mb, 1), chunk_shape, arr.dtype.itemsize,
+                                chunk_strategy, access_pattern)
+            else:
+                _set_chunk_args(kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize,
+                                chunk_strategy, access_pattern)
+            ans.append((arr.shape, kwargs.get('chunks', None), arr.dtype.itemsize))
+    if cur_group:
+        data.open_group(cur_group)
+    return ans
+
+
 def save_sim_data_hdf5(data: SimData, hdf5_path: Path, compress: bool = True,
                        chunk_size_mb: int = 2, cache_size_mb: int = 20,
-                       cache_modulus: int = 2341) -> None:
+                       cache_modulus: int = 2341, chunk_strategy: str = 'auto',
+                       codec: Union[str, Mapping[str, str]] = '', num_threads: int = 0,
+                       access_pattern: str = '') -> None:
     """Saves the given MDArray as a HDF5 file.
 
     The simulation environments are stored as fixed length byte strings,
@@ -97,55 +348,641 @@ def save_sim_data_hdf5(data: SimData, hdf5_path: Path, compress: bool = True,
     chunk_size_mb : int
         HDF5 data chunk size, in megabytes.  0 to disable.
     cache_size_mb : int
-        HDF5 file chunk cache size, in megabytes.
+        HDF5 file chunk cache size, in megabytes.  0 to size the cache automatically from the
+        shapes of the datasets to write.
     cache_modulus : int
-        HDF5 file chunk cache modulus.
+        HDF5 file chunk cache modulus.  Ignored if the cache is sized automatically.
+    chunk_strategy : str
+        the data chunking strategy, one of 'inner', 'time', 'corner', or 'auto'.  Use 'time'
+        if signals are usually read one corner at a time, and 'corner' if they are usually read
+        one point at a time across all corners.  'auto' picks one of them from access_pattern.
+        See _set_chunk_args() for details.
+    codec : Union[str, Mapping[str, str]]
+        the compression codec, either a single codec or a dictionary from analysis name to
+        codec, where the '' entry is the codec of all other analyses.  A codec is written as
+        'name' or 'name:level', where name is one of 'lzf', 'gzip', 'blosc', 'blosc-<compressor>'
+        (e.g. 'blosc-lz4', 'blosc-zstd'), or 'none', and level is the compression level from 0
+        to 9.  Defaults to BLOSC if available, LZF otherwise.
+    num_threads : int
+        number of threads used to compress data.  If nonzero, gzip and BLOSC chunks are
+        compressed on a thread pool and written to file directly, bypassing the HDF5 filter
+        pipeline.  Negative to use all CPUs.  The resulting file is the same either way.
+    access_pattern : str
+        the expected read access pattern, one of 'per_corner', 'cross_corner', or '' if
+        unknown.  It selects the 'auto' chunk strategy, and is saved in the file so that
+        load_sim_data_hdf5() can size its chunk cache for it.
     """
     # create parent directory
     hdf5_path.parent.mkdir(parents=True, exist_ok=True)
 
-    str_kwargs: Dict[str, Any] = {}
+    cache_kwargs = _get_cache_args(
+        cache_size_mb, cache_modulus,
+        lambda: _get_sim_data_dset_info(data, chunk_size_mb, '', chunk_strategy, access_pattern),
+        access_pattern)
+    with h5py.File(str(hdf5_path), 'w', libver='latest', **cache_kwargs) as f:
+        _write_sim_data(f, data, compress, chunk_size_mb, '', chunk_strategy, codec, num_threads,
+                        access_pattern)
+
+
+def _parse_codec(codec: str) -> Tuple[str, str, int]:
+    """Returns the (filter, BLOSC compressor, level) tuple of the given codec string."""
+    name, _, level_str = codec.partition(':')
+    if not name:
+        name = 'lzf' if BLOSC_FILTER is None else 'blosc'
+    filt, _, cname = name.partition('-')
+    if filt == 'blosc':
+        if BLOSC_FILTER is None:
+            raise ValueError(f'Cannot use codec {codec}: BLOSC filter is not available.')
+        if not cname:
+            cname = 'blosclz'
+        elif cname not in BLOSC_COMPRESSORS:
+            raise ValueError(f'Unknown BLOSC compressor {cname}, must be one of '
+                             f'{BLOSC_COMPRESSORS}')
+        default_level = 5
+    elif cname or (filt != 'gzip' and filt != 'lzf' and filt != 'none'):
+        raise ValueError(f'Unknown HDF5 codec: {codec}')
+    else:
+        default_level = 4 if filt == 'gzip' else 0
+
+    level = int(level_str) if level_str else default_level
+    if level < 0 or level > 9:
+        raise ValueError(f'Compression level of codec {codec} must be between 0 and 9.')
+    return filt, cname, level
+
+
+def _get_group_codec(codec: Union[str, Mapping[str, str]], group: str) -> str:
+    if isinstance(codec, str):
+        return codec
+    return codec.get(group, codec.get('', ''))
+
+
+def _get_dset_kwargs(compress: bool, chunk_size_mb: int, codec: str = '') -> Dict[str, Any]:
     dset_kwargs: Dict[str, Any] = {}
     if compress:
+        filt, cname, level = _parse_codec(codec)
+        if filt == 'none':
+            return dset_kwargs
         if chunk_size_mb == 0:
             raise ValueError('Compression can only be done with chunk storage')
-        if BLOSC_FILTER is None:
+        if filt == 'lzf':
             dset_kwargs['compression'] = 'lzf'
             dset_kwargs['shuffle'] = True
+        elif filt == 'gzip':
+            dset_kwargs['compression'] = 'gzip'
+            dset_kwargs['compression_opts'] = level
+            dset_kwargs['shuffle'] = True
         else:
             dset_kwargs['compression'] = BLOSC_FILTER
-            dset_kwargs['compression_opts'] = (0, 0, 0, 0, 5, 1, 0)
+            dset_kwargs['compression_opts'] = (0, 0, 0, 0, level, 1,
+                                               BLOSC_COMPRESSORS.index(cname))
             dset_kwargs['shuffle'] = False
+    return dset_kwargs
+
+
+def _can_write_direct(compress: bool, codec: str, arr: np.ndarray) -> bool:
+    """Returns True if chunks of the given array can be pre-compressed in Python."""
+    if not compress or arr.ndim == 0 or arr.size == 0 or arr.dtype.kind not in 'biufc':
+        return False
+    filt = _parse_codec(codec)[0]
+    return filt == 'gzip' or (filt == 'blosc' and blosc is not None)
+
+
+def _iter_chunks(arr: np.ndarray, chunks: Tuple[int, ...]
+                 ) -> Iterator[Tuple[Tuple[int, ...], np.ndarray]]:
+    """Iterates over (offset, data) of all chunks of the given array, padding edge chunks."""
+    for offset in product(*(range(0, n, c) for n, c in zip(arr.shape, chunks))):
+        block = arr[tuple(slice(o, o + c) for o, c in zip(offset, chunks))]
+        if block.shape != chunks:
+            buf = np.zeros(chunks, dtype=arr.dtype)
+            buf[tuple(slice(0, n) for n in block.shape)] = block
+            block = buf
+        yield offset, block
+
+
+def _compress_chunk(block: np.ndarray, codec: str) -> bytes:
+    """Compresses the given chunk exactly as the HDF5 filter pipeline of _get_dset_kwargs()."""
+    filt, cname, level = _parse_codec(codec)
+    block = np.ascontiguousarray(block)
+    unit_size = block.dtype.itemsize
+    if filt == 'blosc':
+        return blosc.compress(block.tobytes(), typesize=unit_size, clevel=level,
+                              shuffle=blosc.SHUFFLE, cname=cname)
+    # HDF5 shuffle filter followed by the deflate filter
+    if unit_size > 1:
+        block = block.reshape(-1).view(np.uint8).reshape(-1, unit_size).T
+    return zlib.compress(np.ascontiguousarray(block).tobytes(), level)
+
+
+def _write_direct_chunks(jobs: Sequence[Tuple[h5py.Dataset, np.ndarray, str]],
+                         num_threads: int) -> None:
+    """Compresses the data of the given datasets on a thread pool, and writes them to file.
+
+    Compression releases the GIL, so all chunks of all datasets are compressed concurrently.
+    HDF5 library calls are not thread-safe, so compressed chunks are written by this thread.
+    """
+    if not jobs:
+        return
+    if num_threads < 0:
+        num_threads = os.cpu_count() or 1
+
+    chunk_list = []
+    codec_list = []
+    for dset, arr, codec in jobs:
+        for offset, block in _iter_chunks(arr, dset.chunks):
+            chunk_list.append((dset, offset, block))
+            codec_list.append(codec)
+
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = executor.map(_compress_chunk, (info[2] for info in chunk_list), codec_list)
+        for (dset, offset, _), buf in zip(chunk_list, results):
+            dset.id.write_direct_chunk(offset, buf)
+
+
+def _get_append_axis(ana: AnalysisData, name: str) -> int:
+    """Returns the axis AnalysisData.add() appends new sweep points of the given entry to."""
+    if name in ana.sweep_params or ana[name].ndim <= 1:
+        return 0
+    return 1
+
+
+def _write_sim_data(f: h5py.File, data: SimData, compress: bool, chunk_size_mb: int,
+                    append_group: str, chunk_strategy: str = 'auto',
+                    codec: Union[str, Mapping[str, str]] = '', num_threads: int = 0,
+                    access_pattern: str = '') -> None:
+    str_kwargs: Dict[str, Any] = {}
+    direct_jobs: List[Tuple[h5py.Dataset, np.ndarray, str]] = []
+
+    arr = np.array(data.sim_envs, dtype='S')
+    _set_chunk_args(str_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize)
+    f.create_dataset('__corners', data=arr, **str_kwargs)
+    f.attrs['netlist_type'] = data.netlist_type.value
+    if access_pattern:
+        f.attrs['access_pattern'] = access_pattern
+    for group in data.group_list:
+        data.open_group(group)
+        grp_codec = _get_group_codec(codec, group)
+        dset_kwargs = _get_dset_kwargs(compress, chunk_size_mb, grp_codec)
+        grp = f.create_group(group)
+        grp.attrs['is_md'] = data.is_md
+        arr = np.array(data.sweep_params, dtype='S')
+        _set_chunk_args(str_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize)
+        grp.create_dataset('__sweep_params', data=arr, **str_kwargs)
+        for name, arr in data.items():
+            if group == append_group:
+                arr, chunk_shape, maxshape = _get_append_shapes(data.get_analysis(group), name,
+                                                                arr)
+                cur_kwargs = dict(dset_kwargs)
+                _set_chunk_args(cur_kwargs, max(chunk_size_mb, 1), chunk_shape,
+                                arr.dtype.itemsize, chunk_strategy, access_pattern)
+                grp.create_dataset(name, data=arr, maxshape=maxshape, **cur_kwargs)
+            else:
+                _set_chunk_args(dset_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize,
+                                chunk_strategy, access_pattern)
+                if num_threads != 0 and _can_write_direct(compress, grp_codec, arr):
+                    dset = grp.create_dataset(name, shape=arr.shape, dtype=arr.dtype,
+                                              **dset_kwargs)
+                    direct_jobs.append((dset, arr, grp_codec))
+                else:
+                    grp.create_dataset(name, data=arr, **dset_kwargs)
+
+    _write_direct_chunks(direct_jobs, num_threads)
+
+
+class SimDataHDF5Appender:
+    """Streams new sweep points of a non-MD analysis into a HDF5 file.
+
+    The given simulation data is written to file in the same format as save_sim_data_hdf5(),
+    except that the datasets of the given analysis are resizable.  New sweep points passed
+    to add() are appended directly to those datasets, whose capacities double when full, so
+    accumulating many sweep points takes linear time and does not keep them in memory.  The
+    file can be read with load_sim_data_hdf5() after this appender is closed.
+
+    Parameters
+    ----------
+    data : SimData
+        the initial simulation data.
+    hdf5_path : Path
+        the hdf5 file path.
+    group : str
+        the analysis to append to.  Defaults to the currently opened analysis.
+    compress : bool
+        True to compress the data.
+    chunk_size_mb : int
+        HDF5 data chunk size, in megabytes.
+    cache_size_mb : int
+        HDF5 file chunk cache size, in megabytes.  0 to size the cache automatically.
+    cache_modulus : int
+        HDF5 file chunk cache modulus.  Ignored if the cache is sized automatically.
+    chunk_strategy : str
+        the data chunking strategy.  See save_sim_data_hdf5().
+    codec : Union[str, Mapping[str, str]]
+        the compression codec.  See save_sim_data_hdf5().
+    access_pattern : str
+        the expected read access pattern.  See save_sim_data_hdf5().
+    """
+
+    def __init__(self, data: SimData, hdf5_path: Path, group: str = '', compress: bool = True,
+                 chunk_size_mb: int = 2, cache_size_mb: int = 20,
+                 cache_modulus: int = 2341, chunk_strategy: str = 'auto',
+                 codec: Union[str, Mapping[str, str]] = '', access_pattern: str = '') -> None:
+        if not group:
+            group = data.group
+        self._ana = data.get_analysis(group)
+        if self._ana.is_md:
+            raise ValueError('Can only append to analysis with is_md = False.')
+
+        hdf5_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_kwargs = _get_cache_args(
+            cache_size_mb, cache_modulus,
+            lambda: _get_sim_data_dset_info(data, chunk_size_mb, group, chunk_strategy,
+                                            access_pattern),
+            access_pattern)
+        self._file: Optional[h5py.File] = h5py.File(str(hdf5_path), 'w', libver='latest',
+                                                    **cache_kwargs)
+        _write_sim_data(self._file, data, compress, chunk_size_mb, group, chunk_strategy,
+                        codec, access_pattern=access_pattern)
+        data.open_group(group)
+
+        self._grp = self._file[group]
+        self._axes = {name: _get_append_axis(self._ana, name) for name, _ in self._ana.items()}
+        self._lengths = {name: self._grp[name].shape[axis] for name, axis in self._axes.items()}
+
+    def __enter__(self) -> SimDataHDF5Appender:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def add(self, new_data: Mapping[str, np.ndarray]) -> None:
+        """Append new sweep points to file.
+
+        Parameters
+        ----------
+        new_data : Mapping[str, np.ndarray]
+            the new sweep points, in the same format as AnalysisData.add().
+        """
+        if self._file is None:
+            raise ValueError('This appender is closed.')
+        self._ana.check_add_data(new_data)
+
+        for name, arr in new_data.items():
+            axis = self._axes[name]
+            arr = np.ravel(arr) if name in self._ana.sweep_params else np.atleast_1d(arr)
+            dset = self._grp[name]
+            n_cur = self._lengths[name]
+            n_tot = n_cur + arr.shape[axis]
+            cap = dset.shape[axis]
+            if cap < n_tot:
+                dset.resize(max(n_tot, 2 * cap), axis=axis)
+            dset[(slice(None),) * axis + (slice(n_cur, n_tot),)] = arr
+            self._lengths[name] = n_tot
+
+    def close(self) -> None:
+        """Trim all datasets to their final sizes and close the file."""
+        if self._file is not None:
+            for name, axis in self._axes.items():
+                self._grp[name].resize(self._lengths[name], axis=axis)
+            self._file.close()
+            self._file = None
+
+
+def combine_sim_data_hdf5(path_list: Sequence[Path], out_path: Path, swp_name: str,
+                          swp_vals: Optional[np.ndarray] = None, virtual: bool = False,
+                          compress: bool = True, chunk_size_mb: int = 2, cache_size_mb: int = 20,
+                          cache_modulus: int = 2341, chunk_strategy: str = 'auto',
+                          codec: Union[str, Mapping[str, str]] = '', num_threads: int = 0,
+                          access_pattern: str = '') -> None:
+    """Combine simulation data in the given HDF5 files into a single HDF5 file.
 
-    with h5py.File(str(hdf5_path), 'w', libver='latest', rdcc_nbytes=cache_size_mb * MB_SIZE,
-                   rdcc_w0=1.0, rdcc_nslots=cache_modulus) as f:
-        arr = np.array(data.sim_envs, dtype='S')
+    The result is the same as loading all files, combining them with SimData.combine(), and
+    saving the result, but at most one source dataset is held in memory at any time.
+
+    Parameters
+    ----------
+    path_list : Sequence[Path]
+        the HDF5 files to combine.
+    out_path : Path
+        the output HDF5 file path.
+    swp_name : str
+        name of the new sweep parameter.
+    swp_vals : Optional[np.ndarray]
+        values of the new sweep parameter.  Defaults to the file indices.
+    virtual : bool
+        If True, signals are stored as virtual datasets that refer to the source files, so no
+        signal data is copied.  The source files must be kept alongside the output file.
+        Otherwise, signals are copied to the output file one source at a time.
+    compress : bool
+        True to compress copied data.
+    chunk_size_mb : int
+        HDF5 data chunk size, in megabytes.
+    cache_size_mb : int
+        HDF5 file chunk cache size, in megabytes.  0 to size the cache of the output file
+        automatically.  Source files are read one whole dataset at a time, so they use the
+        default HDF5 cache in that case.
+    cache_modulus : int
+        HDF5 file chunk cache modulus.  Ignored if the cache is sized automatically.
+    chunk_strategy : str
+        the chunking strategy of copied data.  See save_sim_data_hdf5().
+    codec : Union[str, Mapping[str, str]]
+        the compression codec of copied data.  See save_sim_data_hdf5().
+    num_threads : int
+        number of compression threads.  If nonzero and the codec supports direct chunk writes,
+        each signal is combined in memory and compressed on a thread pool.  See
+        save_sim_data_hdf5().
+    access_pattern : str
+        the expected read access pattern.  Defaults to the access pattern of the first file.
+        See save_sim_data_hdf5().
+    """
+    ndata = len(path_list)
+    if ndata < 1:
+        raise ValueError('Must combine at least 1 data.')
+    if swp_vals is None:
+        swp_vals = np.arange(ndata)
+
+    src_list = []
+    try:
+        for path in path_list:
+            src_list.append(h5py.File(str(path), 'r',
+                                      **_get_read_cache_args(cache_size_mb, cache_modulus)))
+        if not access_pattern:
+            access_pattern = _get_access_pattern(src_list[0])
+
+        cache_kwargs = _get_cache_args(
+            cache_size_mb, cache_modulus,
+            lambda: _get_combine_dset_info(src_list, chunk_size_mb, chunk_strategy,
+                                           access_pattern),
+            access_pattern)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with h5py.File(str(out_path), 'w', libver='latest', **cache_kwargs) as f:
+            _combine_hdf5_files(f, src_list, path_list, swp_name, swp_vals, virtual, compress,
+                                chunk_size_mb, chunk_strategy, codec, num_threads,
+                                access_pattern)
+    finally:
+        for src in src_list:
+            src.close()
+
+
+def _combine_hdf5_files(f: h5py.File, src_list: Sequence[h5py.File], path_list: Sequence[Path],
+                        swp_name: str, swp_vals: np.ndarray, virtual: bool, compress: bool,
+                        chunk_size_mb: int, chunk_strategy: str = 'auto',
+                        codec: Union[str, Mapping[str, str]] = '', num_threads: int = 0,
+                        access_pattern: str = '') -> None:
+    str_kwargs: Dict[str, Any] = {}
+    ndata = len(src_list)
+    src0 = src_list[0]
+
+    arr = src0['__corners'][:]
+    _set_chunk_args(str_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize)
+    f.create_dataset('__corners', data=arr, **str_kwargs)
+    for key, val in src0.attrs.items():
+        f.attrs[key] = val
+    if access_pattern:
+        f.attrs['access_pattern'] = access_pattern
+
+    for group, grp0 in src0.items():
+        if group == '__corners':
+            continue
+        swp_par_list: List[str] = grp0['__sweep_params'][:].astype('U').tolist()
+        signals = _get_combine_signals(grp0)
+        dset_list = [src[group] for src in src_list]
+        grp_codec = _get_group_codec(codec, group)
+        dset_kwargs = _get_dset_kwargs(compress, chunk_size_mb, grp_codec)
+
+        grp = f.create_group(group)
+        is_md = bool(grp0.attrs['is_md'])
+        grp.attrs['is_md'] = is_md
+
+        # signals: stack along axis 1, padded with NaN to the largest shape
+        max_size = None
+        for sig in signals:
+            sizes, max_size, out_shape, dtype = _get_combine_shapes(dset_list, sig)
+            if virtual:
+                layout = h5py.VirtualLayout(shape=out_shape, dtype=dtype)
+                for idx, (path, size) in enumerate(zip(path_list, sizes)):
+                    vsrc = h5py.VirtualSource(str(path.resolve()), f'{group}/{sig}', shape=size)
+                    layout[_get_combine_select(idx, size)] = vsrc
+                grp.create_virtual_dataset(sig, layout, fillvalue=np.nan)
+            else:
+                _set_chunk_args(dset_kwargs, chunk_size_mb, out_shape, dtype.itemsize,
+                                chunk_strategy, access_pattern)
+                dset = grp.create_dataset(sig, shape=out_shape, dtype=dtype, fillvalue=np.nan,
+                                          **dset_kwargs)
+                if num_threads != 0 and _can_write_direct(compress, grp_codec,
+                                                          np.empty(1, dtype=dtype)):
+                    # combine this signal in memory, then compress chunks in parallel
+                    arr = np.full(out_shape, np.nan, dtype=dtype)
+                    for idx, (src_grp, size) in enumerate(zip(dset_list, sizes)):
+                        arr[_get_combine_select(idx, size)] = src_grp[sig][()]
+                    _write_direct_chunks([(dset, arr, grp_codec)], num_threads)
+                    del arr
+                else:
+                    for idx, (src_grp, size) in enumerate(zip(dset_list, sizes)):
+                        dset[_get_combine_select(idx, size)] = src_grp[sig][()]
+
+        # last sweep parameter: only becomes multi-dimensional if it differs between sources
+        last_par = swp_par_list[-1]
+        xvec_list = [src_grp[last_par][()] for src_grp in dset_list]
+        last_xvec = xvec_list[0]
+        for xvec in xvec_list:
+            if not np.array_equal(xvec_list[0], xvec):
+                cur_ans = np.full((ndata,) + tuple(max_size), np.nan)
+                for idx, _xvec in enumerate(xvec_list):
+                    # noinspection PyTypeChecker
+                    select = (idx, ...) + tuple(slice(0, s) for s in _xvec.shape)
+                    cur_ans[select] = _xvec
+                last_xvec = np.moveaxis(cur_ans, 0, 1)
+                break
+        del xvec_list
+
+        new_params = {last_par: last_xvec, swp_name: swp_vals}
+        # get all other sweep params
+        for sn in swp_par_list[:-1]:
+            if sn != 'corner':
+                new_params[sn] = grp0[sn][()]
+
+        swp_par_list.insert(1, swp_name)
+        arr = np.array(swp_par_list, dtype='S')
         _set_chunk_args(str_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize)
-        f.create_dataset('__corners', data=arr, **str_kwargs)
-        f.attrs['netlist_type'] = data.netlist_type.value
-        for group in data.group_list:
-            data.open_group(group)
-            grp = f.create_group(group)
-            grp.attrs['is_md'] = data.is_md
-            arr = np.array(data.sweep_params, dtype='S')
-            _set_chunk_args(str_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize)
-            grp.create_dataset('__sweep_params', data=arr, **str_kwargs)
-            for name, arr in data.items():
-                _set_chunk_args(dset_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize)
-                grp.create_dataset(name, data=arr, **dset_kwargs)
-
-
-def load_sim_data_hdf5(path: Path, cache_size_mb: int = 20, cache_modulus: int = 2341) -> SimData:
+        grp.create_dataset('__sweep_params', data=arr, **str_kwargs)
+        for name, arr in new_params.items():
+            arr = np.asarray(arr)
+            _set_chunk_args(dset_kwargs, chunk_size_mb, arr.shape, arr.dtype.itemsize,
+                            chunk_strategy, access_pattern)
+            grp.create_dataset(name, data=arr, **dset_kwargs)
+
+
+def _get_combine_signals(grp: h5py.Group) -> List[str]:
+    """Returns the signal names of the given analysis group."""
+    swp_set = set(grp['__sweep_params'][:].astype('U').tolist())
+    return [name for name in grp.keys() if name != '__sweep_params' and name not in swp_set]
+
+
+def _get_combine_shapes(dset_list: Sequence[h5py.Group], sig: str
+                        ) -> Tuple[List[Tuple[int, ...]], Tuple[int, ...], Tuple[int, ...],
+                                   np.dtype]:
+    """Returns the source shapes, the largest source shape, the output shape, and the output
+    data type of the given signal."""
+    sizes = [src_grp[sig].shape for src_grp in dset_list]
+    max_size = tuple(np.max(list(zip(*sizes)), -1).tolist())
+    out_shape = max_size[:1] + (len(dset_list),) + max_size[1:]
+    dtype = np.result_type(np.float64, *(src_grp[sig].dtype for src_grp in dset_list))
+    return sizes, max_size, out_shape, dtype
+
+
+def _get_combine_dset_info(src_list: Sequence[h5py.File], chunk_size_mb: int,
+                           chunk_strategy: str, access_pattern: str
+                           ) -> List[Tuple[Tuple[int, ...], Optional[Tuple[int, ...]], int]]:
+    """Returns the (shape, chunk shape, element size) of the signals in the combined file."""
+    ans = []
+    for group, grp0 in src_list[0].items():
+        if group == '__corners':
+            continue
+        dset_list = [src[group] for src in src_list]
+        for sig in _get_combine_signals(grp0):
+            out_shape, dtype = _get_combine_shapes(dset_list, sig)[2:]
+            kwargs: Dict[str, Any] = {}
+            _set_chunk_args(kwargs, chunk_size_mb, out_shape, dtype.itemsize, chunk_strategy,
+                            access_pattern)
+            ans.append((out_shape, kwargs.get('chunks', None), dtype.itemsize))
+    return ans
+
+
+def _get_combine_select(idx: int, size: Tuple[int, ...]) -> Tuple[Any, ...]:
+    """Returns the output selection of the source with the given index and shape."""
+    return (slice(0, size[0]), idx) + tuple(slice(0, s) for s in size[1:])
+
+
+def _get_hdf5_selection(grp: h5py.Group, sweep_params: List[str], is_md: bool, env_sel: Any,
+                        slices: Optional[Mapping[str, Union[slice, Tuple[float, float]]]]
+                        ) -> List[Any]:
+    """Returns the per-axis selection of the datasets in the given analysis group."""
+    ndim = max((dset.ndim for name, dset in grp.items() if name != '__sweep_params'),
+               default=1)
+    ans: List[Any] = [slice(None)] * max(ndim, len(sweep_params), 1)
+    ans[0] = env_sel
+    if slices:
+        for name, val in slices.items():
+            if name not in sweep_params:
+                continue
+            if not is_md:
+                raise ValueError(f'Cannot select sweep parameter {name} of non-MD '
+                                 f'analysis {grp.name}')
+            axis = sweep_params.index(name)
+            if isinstance(val, slice):
+                ans[axis] = val
+            else:
+                dset = grp[name]
+                lower, upper = val
+                vals = dset[()]
+                if dset.ndim == 1:
+                    mask = (vals >= lower) & (vals <= upper)
+                elif axis == len(sweep_params) - 1:
+                    # x vector that differs between corners: take the union of the selected
+                    # points of all selected corners
+                    vals = vals[env_sel]
+                    mask = np.any((vals >= lower) & (vals <= upper),
+                                  axis=tuple(range(vals.ndim - 1)))
+                else:
+                    raise ValueError(f'Cannot select value range of multi-dimensional '
+                                     f'sweep parameter {name}')
+                ans[axis] = _get_mask_selection(mask)
+    return ans
+
+
+def _get_mask_selection(mask: np.ndarray) -> Union[slice, List[int]]:
+    """Returns the selection of the True entries in the given 1-D boolean mask."""
+    idx_arr = np.flatnonzero(mask)
+    if idx_arr.size == 0:
+        return slice(0, 0)
+    start = int(idx_arr[0])
+    stop = int(idx_arr[-1]) + 1
+    if stop - start == idx_arr.size:
+        return slice(start, stop)
+    return idx_arr.tolist()
+
+
+def _read_selection(dset: h5py.Dataset, sel: Sequence[Any]) -> np.ndarray:
+    """Reads the given per-axis selection of the given dataset.
+
+    h5py only supports one index list per selection, so any other index lists are read as
+    their bounding slices, then indexed in memory.
+    """
+    h5_sel = []
+    post_sel = []
+    has_list = False
+    for axis, cur_sel in enumerate(sel):
+        if isinstance(cur_sel, slice):
+            h5_sel.append(cur_sel)
+        elif not has_list:
+            has_list = True
+            h5_sel.append(cur_sel)
+        else:
+            start = cur_sel[0]
+            h5_sel.append(slice(start, cur_sel[-1] + 1))
+            post_sel.append((axis, np.asarray(cur_sel) - start))
+
+    ans = dset[tuple(h5_sel)]
+    for axis, idx_arr in post_sel:
+        ans = np.take(ans, idx_arr, axis=axis)
+    return ans
+
+
+def load_sweep_params_hdf5(path: Path) -> Dict[str, List[str]]:
+    """Read only the sweep parameters of each analysis from HDF5 file.
+
+    Parameters
+    ----------
+    path : Path
+        the file to read.
+
+    Returns
+    -------
+    sweep_params : Dict[str, List[str]]
+        the sweep parameters of each analysis.
+    """
+    if not path.is_file():
+        raise FileNotFoundError(f'{path} is not a file.')
+
+    ans = {}
+    with h5py.File(str(path), 'r') as f:
+        for ana, obj in f.items():
+            if ana != '__corners':
+                ans[ana] = obj['__sweep_params'][:].astype('U').tolist()
+    return ans
+
+
+def load_sim_data_hdf5(path: Path, cache_size_mb: int = 20, cache_modulus: int = 2341,
+                       groups: Optional[Sequence[str]] = None,
+                       signals: Optional[Sequence[str]] = None,
+                       corners: Optional[Sequence[str]] = None,
+                       slices: Optional[Mapping[str, Union[slice, Tuple[float, float]]]] = None
+                       ) -> SimData:
     """Read simulation results from HDF5 file.
 
+    The optional selection arguments are applied while reading, so only the selected parts
+    of each dataset are read from file.
+
     Parameters
     ----------
     path : Path
         the file to read.
     cache_size_mb : int
-        HDF5 file chunk cache size, in megabytes.
+        HDF5 file chunk cache size, in megabytes.  0 to give each dataset read its own chunk
+        cache, sized from its shape and the access pattern saved in the file.  The file is
+        opened once either way.
     cache_modulus : int
-        HDF5 file chunk cache modulus.
+        HDF5 file chunk cache modulus.  Ignored if the cache is sized automatically.
+    groups : Optional[Sequence[str]]
+        if given, only read these analyses.
+    signals : Optional[Sequence[str]]
+        if given, only read these signals.  Sweep parameters are always read.
+    corners : Optional[Sequence[str]]
+        if given, only read these corners.  Corners are returned in file order.
+    slices : Optional[Mapping[str, Union[slice, Tuple[float, float]]]]
+        selection along sweep parameters of multi-dimensional analyses.  The value is either
+        an index slice, or an inclusive (lower, upper) range of parameter values.  If the last
+        sweep parameter differs between corners (e.g. transient time), a value range selects
+        every point that is in range for any selected corner.
 
     Returns
     -------
@@ -154,24 +991,53 @@ def load_sim_data_hdf5(path: Path, cache_size_mb: int = 20, cache_modulus: int =
     """
     if not path.is_file():
         raise FileNotFoundError(f'{path} is not a file.')
+    if groups is not None and not groups:
+        raise ValueError('groups cannot be empty; use None to read all analyses.')
+    if signals is not None and not signals:
+        raise ValueError('signals cannot be empty; use None to read all signals.')
+    if corners is not None and not corners:
+        raise ValueError('corners cannot be empty; use None to read all corners.')
+
+    cache_kwargs = _get_read_cache_args(cache_size_mb, cache_modulus)
+    with h5py.File(str(path), 'r', **cache_kwargs) as f:
+        dset_access = _get_access_pattern(f) if cache_size_mb <= 0 else None
+        corners_all: List[str] = f['__corners'][:].astype('U').tolist() if '__corners' in f else []
+        if corners is None:
+            env_sel = slice(None)
+            corners_out = corners_all
+        else:
+            try:
+                env_sel = sorted({corners_all.index(env) for env in corners})
+            except ValueError:
+                raise ValueError(f'Some corners in {corners} not found in {path}')
+            corners_out = [corners_all[idx] for idx in env_sel]
 
-    with h5py.File(str(path), 'r', rdcc_nbytes=cache_size_mb * MB_SIZE, rdcc_nslots=cache_modulus,
-                   rdcc_w0=1.0) as f:
-        corners: List[str] = []
         ana_dict: Dict[str, AnalysisData] = {}
         for ana, obj in f.items():
-            if ana == '__corners':
-                corners = obj[:].astype('U').tolist()
-            else:
-                sweep_params: List[str] = []
-                sig_dict: Dict[str, np.ndarray] = {}
-                is_md: bool = bool(obj.attrs['is_md'])
-                for sig, dset in obj.items():
-                    if sig == '__sweep_params':
-                        sweep_params = dset[:].astype('U').tolist()
+            if ana == '__corners' or (groups is not None and ana not in groups):
+                continue
+
+            sweep_params: List[str] = obj['__sweep_params'][:].astype('U').tolist()
+            is_md: bool = bool(obj.attrs['is_md'])
+            sel = _get_hdf5_selection(obj, sweep_params, is_md, env_sel, slices)
+            sig_dict: Dict[str, np.ndarray] = {}
+            for sig in obj.keys():
+                if sig == '__sweep_params' or (sig not in sweep_params and signals is not None
+                                               and sig not in signals):
+                    continue
+                dset = _open_dataset(obj, sig, dset_access)
+                if sig in sweep_params:
+                    if dset.ndim == 1:
+                        # 1-D sweep values are only indexed by their own axis in MD arrays
+                        sig_dict[sig] = dset[sel[sweep_params.index(sig)] if is_md else ()]
                     else:
-                        sig_dict[sig] = dset[:]
-                ana_dict[ana] = AnalysisData(sweep_params, sig_dict, is_md)
+                        sig_dict[sig] = _read_selection(dset, sel[:dset.ndim])
+                else:
+                    sig_dict[sig] = _read_selection(dset, sel[:dset.ndim])
+            ana_dict[ana] = AnalysisData(sweep_params, sig_dict, is_md)
+
+        if not ana_dict:
+            raise ValueError(f'None of the analyses {groups} found in {path}')
 
         netlist_code = f.attrs.get('netlist_type', None)
         if netlist_code is None:
@@ -181,6 +1047,6 @@ def load_sim_data_hdf5(path: Path, cache_size_mb: int = 20, cache_modulus: int =
         else:
             netlist_type = DesignOutput(netlist_code)
 
-        ans = SimData(corners, ana_dict, netlist_type)
+        ans = SimData(corners_out, ana_dict, netlist_type)
 
     return ans
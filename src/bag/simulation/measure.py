@@ -139,6 +139,24 @@ class MeasurementManager(LoggingBase, abc.ABC):
         """Commit changes to specs dictionary.  Perform necessary initialization."""
         pass
 
+    # noinspection PyMethodMayBeStatic, PyUnusedLocal
+    def get_sim_data_selection(self, cur_info: MeasInfo) -> Optional[Mapping[str, Any]]:
+        """Returns the parts of the simulation data process_output() needs.
+
+        Override to only read the given groups, signals, corners, or sweep slices from file.
+
+        Parameters
+        ----------
+        cur_info : MeasInfo
+            the MeasInfo object representing the current measurement state.
+
+        Returns
+        -------
+        selection : Optional[Mapping[str, Any]]
+            the selection keyword arguments of load_sim_data_hdf5(), or None to read all data.
+        """
+        return None
+
     def make_tbm(self, tbm_cls: Union[Type[TestbenchManager], str], tbm_specs: Mapping[str, Any],
                  ) -> TestbenchManager:
         obj_cls = cast(Type[TestbenchManager], import_class(tbm_cls))
@@ -189,9 +207,9 @@ class MeasurementManager(LoggingBase, abc.ABC):
                                                                  cur_dut, sim_object)
             else:
                 tbm, tb_params = sim_object
-                sim_results = await sim_db.async_simulate_tbm_obj(cur_state, sim_dir / cur_state,
-                                                                  cur_dut, tbm, tb_params,
-                                                                  tb_name=sim_id)
+                sim_results = await sim_db.async_simulate_tbm_obj(
+                    cur_state, sim_dir / cur_state, cur_dut, tbm, tb_params, tb_name=sim_id,
+                    load_kwargs=self.get_sim_data_selection(cur_info))
 
             self.log(f'Processing output of {name}, state {cur_state}')
             done, next_info = self.process_output(cur_info, sim_results)
@@ -37,7 +37,9 @@ from .data import (
     AnalysisSweep1D, AnalysisPSS
 )
 from .base import SimProcessManager, get_corner_temp
-from .hdf5 import load_sim_data_hdf5, save_sim_data_hdf5
+from .hdf5 import (
+    load_sim_data_hdf5, save_sim_data_hdf5, load_sweep_params_hdf5, combine_sim_data_hdf5
+)
 
 if TYPE_CHECKING:
     from .data import SweepInfo
@@ -186,12 +188,12 @@ class SpectreInterface(SimProcessManager):
     def get_sim_file(self, dir_path: Path, sim_tag: str) -> Path:
         return dir_path / f'{sim_tag}.hdf5'
 
-    def load_sim_data(self, dir_path: Path, sim_tag: str) -> SimData:
+    def load_sim_data(self, dir_path: Path, sim_tag: str, **kwargs: Any) -> SimData:
         hdf5_path = self.get_sim_file(dir_path, sim_tag)
         import time
         print('Reading HDF5')
         start = time.time()
-        ans = load_sim_data_hdf5(hdf5_path)
+        ans = load_sim_data_hdf5(hdf5_path, **kwargs)
         stop = time.time()
         print(f'HDF5 read took {stop - start:.4g} seconds.')
         return ans
@@ -286,12 +288,14 @@ class SpectreInterface(SimProcessManager):
             raise ValueError(f'srr_to_hdf5 ended with error.  See log file: {log_path}')
 
         # post-process HDF5 to convert to MD array
-        _process_hdf5(hdf5_path, rtol, atol)
+        _process_hdf5(hdf5_path, rtol, atol, self.config.get('hdf5_codec', ''),
+                      self.config.get('hdf5_threads', 0),
+                      self.config.get('hdf5_access_pattern', ''))
 
     async def _format_monte_carlo(self, lines: List[str], cwd_path: Path, compress: bool,
                                   rtol: float, atol: float, final_hdf5_path: Path) -> None:
         # read mapping file and convert each sub-directory into hdf5 files
-        sim_data_list = []
+        hdf5_list = []
         for line in lines:
             reg = re.search(r'(\d*)\t(.*)\n', line)
             idx, raw_str = reg.group(1), reg.group(2)
@@ -300,11 +304,13 @@ class SpectreInterface(SimProcessManager):
             log_path: Path = cwd_path / f'{raw_path.name}_srr_to_hdf5.log'
             await self._srr_to_hdf5(compress, rtol, atol, raw_path, hdf5_path, log_path,
                                     cwd_path)
-            sim_data_list.append(load_sim_data_hdf5(hdf5_path))
+            hdf5_list.append(hdf5_path)
 
-        # combine all SimData to one SimData
-        new_sim_data = SimData.combine(sim_data_list, 'monte_carlo')
-        save_sim_data_hdf5(new_sim_data, final_hdf5_path, compress)
+        # combine all SimData to one SimData, one source dataset at a time
+        combine_sim_data_hdf5(hdf5_list, final_hdf5_path, 'monte_carlo', compress=compress,
+                              codec=self.config.get('hdf5_codec', ''),
+                              num_threads=self.config.get('hdf5_threads', 0),
+                              access_pattern=self.config.get('hdf5_access_pattern', ''))
 
 
 def _write_sim_env(lines: List[str], models: List[Tuple[str, str]], temp: int) -> None:
@@ -468,8 +474,13 @@ def _format_val(val: Union[float, str], precision: int = 6) -> str:
         return float_to_si_string(val, precision)
 
 
-def _process_hdf5(path: Path, rtol: float, atol: float) -> None:
+def _process_hdf5(path: Path, rtol: float, atol: float, codec: Union[str, Mapping[str, str]] = '',
+                  num_threads: int = 0, access_pattern: str = '') -> None:
     proc = 'process'
+    # check sweep parameters first, so files without a process sweep are not loaded at all
+    if not any((proc in swp_pars for swp_pars in load_sweep_params_hdf5(path).values())):
+        return
+
     sim_data = load_sim_data_hdf5(path)
     modified = False
     for grp in sim_data.group_list:
@@ -478,4 +489,5 @@ def _process_hdf5(path: Path, rtol: float, atol: float) -> None:
             modified |= sim_data.remove_sweep(proc, rtol=rtol, atol=atol)
 
     if modified:
-        save_sim_data_hdf5(sim_data, path)
+        save_sim_data_hdf5(sim_data, path, codec=codec, num_threads=num_threads,
+                           access_pattern=access_pattern)
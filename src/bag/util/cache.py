@@ -62,7 +62,9 @@ from pybag.core import (
 
 from ..env import get_netlist_setup_file, get_gds_layer_map, get_gds_object_map
 from .search import get_new_name
-from .immutable import Param, to_immutable
+from .immutable import (
+    Param, ImmutableSortedDict, to_immutable, intern_immutable, get_exact_key
+)
 
 if TYPE_CHECKING:
     from ..core import BagProject
@@ -71,6 +73,9 @@ if TYPE_CHECKING:
 MasterType = TypeVar('MasterType', bound='DesignMaster')
 DBType = TypeVar('DBType', bound='MasterDB')
 
+# maximum number of process_params() results cached by each MasterDB
+PARAMS_CACHE_SIZE = 4096
+
 
 def format_cell_name(cell_name: str, rename_dict: Dict[str, str], name_prefix: str,
                      name_suffix: str, exact_cell_names: Set[str],
@@ -160,7 +165,7 @@ class DesignMaster(abc.ABC):
         for name, value in hidden_params.items():
             result[name] = table.get(name, value)
 
-        return Param(result)
+        return intern_immutable(Param(result))
 
     @classmethod
     def compute_unique_key(cls, params: Param) -> Any:
@@ -391,6 +396,12 @@ class MasterDB(abc.ABC):
         self._used_cell_names: Set[str] = set()
         self._key_lookup: Dict[Any, Any] = {}
         self._master_lookup: Dict[Any, DesignMaster] = {}
+        # LRU cache of process_params() results for parameters given as Param objects.  Keys
+        # are exact, so parameters that are equal but have different types (e.g. 1 and 1.0)
+        # are processed separately.  Values keep the parameters alive, since the keys refer
+        # to them by identity.
+        self._params_lookup: OrderedDict[Tuple[Type[DesignMaster], Any],
+                                         Tuple[Param, Tuple[Param, Any]]] = OrderedDict()
 
     @property
     def prj(self) -> BagProject:
@@ -510,6 +521,7 @@ class MasterDB(abc.ABC):
         """Clear all existing schematic masters."""
         self._key_lookup.clear()
         self._master_lookup.clear()
+        self._params_lookup.clear()
 
     def new_master(self: MasterDB, gen_cls: Type[MasterType],
                    params: Optional[Mapping[str, Any]] = None, debug: bool = False,
@@ -535,7 +547,20 @@ class MasterDB(abc.ABC):
         if params is None:
             params = {}
 
-        master_params, key = gen_cls.process_params(params)
+        if isinstance(params, ImmutableSortedDict):
+            # fast path: parameters are immutable, so we can cache the processed result.
+            params_key = (gen_cls, get_exact_key(params))
+            entry = self._params_lookup.get(params_key, None)
+            if entry is None:
+                entry = self._params_lookup[params_key] = (params,
+                                                           gen_cls.process_params(params))
+                if len(self._params_lookup) > PARAMS_CACHE_SIZE:
+                    self._params_lookup.popitem(last=False)
+            else:
+                self._params_lookup.move_to_end(params_key)
+            master_params, key = entry[1]
+        else:
+            master_params, key = gen_cls.process_params(params)
         test = self.find_master(key)
         if test is not None:
             if debug:
@@ -50,12 +50,21 @@ from typing import TypeVar, Any, Generic, Dict, Iterable, Tuple, Union, Optional
 
 import sys
 import bisect
+import weakref
+import hashlib
+import dataclasses
+from enum import Enum
 from collections import Hashable, Mapping, Sequence
 
+from .math import HalfInt
+
 T = TypeVar('T')
 U = TypeVar('U')
 ImmutableType = Union[None, Hashable, Tuple[Hashable, ...]]
 
+# table of canonical immutable containers, used to share equal sub-structures.
+_intern_table: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
 
 def combine_hash(a: int, b: int) -> int:
     """Combine the two given hash values.
@@ -76,6 +85,78 @@ def combine_hash(a: int, b: int) -> int:
     return sys.maxsize & (a ^ (b + 0x9e3779b9 + (a << 6) + (a >> 2)))
 
 
+def get_digest(obj: Any) -> bytes:
+    """Returns a deterministic structural digest of the given object.
+
+    Unlike hash(), the digest of strings is not randomized per process, so this method
+    should be used to compute any key that is persisted across sessions.
+
+    Parameters
+    ----------
+    obj : Any
+        the object.
+
+    Returns
+    -------
+    digest : bytes
+        the BLAKE2 digest of the canonical encoding of the given object.
+    """
+    if isinstance(obj, (ImmutableList, ImmutableSortedDict)):
+        return obj.digest
+    hobj = hashlib.blake2b(digest_size=16)
+    _update_digest(hobj, obj)
+    return hobj.digest()
+
+
+def _update_digest(hobj: Any, obj: Any) -> None:
+    """Feed the canonical encoding of the given object to the given hash object."""
+    if obj is None:
+        hobj.update(b'N')
+    elif isinstance(obj, (ImmutableList, ImmutableSortedDict)):
+        # use cached digests of nested immutable containers
+        hobj.update(b'C')
+        hobj.update(obj.digest)
+    elif isinstance(obj, Enum):
+        hobj.update(b'E%s.%s;' % (_get_type_name(type(obj)), obj.name.encode('utf-8')))
+    elif isinstance(obj, bool):
+        hobj.update(b'T' if obj else b'F')
+    elif isinstance(obj, int):
+        hobj.update(b'I%d;' % obj)
+    elif isinstance(obj, float):
+        hobj.update(b'R%s;' % obj.hex().encode('ascii'))
+    elif isinstance(obj, str):
+        val = obj.encode('utf-8')
+        hobj.update(b'S%d;' % len(val))
+        hobj.update(val)
+    elif isinstance(obj, bytes):
+        hobj.update(b'B%d;' % len(obj))
+        hobj.update(obj)
+    elif isinstance(obj, tuple):
+        hobj.update(b'(%d;' % len(obj))
+        for val in obj:
+            _update_digest(hobj, val)
+    elif isinstance(obj, type):
+        hobj.update(b'Y%s;' % _get_type_name(obj))
+    elif isinstance(obj, HalfInt):
+        hobj.update(b'H%d;' % obj.dbl_value)
+    elif dataclasses.is_dataclass(obj):
+        fields = dataclasses.fields(obj)
+        hobj.update(b'A%s;%d;' % (_get_type_name(type(obj)), len(fields)))
+        for field in fields:
+            _update_digest(hobj, field.name)
+            _update_digest(hobj, getattr(obj, field.name))
+    elif hasattr(obj, 'get_immutable_key') and callable(obj.get_immutable_key):
+        hobj.update(b'K%s;' % _get_type_name(type(obj)))
+        _update_digest(hobj, obj.get_immutable_key())
+    else:
+        hobj.update(b'O%s;' % _get_type_name(type(obj)))
+        _update_digest(hobj, repr(obj))
+
+
+def _get_type_name(cls: type) -> bytes:
+    return '{}.{}'.format(cls.__module__, cls.__qualname__).encode('utf-8')
+
+
 class ImmutableList(Hashable, Sequence, Generic[T]):
     """An immutable homogeneous list."""
 
@@ -83,12 +164,15 @@ class ImmutableList(Hashable, Sequence, Generic[T]):
         if values is None:
             self._content = []
             self._hash = 0
+            self._digest: Optional[bytes] = None
         elif isinstance(values, ImmutableList):
             self._content = values._content
             self._hash = values._hash
+            self._digest = values._digest
         else:
             self._content = values
             self._hash = 0
+            self._digest = None
             for v in values:
                 self._hash = combine_hash(self._hash, 0 if v is None else hash(v))
 
@@ -105,12 +189,25 @@ class ImmutableList(Hashable, Sequence, Generic[T]):
         return repr(self._content)
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         return (isinstance(other, ImmutableList) and self._hash == other._hash and
                 self.sequence_equal(self._content, other._content))
 
     def __hash__(self) -> int:
         return self._hash
 
+    @property
+    def digest(self) -> bytes:
+        """bytes: the deterministic structural digest of this list.  Computed only once."""
+        if self._digest is None:
+            hobj = hashlib.blake2b(digest_size=16)
+            hobj.update(b'L%d;' % len(self._content))
+            for val in self._content:
+                _update_digest(hobj, val)
+            self._digest = hobj.digest()
+        return self._digest
+
     def __bool__(self) -> bool:
         return len(self) > 0
 
@@ -162,19 +259,25 @@ class ImmutableSortedDict(Hashable, Mapping, Generic[T, U]):
                 self._keys = table._keys
                 self._vals = table._vals
                 self._hash = table._hash
+                self._digest = table._digest
             else:
-                self._keys = ImmutableList(sorted(table.keys()))
-                self._vals = ImmutableList([to_immutable(table[k]) for k in self._keys])
+                self._keys = intern_immutable(ImmutableList(sorted(table.keys())))
+                self._vals = intern_immutable(
+                    ImmutableList([to_immutable(table[k]) for k in self._keys]))
                 self._hash = combine_hash(hash(self._keys), hash(self._vals))
+                self._digest = None
         else:
             self._keys = ImmutableList([])
             self._vals = ImmutableList([])
             self._hash = combine_hash(hash(self._keys), hash(self._vals))
+            self._digest = None
 
     def __repr__(self) -> str:
         return repr(list(zip(self._keys, self._vals)))
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         return (isinstance(other, ImmutableSortedDict) and
                 self._hash == other._hash and
                 self._keys == other._keys and
@@ -183,6 +286,17 @@ class ImmutableSortedDict(Hashable, Mapping, Generic[T, U]):
     def __hash__(self) -> int:
         return self._hash
 
+    @property
+    def digest(self) -> bytes:
+        """bytes: the deterministic structural digest of this dictionary.  Computed only once."""
+        if self._digest is None:
+            hobj = hashlib.blake2b(digest_size=16)
+            hobj.update(b'D')
+            hobj.update(self._keys.digest)
+            hobj.update(self._vals.digest)
+            self._digest = hobj.digest()
+        return self._digest
+
     def __bool__(self) -> bool:
         return len(self) > 0
 
@@ -262,15 +376,85 @@ def to_immutable(obj: Any) -> ImmutableType:
     if isinstance(obj, tuple):
         return tuple((to_immutable(v) for v in obj))
     if isinstance(obj, list):
-        return ImmutableList([to_immutable(v) for v in obj])
+        return intern_immutable(ImmutableList([to_immutable(v) for v in obj]))
     if isinstance(obj, set):
-        return ImmutableList([to_immutable(v) for v in sorted(obj)])
+        return intern_immutable(ImmutableList([to_immutable(v) for v in sorted(obj)]))
     if isinstance(obj, dict):
-        return ImmutableSortedDict(obj)
+        return intern_immutable(ImmutableSortedDict(obj))
 
     raise ValueError('Cannot convert the following object to immutable type: {}'.format(obj))
 
 
+def get_exact_key(obj: Any) -> Hashable:
+    """Returns a hashable key of the given object that distinguishes values of different types.
+
+    Equal values of different types, such as 1, 1.0 and True, or 0.0 and -0.0, have different
+    keys.  Types are compared recursively, including the elements of tuples.  Nested
+    ImmutableLists/ImmutableSortedDicts are identified by identity, so the given object must
+    be kept alive as long as its key is in use.
+
+    Parameters
+    ----------
+    obj : Any
+        the object.
+
+    Returns
+    -------
+    key : Hashable
+        the exact key.
+    """
+    if isinstance(obj, ImmutableSortedDict):
+        # children are interned on construction, so compare them by identity.
+        return ImmutableSortedDict, id(obj._keys), id(obj._vals)
+    if isinstance(obj, ImmutableList):
+        return (ImmutableList,) + tuple((_get_exact_item_key(v) for v in obj._content))
+    return _get_exact_item_key(obj)
+
+
+def _get_exact_item_key(obj: Any) -> Hashable:
+    if isinstance(obj, (ImmutableList, ImmutableSortedDict)):
+        return type(obj), id(obj)
+    if isinstance(obj, float):
+        # use the bit pattern, so 0.0 and -0.0 are not merged
+        return type(obj), obj.hex()
+    if isinstance(obj, complex):
+        return type(obj), obj.real.hex(), obj.imag.hex()
+    if isinstance(obj, tuple):
+        return (type(obj),) + tuple((_get_exact_item_key(v) for v in obj))
+    return type(obj), obj
+
+
+def intern_immutable(obj: T) -> T:
+    """Returns the canonical instance of the given immutable container.
+
+    Equal ImmutableLists/ImmutableSortedDicts created with this method are the same object,
+    so nested structures are shared and equality checks reduce to identity checks.
+    Other objects are returned unchanged.
+
+    Parameters
+    ----------
+    obj : T
+        the immutable object.
+
+    Returns
+    -------
+    ans : T
+        the canonical object equal to obj.
+    """
+    if not isinstance(obj, (ImmutableList, ImmutableSortedDict)):
+        return obj
+
+    try:
+        key = get_exact_key(obj)
+        ans = _intern_table.get(key, None)
+    except TypeError:
+        # content is not hashable; cannot intern
+        return obj
+    if ans is None:
+        _intern_table[key] = ans = obj
+    return ans
+
+
 def update_recursive(table, value, *args) -> None:
     if not args:
         return
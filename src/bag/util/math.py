@@ -43,23 +43,46 @@
 
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Mapping, Callable, Dict, FrozenSet, Set, List, Iterable, Iterator, Union
 
 import ast
 import operator
 from math import trunc, ceil, floor
 from numbers import Integral, Real
 
+import numpy as np
+
+# range of double values of cached HalfInt instances
+_HALF_INT_CACHE_MIN = -1024
+_HALF_INT_CACHE_MAX = 4096
+
 
 class HalfInt(Integral):
-    """A class that represents a half integer."""
+    """A class that represents a half integer.
+
+    HalfInt objects are immutable, so instances of commonly used values are cached and shared.
+    """
 
-    def __init__(self, dbl_val: Any) -> None:
-        if isinstance(dbl_val, Integral):
-            self._val = int(dbl_val)
+    __slots__ = ('_val',)
+
+    _cache: List[HalfInt] = []
+
+    def __new__(cls, dbl_val: Any) -> HalfInt:
+        if type(dbl_val) is int:
+            if _HALF_INT_CACHE_MIN <= dbl_val < _HALF_INT_CACHE_MAX and cls is HalfInt:
+                return HalfInt._cache[dbl_val - _HALF_INT_CACHE_MIN]
+        elif isinstance(dbl_val, Integral):
+            dbl_val = int(dbl_val)
         else:
             raise ValueError('HalfInt internal value must be an integer.')
 
+        ans = super().__new__(cls)
+        ans._val = dbl_val
+        return ans
+
+    def __reduce__(self):
+        return self.__class__, (self._val,)
+
     @classmethod
     def convert(cls, val: Any) -> HalfInt:
         if isinstance(val, HalfInt):
@@ -141,10 +164,14 @@ class HalfInt(Integral):
         return not (self <= other)
 
     def __add__(self, other):
+        if isinstance(other, HalfInt):
+            return HalfInt(self._val + other._val)
         other = HalfInt.convert(other)
         return HalfInt(self._val + other._val)
 
     def __sub__(self, other):
+        if isinstance(other, HalfInt):
+            return HalfInt(self._val - other._val)
         return self + (-other)
 
     def __mul__(self, other):
@@ -323,6 +350,110 @@ class HalfInt(Integral):
             return HalfInt(ceil(self._val / 2) * 2)
 
 
+def _init_half_int_cache() -> None:
+    for dbl_val in range(_HALF_INT_CACHE_MIN, _HALF_INT_CACHE_MAX):
+        obj = Integral.__new__(HalfInt)
+        obj._val = dbl_val
+        HalfInt._cache.append(obj)
+
+
+_init_half_int_cache()
+
+
+class HalfIntArray:
+    """An array of half integers, backed by a NumPy integer array of their double values.
+
+    This class allows track computations to operate on whole lists of track indices
+    without creating a HalfInt object per element.  Indexing returns HalfInt objects.
+
+    Parameters
+    ----------
+    dbl_vals : Iterable[int]
+        the double values of the half integers.
+    """
+
+    __slots__ = ('_dbl',)
+
+    def __init__(self, dbl_vals: Union[Iterable[int], np.ndarray]) -> None:
+        self._dbl: np.ndarray = np.array(dbl_vals, dtype=np.int64).reshape(-1)
+
+    @classmethod
+    def convert(cls, vals: Union[HalfIntArray, Iterable[Any]]) -> HalfIntArray:
+        """Convert the given sequence of numbers to a HalfIntArray."""
+        if isinstance(vals, HalfIntArray):
+            return vals
+        return HalfIntArray([HalfInt.convert(v).dbl_value for v in vals])
+
+    @classmethod
+    def arange(cls, start: Any, num: int, step: Any = 1) -> HalfIntArray:
+        """Returns num half integers starting at start, with the given step size."""
+        start = HalfInt.convert(start).dbl_value
+        step = HalfInt.convert(step).dbl_value
+        return HalfIntArray(start + step * np.arange(num, dtype=np.int64))
+
+    @property
+    def dbl_values(self) -> np.ndarray:
+        """np.ndarray: the double values array.  Should not be modified."""
+        return self._dbl
+
+    @property
+    def values(self) -> np.ndarray:
+        """np.ndarray: the floating point values of the half integers."""
+        return self._dbl / 2
+
+    def __len__(self) -> int:
+        return self._dbl.shape[0]
+
+    def __iter__(self) -> Iterator[HalfInt]:
+        return (HalfInt(v) for v in self._dbl.tolist())
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[HalfInt, HalfIntArray]:
+        if isinstance(idx, slice):
+            return HalfIntArray(self._dbl[idx])
+        return HalfInt(int(self._dbl[idx]))
+
+    def __repr__(self) -> str:
+        return 'HalfIntArray({})'.format((self._dbl / 2).tolist())
+
+    def _get_other_dbl(self, other: Any) -> Union[int, np.ndarray]:
+        if isinstance(other, HalfIntArray):
+            return other._dbl
+        return HalfInt.convert(other).dbl_value
+
+    def __add__(self, other: Any) -> HalfIntArray:
+        return HalfIntArray(self._dbl + self._get_other_dbl(other))
+
+    def __radd__(self, other: Any) -> HalfIntArray:
+        return self + other
+
+    def __sub__(self, other: Any) -> HalfIntArray:
+        return HalfIntArray(self._dbl - self._get_other_dbl(other))
+
+    def __rsub__(self, other: Any) -> HalfIntArray:
+        return HalfIntArray(self._get_other_dbl(other) - self._dbl)
+
+    def __neg__(self) -> HalfIntArray:
+        return HalfIntArray(-self._dbl)
+
+    def __iadd__(self, other: Any) -> HalfIntArray:
+        self._dbl += self._get_other_dbl(other)
+        return self
+
+    def __isub__(self, other: Any) -> HalfIntArray:
+        self._dbl -= self._get_other_dbl(other)
+        return self
+
+    def up_even(self, flag: bool) -> HalfIntArray:
+        return HalfIntArray(self._dbl + (self._dbl & flag))
+
+    def down_even(self, flag: bool) -> HalfIntArray:
+        return HalfIntArray(self._dbl - (self._dbl & flag))
+
+    def to_list(self) -> List[HalfInt]:
+        """Returns a list of HalfInt objects."""
+        return [HalfInt(v) for v in self._dbl.tolist()]
+
+
 # noinspection PyPep8Naming,PyMethodMayBeStatic
 class Calculator(ast.NodeVisitor):
     """A simple calculator.
@@ -373,3 +504,124 @@ class Calculator(ast.NodeVisitor):
     @classmethod
     def evaluate(cls, expr: str, namespace: Mapping[str, Any]):
         return cls(namespace).eval(expr)
+
+
+# noinspection PyUnresolvedReferences
+class CompiledExpression:
+    """An arithmetic expression that is parsed once and compiled into a tree of closures.
+
+    The supported syntax is the same as Calculator.  Since evaluation only applies the
+    corresponding operator functions, NumPy arrays in the namespace are evaluated in a
+    vectorized fashion.
+
+    Parameters
+    ----------
+    expr : str
+        the expression string.
+    """
+    _UOP_MAP = {
+        ast.USub: operator.neg,
+        ast.UAdd: operator.pos,
+        ast.Invert: operator.neg,
+    }
+
+    __slots__ = ('_expr', '_fun', '_names')
+
+    def __init__(self, expr: str) -> None:
+        names: Set[str] = set()
+        self._expr = expr
+        self._fun = self._compile(ast.parse(expr, mode='eval').body, names)
+        self._names: FrozenSet[str] = frozenset(names)
+
+    @property
+    def expr(self) -> str:
+        return self._expr
+
+    @property
+    def names(self) -> FrozenSet[str]:
+        """FrozenSet[str]: set of variable names this expression depends on."""
+        return self._names
+
+    def __call__(self, namespace: Mapping[str, Any]) -> Any:
+        return self._fun(namespace)
+
+    @classmethod
+    def _compile(cls, node: ast.AST, names: Set[str]) -> Callable[[Mapping[str, Any]], Any]:
+        if isinstance(node, ast.BinOp):
+            bop = Calculator._OP_MAP.get(type(node.op), None)
+            if bop is not None:
+                left = cls._compile(node.left, names)
+                right = cls._compile(node.right, names)
+                return lambda ns: bop(left(ns), right(ns))
+        elif isinstance(node, ast.UnaryOp):
+            uop = cls._UOP_MAP.get(type(node.op), None)
+            if uop is not None:
+                operand = cls._compile(node.operand, names)
+                return lambda ns: uop(operand(ns))
+        elif isinstance(node, ast.Name):
+            key = node.id
+            names.add(key)
+            return lambda ns: ns[key]
+        elif isinstance(node, ast.Constant):
+            # python 3.8+
+            const = node.value
+            return lambda ns: const
+        elif isinstance(node, ast.Num):
+            const = node.n
+            return lambda ns: const
+
+        raise ValueError('Unsupported expression syntax: {}'.format(ast.dump(node)))
+
+
+def resolve_expressions(namespace: Dict[str, Any], expr_table: Mapping[str, CompiledExpression]
+                        ) -> Dict[str, Any]:
+    """Evaluate a set of inter-dependent expressions and add the results to the namespace.
+
+    Expressions are evaluated exactly once, in topologically sorted order of their
+    dependencies.
+
+    Parameters
+    ----------
+    namespace : Dict[str, Any]
+        the namespace with all known variable values.  Will be updated in-place.
+    expr_table : Mapping[str, CompiledExpression]
+        dictionary from variable name to the expression defining it.
+
+    Returns
+    -------
+    namespace : Dict[str, Any]
+        the updated namespace.
+    """
+    order: List[str] = []
+    done: Set[str] = set()
+    active: Set[str] = set()
+    for root in expr_table:
+        if root in namespace or root in done:
+            continue
+        # iterative depth-first search, appending variables in post-order
+        active.add(root)
+        stack = [(root, iter(expr_table[root].names))]
+        while stack:
+            name, dep_iter = stack[-1]
+            for dep in dep_iter:
+                if dep in namespace or dep in done:
+                    continue
+                if dep in active:
+                    raise ValueError('Circular dependency found in expression for {}: {}'.format(
+                        name, expr_table[name].expr))
+                dep_expr = expr_table.get(dep, None)
+                if dep_expr is None:
+                    raise ValueError('Undefined variable {} in expression for {}: {}'.format(
+                        dep, name, expr_table[name].expr))
+                active.add(dep)
+                stack.append((dep, iter(dep_expr.names)))
+                break
+            else:
+                stack.pop()
+                active.discard(name)
+                done.add(name)
+                order.append(name)
+
+    for name in order:
+        namespace[name] = expr_table[name](namespace)
+    return namespace